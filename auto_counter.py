@@ -0,0 +1,280 @@
+"""自动识别计数器：不必预先选择运动，按在线识别结果把每帧交给深蹲或俯卧撑计数器
+
+识别结果切换时不重启进程、不重建模型，两个计数器各自保留计数，结束时报告两者之和。
+"""
+import argparse
+import time
+
+import cv2
+import mediapipe as mp
+
+from backends import create_beep_backend
+from capture import FrameClock, open_source
+from control_channel import NullControlClient, connect_control
+from exercise_classifier import ExerciseClassifier
+from exercise_engine import exercise_angles
+from landmark_log import NullLandmarkRecorder, create_recorder
+from metrics import NullMetrics, add_metrics_arguments, create_metrics
+from model_tuning import TARGET_FPS, choose_model_complexity
+from pose_utils import (DISPLAY_WIDTH, DISPLAY_HEIGHT, INFERENCE_SIZE, POSE_CONFIDENCE,
+                        landmarks_to_array, prepare_inference_image)
+from profiling import NullProfiler, add_profile_arguments, create_profiler
+from pushup_counter import SPEECH_OPTIONS as PUSHUP_SPEECH_OPTIONS, AutoCalibrationPushupCounter
+from scheduler import InferenceScheduler
+from session_store import NullSessionStore, SessionStore
+from speech import PRIORITY_HIGH, create_speech_service
+from squat_counter import SPEECH_OPTIONS as SQUAT_SPEECH_OPTIONS, SquatCounter
+from telemetry import Telemetry
+
+EXERCISE_LABELS = {"squat": "Squat", "pushup": "Pushup"}
+
+
+class AutoExerciseCounter:
+    """组合深蹲和俯卧撑计数器，由 ExerciseClassifier 决定每帧交给哪一个"""
+
+    def __init__(self, squat, pushup, classifier=None, control=None, store=None, recorder=None, clock=None,
+                 metrics=None, profiler=None):
+        """squat/pushup 为两个计数器实例，control 为与主程序之间的控制通道，默认不连接主程序；
+        store 为训练记录库，两种运动的动作记在同一次训练中，默认不保存记录；recorder 为关键点录制器，默认不录制；
+        clock 为计时基准，回放录制时由调用方注入，tick() 同时推进两个计数器；metrics 为运行指标，默认不收集；
+        profiler 为性能分析，默认不分析"""
+        self.squat = squat
+        self.pushup = pushup
+        self.classifier = classifier if classifier is not None else ExerciseClassifier()
+        self.control = control if control is not None else NullControlClient()
+        self.clock = clock if clock is not None else FrameClock()
+
+        # 两个计数器共用一个事件流，主程序看到的是同一次训练
+        self.telemetry = Telemetry(self.control, clock=self.clock)
+        squat.telemetry = pushup.telemetry = self.telemetry
+        squat.control = pushup.control = self.control
+        self.store = store if store is not None else NullSessionStore()
+        self.recorder = recorder if recorder is not None else NullLandmarkRecorder()
+        self.metrics = metrics if metrics is not None else NullMetrics()
+        self.profiler = profiler if profiler is not None else NullProfiler()
+
+        self.active = None
+        self.switches = 0
+        self._arm_angles = None
+
+    @property
+    def counter(self):
+        """两种运动的总次数"""
+        return self.squat.squat_counter + self.pushup.counter
+
+    def tick(self, timestamp):
+        """推进所有计数器的帧时间"""
+        self.clock.tick(timestamp)
+        self.squat.clock.tick(timestamp)
+        self.pushup.clock.tick(timestamp)
+
+    def update(self, points, width=DISPLAY_WIDTH, height=DISPLAY_HEIGHT):
+        """识别运动类型并把一帧关键点 (33, 4) 交给对应的计数器
+
+        关节角每帧只计算一次（每种坐标系一次），识别器和计数器共用，坐标系与单独运行计数器时相同。
+        """
+        angles = exercise_angles(points, (width, height))
+        label = self.classifier.update(points, self.clock(), (width, height), angles)
+        if label is not None and label != self.active:
+            self.switch(label)
+
+        if self.active == "squat":
+            self.squat.update_angles(angles["squat"])
+        elif self.active == "pushup":
+            self._arm_angles = self.pushup.update_angles(angles["pushup"])
+
+    def switch(self, label):
+        """切换到另一个计数器，两者的计数都保留"""
+        if self.active is not None:
+            self.switches += 1
+        self.active = label
+        self.telemetry.emit("exercise", exercise=label)
+        print(f"识别为: {label}")
+        if label == "pushup" and self.pushup.calibration_state != "done":
+            self.pushup.speak("准备校准，请伸直手臂并保持稳定", priority=PRIORITY_HIGH)
+
+    def reset(self):
+        """清零两个计数器并重新识别"""
+        self.squat.reset()
+        self.pushup.recalibrate()
+        self.classifier.clear()
+        self.active = None
+        self._arm_angles = None
+
+    def draw(self, image):
+        """绘制当前计数器的界面和识别结果"""
+        h, w, _ = image.shape
+        if self.active == "squat":
+            self.squat.display_info(image)
+        elif self.active == "pushup" and self._arm_angles is not None:
+            self.pushup.draw_calibration_display(image, *self._arm_angles)
+
+        label = EXERCISE_LABELS.get(self.active, "Detecting...")
+        cv2.putText(image, f"Auto: {label}  Total: {self.counter}", (10, h - 30),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.9, (255, 255, 255), 2, cv2.LINE_AA)
+        return image
+
+
+def run_session(counter, cap, pose, headless=False, inference_size=INFERENCE_SIZE, scheduler=None):
+    """运行一次自动识别训练，直到收到停止命令、窗口关闭或帧源结束
+
+    cap 和 pose 由调用方创建和释放，常驻进程可以在多次训练之间复用。
+    """
+    session = counter.store.start_session("auto", clock=counter.clock)
+    counter.squat.session = counter.pushup.session = session
+    counter.metrics.attach("auto", source=cap, speech=counter.squat.speech)
+
+    mp_pose = mp.solutions.pose
+    mp_drawing = mp.solutions.drawing_utils
+
+    WINDOW_NAME = 'Auto Counter'
+    if not headless:
+        cv2.namedWindow(WINDOW_NAME, cv2.WINDOW_NORMAL)
+        cv2.resizeWindow(WINDOW_NAME, DISPLAY_WIDTH, DISPLAY_HEIGHT)
+
+    results = None
+    stop_requested = False
+    while cap.isOpened():
+        # 处理主程序发来的命令（只读内存队列，不访问文件系统）
+        for command, payload in counter.control.poll():
+            if command == "stop":
+                stop_requested = True
+            elif command == "quit":
+                # 结束本次训练，退出命令留给常驻进程的外层循环处理
+                counter.control.requeue(command, payload)
+                stop_requested = True
+            elif command == "reset":
+                counter.reset()
+                counter.control.send("ack", command="reset", count=counter.counter)
+        if stop_requested:
+            break
+
+        if not headless and cv2.getWindowProperty(WINDOW_NAME, cv2.WND_PROP_VISIBLE) < 1:
+            break
+
+        frame = cap.read()
+        if frame is None:
+            break
+        counter.tick(frame.timestamp)
+        counter.metrics.begin_frame()
+        counter.profiler.frame()
+        image = cv2.flip(frame.image, 1)
+
+        # 在缩小的图像上推理，在全分辨率图像上绘制；静止时沿用上一次的结果
+        if results is None or scheduler is None or scheduler.should_infer(image, counter.clock()):
+            inference_start = time.perf_counter()
+            results = pose.process(prepare_inference_image(image, inference_size))
+            inference_seconds = time.perf_counter() - inference_start
+            counter.metrics.inference(inference_seconds)
+            if scheduler is not None:
+                points = None
+                if results.pose_landmarks:
+                    points = landmarks_to_array(results.pose_landmarks.landmark)
+                scheduler.record_inference(inference_seconds, points, counter.clock())
+        counter.telemetry.frame()
+
+        points = landmarks_to_array(results.pose_landmarks.landmark) if results.pose_landmarks else None
+        counter.recorder.write(counter.clock(), points)
+        if points is not None:
+            counter.update(points)
+
+        if headless:
+            counter.metrics.end_frame(counter.counter)
+            continue
+        image = cv2.resize(image, (DISPLAY_WIDTH, DISPLAY_HEIGHT))
+        if results.pose_landmarks:
+            mp_drawing.draw_landmarks(
+                image, results.pose_landmarks, mp_pose.POSE_CONNECTIONS,
+                mp_drawing.DrawingSpec(color=(155, 247, 255), thickness=2, circle_radius=2),
+                mp_drawing.DrawingSpec(color=(160, 145, 246), thickness=2, circle_radius=2)
+            )
+        cv2.imshow(WINDOW_NAME, counter.metrics.draw_hud(counter.draw(image)))
+
+        key = cv2.waitKey(1) & 0xFF
+        counter.metrics.end_frame(counter.counter)
+        if key == ord('q'):
+            break
+        elif key == ord('r'):
+            counter.reset()
+
+    if not headless:
+        cv2.destroyAllWindows()
+
+    # 保存总数（每次动作已按运动类型记录），并报告给主程序
+    session.finish(counter.counter)
+    counter.profiler.close()
+    counter.recorder.close()
+    if counter.recorder.stats_text():
+        print(counter.recorder.stats_text())
+    print(f"深蹲 {counter.squat.squat_counter} 个，俯卧撑 {counter.pushup.counter} 个，"
+          f"切换 {counter.switches} 次")
+    counter.telemetry.flush()
+    counter.control.send("ack", command="stop", count=counter.counter)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="自动识别运动类型的计数器")
+    parser.add_argument("--inference-size", type=int, default=INFERENCE_SIZE,
+                        help="姿态推理图像的长边像素，0 表示使用原始分辨率")
+    parser.add_argument("--source", default=None,
+                        help="帧源：摄像头编号（默认0）、视频文件、图片目录或 synthetic")
+    parser.add_argument("--headless", action="store_true", help="无界面模式：不显示窗口")
+    parser.add_argument("--speech", choices=["auto", "sapi", "null"], default="auto",
+                        help="语音后端，null 为关闭语音和提示音")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="运动自适应推理：无人或静止时降低推理频率")
+    parser.add_argument("--model-complexity", type=int, choices=[0, 1, 2], default=None,
+                        help="姿态模型复杂度，默认按本机速度自动选择")
+    parser.add_argument("--target-fps", type=float, default=TARGET_FPS,
+                        help="自动选择模型时要求达到的帧率")
+    parser.add_argument("--retune", action="store_true", help="忽略缓存，重新测试模型速度")
+    add_metrics_arguments(parser)
+    add_profile_arguments(parser)
+    parser.add_argument("--record", nargs="?", const="", default=None, metavar="PATH",
+                        help="录制每帧关键点（不保存视频），默认保存到 data/recordings/")
+    args = parser.parse_args()
+
+    print("自动识别计数器启动")
+
+    cap = open_source(args.source)
+    control = connect_control()
+    counter = AutoExerciseCounter(
+        SquatCounter(source=cap, headless=args.headless,
+                     speech=create_speech_service(args.speech, headless=args.headless, **SQUAT_SPEECH_OPTIONS)),
+        AutoCalibrationPushupCounter(
+            speech=create_speech_service(args.speech, headless=args.headless, **PUSHUP_SPEECH_OPTIONS),
+            beeper=create_beep_backend("null" if args.speech == "null" else "auto", headless=args.headless),
+        ),
+        control=control,
+        store=SessionStore(),
+        recorder=create_recorder(args.record, "auto"),
+        metrics=create_metrics(args.metrics_file, args.metrics_port, args.hud),
+        profiler=create_profiler(args.profile, "auto"),
+    )
+    scheduler = InferenceScheduler() if args.adaptive else None
+
+    model_complexity = choose_model_complexity(args.model_complexity, args.target_fps,
+                                               args.inference_size, refresh=args.retune)
+
+    # 两种运动共用一个 Pose，使用较低的（深蹲的）置信度
+    confidence = POSE_CONFIDENCE["squat"]
+    with mp.solutions.pose.Pose(model_complexity=model_complexity,
+                                min_detection_confidence=confidence,
+                                min_tracking_confidence=confidence) as pose:
+        run_session(counter, cap, pose, args.headless, args.inference_size, scheduler)
+
+    cap.release()
+    if cap.stats_text():
+        print(cap.stats_text())
+    if scheduler is not None and scheduler.stats_text():
+        print(scheduler.stats_text())
+    control.close()
+    counter.store.close()
+    counter.metrics.close()
+
+    print("程序结束")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""语音和提示音后端：Windows 下使用 SAPI / winsound，服务器或其他平台使用空后端"""
+import sys
+import threading
+import time
+
+
+class SpeechBackend:
+    """语音后端基类，speak() 阻塞直到播报结束
+
+    支持预合成的后端提供 cache_key（标识音色、语速等设置）、synthesize() 和 play_file()，
+    cache_key 为 None 时不使用语音缓存。
+    """
+
+    # 空后端不会发声，调用方可以直接跳过等待
+    enabled = True
+    cache_key = None
+
+    def speak(self, text):
+        raise NotImplementedError
+
+    def synthesize(self, text, path):
+        """把语音合成到 WAV 文件"""
+        raise NotImplementedError
+
+    def play_file(self, path):
+        """播放 WAV 文件，阻塞直到播放结束"""
+        raise NotImplementedError
+
+
+class NullSpeechBackend(SpeechBackend):
+    """空语音后端，什么也不做"""
+
+    enabled = False
+
+    def speak(self, text):
+        pass
+
+
+class SapiSpeechBackend(SpeechBackend):
+    """Windows SAPI 语音后端，每个线程各自初始化 COM 并创建语音对象"""
+
+    def __init__(self, rate=0, volume=100, prefer_chinese=False):
+        import pythoncom
+        import win32com.client
+        import winsound
+
+        self._pythoncom = pythoncom
+        self._client = win32com.client
+        self._winsound = winsound
+        self.rate = rate
+        self.volume = volume
+        self.prefer_chinese = prefer_chinese
+        self.cache_key = f"sapi_r{rate}_v{volume}{'_zh' if prefer_chinese else ''}"
+        self._local = threading.local()
+
+    def _create_voice(self):
+        """在当前线程创建语音对象，调用前需已初始化 COM"""
+        voice = self._client.Dispatch("SAPI.SpVoice")
+        voice.Rate, voice.Volume = self.rate, self.volume
+
+        # 尝试设置中文语音
+        if self.prefer_chinese:
+            try:
+                zh_voices = voice.GetVoices("Language=804")
+                if zh_voices.Count > 0:
+                    voice.Voice = zh_voices.Item(0)
+            except Exception:
+                pass
+        return voice
+
+    def _voice(self):
+        """获取当前线程的语音对象"""
+        voice = getattr(self._local, "voice", None)
+        if voice is None:
+            self._pythoncom.CoInitialize()
+            voice = self._local.voice = self._create_voice()
+        return voice
+
+    def speak(self, text):
+        try:
+            self._voice().Speak(text)
+        except Exception as e:
+            print(f"TTS error: {e}")
+            # 出错后重建当前线程的语音对象
+            self._local.voice = None
+            try:
+                self._pythoncom.CoUninitialize()
+            except Exception:
+                pass
+            time.sleep(0.1)
+
+    def synthesize(self, text, path):
+        """用单独的语音对象输出到文件，不影响当前线程的播报"""
+        self._voice()  # 确保当前线程已初始化 COM
+        stream = self._client.Dispatch("SAPI.SpFileStream")
+        stream.Open(path, 3)  # SSFMCreateForWrite
+        try:
+            voice = self._create_voice()
+            voice.AudioOutputStream = stream
+            voice.Speak(text)
+        finally:
+            stream.Close()
+
+    def play_file(self, path):
+        self._winsound.PlaySound(path, self._winsound.SND_FILENAME)
+
+
+class BeepBackend:
+    """提示音后端基类"""
+
+    def beep(self, frequency, duration_ms):
+        raise NotImplementedError
+
+
+class NullBeepBackend(BeepBackend):
+    """空提示音后端"""
+
+    def beep(self, frequency, duration_ms):
+        pass
+
+
+class WinsoundBeepBackend(BeepBackend):
+    """Windows 蜂鸣提示音"""
+
+    def __init__(self):
+        import winsound
+
+        self._winsound = winsound
+
+    def beep(self, frequency, duration_ms):
+        try:
+            self._winsound.Beep(frequency, duration_ms)
+        except Exception:
+            pass
+
+
+def create_speech_backend(name="auto", headless=False, **options):
+    """按名称创建语音后端：sapi、null 或 auto（Windows 且非无界面模式时用 SAPI，否则为空后端）"""
+    if name == "null" or (name == "auto" and (headless or sys.platform != "win32")):
+        return NullSpeechBackend()
+    try:
+        return SapiSpeechBackend(**options)
+    except Exception as e:
+        if name == "sapi":
+            raise
+        print(f"语音引擎不可用，已关闭语音: {e}")
+        return NullSpeechBackend()
+
+
+def create_beep_backend(name="auto", headless=False):
+    """按名称创建提示音后端：winsound、null 或 auto"""
+    if name == "null" or (name == "auto" and (headless or sys.platform != "win32")):
+        return NullBeepBackend()
+    try:
+        return WinsoundBeepBackend()
+    except Exception as e:
+        if name == "winsound":
+            raise
+        print(f"提示音不可用，已关闭提示音: {e}")
+        return NullBeepBackend()
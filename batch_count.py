@@ -0,0 +1,223 @@
+"""批量视频计数：在进程池中离线统计录制视频中的深蹲/俯卧撑次数
+
+用法：
+    python batch_count.py videos/*.mp4 --exercise squat --json results.json --csv results.csv
+    python batch_count.py --manifest sessions.csv --workers 8 --json results.json
+
+manifest 为带表头的 CSV 文件，包含 path 和 exercise 两列（exercise 为 squat 或 pushup）。
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import cv2
+import mediapipe as mp
+
+from backends import NullBeepBackend
+from capture import VideoFileSource
+from model_tuning import DEFAULT_MODEL_COMPLEXITY
+from pose_utils import (DISPLAY_WIDTH, DISPLAY_HEIGHT, INFERENCE_SIZE, POSE_CONFIDENCE,
+                        landmarks_to_array, prepare_inference_image)
+from pushup_counter import AutoCalibrationPushupCounter
+from speech import create_speech_service
+from squat_counter import SquatCounter
+
+RESULT_FIELDS = ["file", "exercise", "status", "count", "frames", "video_seconds",
+                 "elapsed_seconds", "inference_seconds", "fps", "error"]
+
+
+# 每个工作进程各自持有的姿态检测实例和推理尺寸
+_poses = {}
+_inference_size = INFERENCE_SIZE
+_model_complexity = DEFAULT_MODEL_COMPLEXITY
+
+
+def _init_worker(inference_size, model_complexity):
+    """工作进程初始化：限制OpenCV线程数，避免多进程间争抢CPU"""
+    global _inference_size, _model_complexity
+    _inference_size = inference_size
+    _model_complexity = model_complexity
+    cv2.setNumThreads(1)
+
+
+def _get_pose(exercise):
+    """获取本进程的姿态检测实例，复用前重置跟踪状态，避免上一个视频的结果影响下一个"""
+    pose = _poses.get(exercise)
+    if pose is None:
+        confidence = POSE_CONFIDENCE[exercise]
+        pose = mp.solutions.pose.Pose(model_complexity=_model_complexity,
+                                      min_detection_confidence=confidence,
+                                      min_tracking_confidence=confidence)
+        _poses[exercise] = pose
+    else:
+        pose.reset()
+    return pose
+
+
+def count_video(task):
+    """统计单个视频的次数，任何错误都记录在结果中而不是抛出"""
+    index, path, exercise = task
+    result = {"index": index, "file": path, "exercise": exercise, "status": "ok", "count": None,
+              "frames": 0, "video_seconds": 0.0, "elapsed_seconds": 0.0,
+              "inference_seconds": 0.0, "fps": 0.0, "error": ""}
+    start = time.perf_counter()
+    source = None
+
+    try:
+        if exercise not in POSE_CONFIDENCE:
+            raise ValueError(f"未知的运动类型: {exercise}")
+        source = VideoFileSource(path)
+        if not source.isOpened():
+            raise IOError(f"无法打开视频: {path}")
+
+        pose = _get_pose(exercise)
+        # 计数器默认不连接主程序的控制通道，不会发送开始信号
+        if exercise == "squat":
+            counter = SquatCounter(source=source, headless=True, speech=create_speech_service("null"))
+        else:
+            counter = AutoCalibrationPushupCounter(speech=create_speech_service("null"), beeper=NullBeepBackend())
+
+        for frame in source:
+            counter.clock.tick(frame.timestamp)
+            # 与实时计数相同，先镜像再检测
+            image = cv2.flip(frame.image, 1)
+
+            inference_start = time.perf_counter()
+            results = pose.process(prepare_inference_image(image, _inference_size))
+            result["inference_seconds"] += time.perf_counter() - inference_start
+
+            if results.pose_landmarks:
+                points = landmarks_to_array(results.pose_landmarks.landmark)
+                if exercise == "squat":
+                    counter.update_state(points, DISPLAY_WIDTH, DISPLAY_HEIGHT)
+                else:
+                    counter.update(points)
+
+            result["frames"] += 1
+            result["video_seconds"] = frame.timestamp
+
+        result["count"] = counter.squat_counter if exercise == "squat" else counter.counter
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        if source is not None:
+            source.release()
+
+    result["elapsed_seconds"] = time.perf_counter() - start
+    if result["elapsed_seconds"] > 0:
+        result["fps"] = result["frames"] / result["elapsed_seconds"]
+    return result
+
+
+def _error_result(task, error):
+    """工作进程没有返回结果（异常退出或超时）时的失败记录"""
+    index, path, exercise = task
+    return {"index": index, "file": path, "exercise": exercise, "status": "error", "count": None,
+            "frames": 0, "video_seconds": 0.0, "elapsed_seconds": 0.0,
+            "inference_seconds": 0.0, "fps": 0.0, "error": error}
+
+
+def run_tasks(tasks, workers, inference_size, model_complexity, timeout, max_tasks_per_child):
+    """在进程池中处理视频，按完成顺序逐个返回结果
+
+    同时提交的任务不超过工作进程数，提交时间即开始处理的时间；工作进程异常退出（段错误、内存不足）时
+    进程池会补充新进程，但该任务不再有结果，超过 timeout 秒后记为失败并继续处理其余视频。
+    """
+    pending = list(reversed(tasks))
+    running = []  # (任务, AsyncResult, 截止时间)
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(inference_size, model_complexity),
+                              maxtasksperchild=max_tasks_per_child) as pool:
+        while pending or running:
+            while pending and len(running) < workers:
+                task = pending.pop()
+                running.append((task, pool.apply_async(count_video, (task,)), time.monotonic() + timeout))
+
+            task, async_result, deadline = running[0]
+            try:
+                result = async_result.get(timeout=min(0.1, max(deadline - time.monotonic(), 0)))
+            except multiprocessing.TimeoutError:
+                if time.monotonic() < deadline:
+                    # 轮流等待，先完成的任务先返回
+                    running.append(running.pop(0))
+                    continue
+                result = _error_result(task, f"超过 {timeout:.0f} 秒没有结果（工作进程可能异常退出）")
+            except Exception as e:
+                result = _error_result(task, f"{type(e).__name__}: {e}")
+            running.pop(0)
+            yield result
+
+
+def load_tasks(args):
+    """汇总命令行和 manifest 中的视频列表"""
+    tasks = [(path, args.exercise) for path in args.videos]
+    if args.manifest:
+        with open(args.manifest, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                tasks.append((row["path"], row.get("exercise") or args.exercise))
+    return [(index, path, exercise) for index, (path, exercise) in enumerate(tasks)]
+
+
+def write_results(results, json_path=None, csv_path=None):
+    """保存结果到 JSON / CSV"""
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump([{k: r[k] for k in RESULT_FIELDS} for r in results], f, ensure_ascii=False, indent=2)
+    if csv_path:
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(results)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="批量统计录制视频中的运动次数")
+    parser.add_argument("videos", nargs="*", help="视频文件")
+    parser.add_argument("--exercise", choices=sorted(POSE_CONFIDENCE), default="squat",
+                        help="命令行视频的运动类型（manifest 未填写时也使用该值）")
+    parser.add_argument("--manifest", help="包含 path,exercise 两列的 CSV 文件")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="工作进程数")
+    parser.add_argument("--inference-size", type=int, default=INFERENCE_SIZE,
+                        help="姿态推理图像的长边像素，0 表示使用原始分辨率")
+    parser.add_argument("--model-complexity", type=int, choices=[0, 1, 2], default=DEFAULT_MODEL_COMPLEXITY,
+                        help="姿态模型复杂度（离线处理不自动选择）")
+    parser.add_argument("--timeout", type=float, default=1800, help="单个视频的最长处理时间（秒），超时记为失败")
+    parser.add_argument("--max-tasks-per-child", type=int, default=20,
+                        help="每个工作进程处理的视频数，之后换用新进程，避免内存持续增长")
+    parser.add_argument("--json", help="结果输出 JSON 文件")
+    parser.add_argument("--csv", help="结果输出 CSV 文件")
+    args = parser.parse_args()
+
+    tasks = load_tasks(args)
+    if not tasks:
+        parser.error("没有需要处理的视频")
+
+    start = time.perf_counter()
+    results = []
+    for result in run_tasks(tasks, args.workers, args.inference_size, args.model_complexity,
+                            args.timeout, args.max_tasks_per_child):
+        results.append(result)
+        if result["status"] == "ok":
+            print(f"[{len(results)}/{len(tasks)}] {result['file']}: {result['count']} "
+                  f"({result['frames']} 帧, {result['fps']:.1f} FPS)")
+        else:
+            print(f"[{len(results)}/{len(tasks)}] {result['file']}: 失败 - {result['error']}")
+    elapsed = time.perf_counter() - start
+
+    results.sort(key=lambda r: r["index"])
+    write_results(results, args.json, args.csv)
+
+    failed = sum(1 for r in results if r["status"] != "ok")
+    frames = sum(r["frames"] for r in results)
+    print(f"完成 {len(results) - failed}/{len(results)} 个视频，共 {frames} 帧，"
+          f"用时 {elapsed:.1f} 秒（{frames / elapsed if elapsed > 0 else 0:.1f} FPS）")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
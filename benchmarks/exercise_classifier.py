@@ -0,0 +1,200 @@
+"""运动类型识别的离线评估：在录制的关键点序列上回放 ExerciseClassifier，统计准确率、识别延迟和单帧耗时
+
+关键点序列为 .npz 文件，包含 points (N, 33, 4)、timestamps (N,)，可选 labels (N,) 为逐帧标注；
+没有逐帧标注时使用 manifest 或 --exercise 给出的整段标签。--synthetic 生成合成的深蹲/俯卧撑序列（含中途切换）。
+
+用法（在项目根目录下运行）：
+    python -m benchmarks.exercise_classifier --synthetic
+    python -m benchmarks.exercise_classifier recordings/*.npz --exercise squat
+    python -m benchmarks.exercise_classifier --manifest streams.csv --fit
+"""
+import argparse
+import csv
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from exercise_classifier import FEATURE_NAMES, ExerciseClassifier  # noqa: E402
+from pose_utils import DISPLAY_HEIGHT, DISPLAY_WIDTH, NUM_LANDMARKS  # noqa: E402
+
+SCALE = (DISPLAY_WIDTH, DISPLAY_HEIGHT)
+
+
+def _pose(shoulder, elbow, wrist, hip, knee, ankle, rng, noise):
+    """由一侧的关节像素坐标生成 (33, 4) 归一化关键点，另一侧略微错开，其余点放在肩部附近"""
+    points = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+    points[:, :2] = shoulder
+    for offset, indices in ((0.0, (11, 13, 15, 23, 25, 27)), (12.0, (12, 14, 16, 24, 26, 28))):
+        for index, xy in zip(indices, (shoulder, elbow, wrist, hip, knee, ankle)):
+            points[index, :2] = (xy[0] + offset, xy[1])
+    points[:, :2] += rng.normal(0.0, noise, (NUM_LANDMARKS, 2))
+    points[:, :2] /= SCALE
+    points[:, 3] = 1.0
+    return points
+
+
+def synthetic_frame(exercise, t, rng, noise=2.0):
+    """合成一帧侧面视角的关键点：深蹲膝盖在 170°～80° 之间、俯卧撑手肘在 165°～80° 之间周期变化"""
+    phase = 0.5 + 0.5 * math.cos(2 * math.pi * t / 2.0)  # 1 为上位，0 为下位
+    if exercise == "squat":
+        knee_angle = 80 + 90 * phase
+        a = math.radians((180 - knee_angle) / 2)
+        ankle = np.array([640.0, 650.0])
+        knee = ankle + 160 * np.array([math.sin(a), -math.cos(a)])
+        hip = knee + 160 * np.array([-math.sin(a), -math.cos(a)])
+        lean = math.radians(10 + 25 * (1 - phase))
+        shoulder = hip + 220 * np.array([math.sin(lean), -math.cos(lean)])
+        elbow = shoulder + np.array([20.0, 110.0])
+        wrist = elbow + np.array([40.0, 100.0])
+    else:
+        elbow_angle = 80 + 85 * phase
+        b = math.radians((180 - elbow_angle) / 2)
+        wrist = np.array([900.0, 620.0])
+        elbow = wrist + 110 * np.array([-math.sin(b), -math.cos(b)])
+        shoulder = elbow + 110 * np.array([math.sin(b), -math.cos(b)])
+        ankle = np.array([300.0, 610.0])
+        hip = ankle + 0.55 * (shoulder - ankle)
+        knee = ankle + 0.27 * (shoulder - ankle)
+    return _pose(shoulder, elbow, wrist, hip, knee, ankle, rng, noise)
+
+
+def synthetic_stream(segments, fps=30.0, seed=0):
+    """按 [(运动, 秒数)] 依次生成一段序列，返回 (points, timestamps, labels)"""
+    rng = np.random.default_rng(seed)
+    points, timestamps, labels = [], [], []
+    t = 0.0
+    for exercise, seconds in segments:
+        for i in range(int(seconds * fps)):
+            points.append(synthetic_frame(exercise, i / fps, rng))
+            timestamps.append(t)
+            labels.append(exercise)
+            t += 1.0 / fps
+    return np.stack(points), np.array(timestamps), np.array(labels)
+
+
+def load_stream(path, exercise=None):
+    """读取 .npz 关键点序列，没有逐帧标注时整段使用 exercise"""
+    with np.load(path) as data:
+        points, timestamps = data["points"], data["timestamps"]
+        labels = data["labels"].astype(str) if "labels" in data else np.full(len(points), exercise)
+    return points, timestamps, labels
+
+
+def evaluate(points, timestamps, labels, classifier):
+    """回放一段序列，返回逐帧预测和每帧耗时（秒）"""
+    classifier.clear()
+    predictions = []
+    durations = np.empty(len(points))
+    for i, (frame, timestamp) in enumerate(zip(points, timestamps)):
+        start = time.perf_counter()
+        predictions.append(classifier.update(frame, float(timestamp), SCALE))
+        durations[i] = time.perf_counter() - start
+    return np.array(predictions, dtype=object), durations
+
+
+def switch_latencies(timestamps, labels, predictions):
+    """每次标注变化（包括开头）到识别结果跟上的秒数，直到下一次变化都没跟上时记为 None"""
+    latencies = []
+    changes = [0] + [i for i in range(1, len(labels)) if labels[i] != labels[i - 1]]
+    for n, start in enumerate(changes):
+        end = changes[n + 1] if n + 1 < len(changes) else len(labels)
+        hit = next((i for i in range(start, end) if predictions[i] == labels[i]), None)
+        latencies.append(None if hit is None else float(timestamps[hit] - timestamps[start]))
+    return latencies
+
+
+def window_features(points, timestamps, labels, classifier):
+    """回放序列并收集每帧的窗口特征，用于重新估计质心"""
+    classifier.clear()
+    rows = {}
+    for frame, timestamp, label in zip(points, timestamps, labels):
+        classifier.update(frame, float(timestamp), SCALE)
+        features = classifier.features()
+        if features is not None and classifier.label is not None:
+            rows.setdefault(str(label), []).append(features)
+    return rows
+
+
+def load_inputs(args):
+    """汇总评估用的序列：[(名称, points, timestamps, labels)]"""
+    streams = []
+    if args.synthetic:
+        segments = [("squat", 20), ("pushup", 20), ("squat", 10), ("pushup", 10)]
+        streams.append(("synthetic", *synthetic_stream(segments, fps=args.fps)))
+    for path in args.streams:
+        streams.append((path, *load_stream(path, args.exercise)))
+    if args.manifest:
+        with open(args.manifest, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                streams.append((row["path"], *load_stream(row["path"], row.get("exercise") or args.exercise)))
+    return streams
+
+
+def main():
+    parser = argparse.ArgumentParser(description="运动类型识别离线评估")
+    parser.add_argument("streams", nargs="*", help=".npz 关键点序列")
+    parser.add_argument("--exercise", choices=["squat", "pushup"], help="没有逐帧标注时整段使用的标签")
+    parser.add_argument("--manifest", help="包含 path,exercise 两列的 CSV 文件")
+    parser.add_argument("--synthetic", action="store_true", help="评估合成序列")
+    parser.add_argument("--fps", type=float, default=30.0, help="合成序列的帧率")
+    parser.add_argument("--fit", action="store_true", help="按标注重新估计各运动的特征质心")
+    args = parser.parse_args()
+
+    streams = load_inputs(args)
+    if not streams:
+        parser.error("没有需要评估的序列（可使用 --synthetic）")
+
+    classifier = ExerciseClassifier()
+    labels_order = classifier.labels
+    confusion = np.zeros((len(labels_order), len(labels_order) + 1), dtype=np.int64)
+    all_durations, all_latencies = [], []
+    fitted = {}
+
+    for name, points, timestamps, labels in streams:
+        predictions, durations = evaluate(points, timestamps, labels, classifier)
+        latencies = switch_latencies(timestamps, labels, predictions)
+        all_durations.append(durations)
+        all_latencies.extend(latencies)
+
+        known = np.array([label in labels_order for label in labels])
+        correct = np.sum(predictions[known] == labels[known])
+        print(f"{name}: {len(points)} 帧，准确率 {correct / max(1, known.sum()):.1%}，"
+              f"识别延迟 {['-' if x is None else f'{x:.2f}s' for x in latencies]}")
+
+        for label, prediction in zip(labels, predictions):
+            if label in labels_order:
+                column = labels_order.index(prediction) if prediction in labels_order else len(labels_order)
+                confusion[labels_order.index(label), column] += 1
+
+        if args.fit:
+            for label, rows in window_features(points, timestamps, labels, classifier).items():
+                fitted.setdefault(label, []).extend(rows)
+
+    print("\n混淆矩阵（行为标注，列为识别结果）")
+    header = "".join(f"{label:>10}" for label in labels_order + ("未识别",))
+    print(f"{'':<10}{header}")
+    for label, row in zip(labels_order, confusion):
+        print(f"{label:<10}" + "".join(f"{value:>10}" for value in row))
+
+    durations = np.concatenate(all_durations) * 1e6
+    print(f"\n单帧耗时: 平均 {durations.mean():.1f} µs，p99 {np.percentile(durations, 99):.1f} µs，"
+          f"最大 {durations.max():.1f} µs")
+    resolved = [x for x in all_latencies if x is not None]
+    if resolved:
+        print(f"识别延迟: 平均 {np.mean(resolved):.2f} 秒，最大 {max(resolved):.2f} 秒，"
+              f"未识别 {len(all_latencies) - len(resolved)} 段")
+
+    if args.fit:
+        print(f"\n重新估计的质心（{', '.join(FEATURE_NAMES)}）：")
+        for label, rows in sorted(fitted.items()):
+            centroid = np.mean(rows, axis=0)
+            print(f'    "{label}": ({", ".join(f"{value:.1f}" for value in centroid)}),')
+
+
+if __name__ == "__main__":
+    main()
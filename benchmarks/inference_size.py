@@ -0,0 +1,95 @@
+"""推理尺寸基准测试：比较不同推理尺寸下的帧率与计数准确度
+
+用法（在项目根目录下运行）：
+    python -m benchmarks.inference_size recording.mp4 --exercise squat --sizes 0 256 384 512 --expected 12
+
+尺寸 0 表示原始分辨率，作为角度误差的参考基准。特征角度和计数使用 exercise_engine 中与实时计数相同的规格
+（俯卧撑同样需要先在上位保持稳定完成校准）。
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from capture import VideoFileSource  # noqa: E402
+from exercise_engine import EXERCISES, ExerciseCounter, exercise_features  # noqa: E402
+from pose_utils import (DISPLAY_WIDTH, DISPLAY_HEIGHT, NUM_LANDMARKS, POSE_CONFIDENCE,  # noqa: E402
+                        landmarks_to_array, prepare_inference_image)
+
+
+def count_reps(angles, timestamps, exercise):
+    """按计数器相同的规格（阈值、校准和质量规则，见 exercise_engine）统计次数"""
+    counter = ExerciseCounter(EXERCISES[exercise])
+    for angle, timestamp in zip(angles.tolist(), timestamps.tolist()):
+        if not np.isnan(angle):
+            counter.update(angle, timestamp)
+    return counter.count
+
+
+def run_size(video_path, size, exercise, max_frames):
+    """以指定推理尺寸处理视频，返回逐帧特征角度、帧时间和推理耗时"""
+    source = VideoFileSource(video_path)
+    points, timestamps, elapsed = [], [], 0.0
+    confidence = POSE_CONFIDENCE[exercise]
+
+    with mp.solutions.pose.Pose(min_detection_confidence=confidence, min_tracking_confidence=confidence) as pose:
+        for frame in source:
+            if len(points) >= max_frames:
+                break
+            image = cv2.flip(frame.image, 1)
+
+            start = time.perf_counter()
+            results = pose.process(prepare_inference_image(image, size))
+            elapsed += time.perf_counter() - start
+
+            if results.pose_landmarks:
+                points.append(landmarks_to_array(results.pose_landmarks.landmark))
+            else:
+                points.append(np.full((NUM_LANDMARKS, 4), np.nan, dtype=np.float32))
+            timestamps.append(frame.timestamp)
+
+    source.release()
+    if not points:
+        return np.empty(0), np.empty(0), elapsed
+    # 整段一次批量计算，角度坐标系与实时计数相同
+    angles = exercise_features(np.stack(points), (DISPLAY_WIDTH, DISPLAY_HEIGHT))[exercise]
+    return angles, np.array(timestamps), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="推理尺寸基准测试")
+    parser.add_argument("video", help="录制的训练视频")
+    parser.add_argument("--exercise", choices=sorted(EXERCISES), default="squat")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[0, 256, 384, 512])
+    parser.add_argument("--max-frames", type=int, default=600)
+    parser.add_argument("--expected", type=int, default=None, help="人工标注的实际次数")
+    args = parser.parse_args()
+
+    sizes = [0] + [s for s in args.sizes if s != 0]
+
+    reference = None
+    print(f"{'尺寸':>6} {'帧数':>6} {'FPS':>8} {'计数':>6} {'角度误差':>10} {'计数误差':>8}")
+    for size in sizes:
+        angles, timestamps, elapsed = run_size(args.video, size, args.exercise, args.max_frames)
+        if reference is None:
+            reference, reference_timestamps = angles, timestamps
+
+        fps = len(angles) / elapsed if elapsed > 0 else 0.0
+        reps = count_reps(angles, timestamps, args.exercise)
+        both = ~np.isnan(angles) & ~np.isnan(reference[:len(angles)])
+        angle_error = float(np.mean(np.abs(angles[both] - reference[:len(angles)][both]))) if both.any() else float("nan")
+        expected = (args.expected if args.expected is not None
+                    else count_reps(reference, reference_timestamps, args.exercise))
+
+        label = "原始" if size == 0 else str(size)
+        print(f"{label:>6} {len(angles):>6} {fps:>8.1f} {reps:>6} {angle_error:>9.2f}° {reps - expected:>+8d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""关节角计算微基准：对比逐个调用 calculate_angle 与批量 joint_angles
+
+用法（在项目根目录下运行）：
+    python -m benchmarks.joint_angles --frames 1000
+"""
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pose_utils import JOINT_ANGLES, JOINT_NAMES, NUM_LANDMARKS, joint_angles, landmarks_to_array  # noqa: E402
+
+
+class _Landmark:
+    """模拟 MediaPipe 的关键点对象"""
+
+    __slots__ = ("x", "y", "z", "visibility")
+
+    def __init__(self, x, y, z, visibility):
+        self.x, self.y, self.z, self.visibility = x, y, z, visibility
+
+
+def calculate_angle(a, b, c):
+    """原计数器中的逐次角度计算"""
+    a, b, c = np.array(a), np.array(b), np.array(c)
+    ba, bc = a - b, c - b
+    cosine_angle = np.dot(ba, bc) / (np.linalg.norm(ba) * np.linalg.norm(bc))
+    cosine_angle = np.clip(cosine_angle, -1.0, 1.0)
+    return np.degrees(np.arccos(cosine_angle))
+
+
+def per_call_angles(landmarks):
+    """原实现：每个关节分别取坐标、构造列表并调用 calculate_angle"""
+    return [calculate_angle([landmarks[a].x, landmarks[a].y],
+                            [landmarks[b].x, landmarks[b].y],
+                            [landmarks[c].x, landmarks[c].y])
+            for a, b, c in JOINT_ANGLES.values()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="关节角计算微基准")
+    parser.add_argument("--frames", type=int, default=1000, help="模拟的帧数")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    stack = rng.random((args.frames, NUM_LANDMARKS, 4)).astype(np.float32)
+    frames = [[_Landmark(*map(float, row)) for row in points] for points in stack]
+
+    # 先确认两种实现结果一致
+    expected = np.array([per_call_angles(landmarks) for landmarks in frames])
+    actual = joint_angles(stack)
+    print(f"最大误差: {np.nanmax(np.abs(expected - actual)):.2e}°（{len(JOINT_NAMES)} 个关节）")
+
+    cases = {
+        "逐个调用 calculate_angle": lambda: [per_call_angles(landmarks) for landmarks in frames],
+        "每帧转换数组 + 批量计算": lambda: [joint_angles(landmarks_to_array(landmarks)) for landmarks in frames],
+        "仅批量计算 (33, 4)": lambda: [joint_angles(points) for points in stack],
+        "整段计算 (N, 33, 4)": lambda: joint_angles(stack),
+    }
+    baseline = None
+    for name, func in cases.items():
+        best = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        per_frame_us = best / args.frames * 1e6
+        baseline = baseline or per_frame_us
+        print(f"{name:<28} {per_frame_us:>9.2f} µs/帧  {baseline / per_frame_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
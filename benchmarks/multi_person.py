@@ -0,0 +1,112 @@
+"""多人计数基准：按画面人数（默认 1/2/4 人）统计每帧耗时
+
+计数阶段（躯干跟踪、批量关节角、每人的计数状态机）使用合成的多人关键点，不需要模型和视频；
+指定 --source 时另外对该视频用 PoseLandmarker（num_poses 取各人数）统计推理耗时和实际检测到的人数。
+
+用法（在项目根目录下运行）：
+    python -m benchmarks.multi_person --frames 2000
+    python -m benchmarks.multi_person --source 团体课.mp4 --model assets/models/pose_landmarker_lite.task
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.exercise_classifier import synthetic_frame  # noqa: E402
+from capture import open_source  # noqa: E402
+from multi_person import DEFAULT_MODEL, MULTI_INFERENCE_SIZE, MultiPersonCounter, MultiPoseEstimator  # noqa: E402
+from pose_utils import POSE_CONFIDENCE  # noqa: E402
+
+
+def synthetic_people(exercise, people, frames, fps=30.0, hold=6.0, seed=0):
+    """合成 people 个人同时训练的关键点：先在上位保持 hold 秒（俯卧撑需要校准），之后每人水平错开、动作相位不同
+
+    返回 [[(33, 4) 数组] * people] * frames。
+    """
+    rng = np.random.default_rng(seed)
+    stream = []
+    for i in range(frames):
+        persons = []
+        for person in range(people):
+            t = i / fps - hold
+            points = synthetic_frame(exercise, t + person * 0.3 if t > 0 else 0.0, rng)
+            # 只平移不缩放，关节角与单人相同
+            points[:, 0] += (person - (people - 1) / 2) * 0.3
+            persons.append(points)
+        stream.append(persons)
+    return stream
+
+
+def time_counting(exercise, people, frames, fps=30.0):
+    """计数阶段每帧耗时（秒）的数组和总次数"""
+    stream = synthetic_people(exercise, people, frames, fps)
+    counter = MultiPersonCounter(exercise)
+    durations = np.empty(frames)
+    for i, persons in enumerate(stream):
+        counter.clock.tick(i / fps)
+        start = time.perf_counter()
+        counter.update(persons)
+        durations[i] = time.perf_counter() - start
+    return durations, counter.counter
+
+
+def time_inference(args, num_poses):
+    """PoseLandmarker 每帧推理耗时（秒）和平均检测到的人数"""
+    estimator = MultiPoseEstimator(args.model, num_poses=num_poses, confidence=POSE_CONFIDENCE[args.exercise],
+                                   inference_size=args.inference_size)
+    source = open_source(args.source)
+    durations, detected = [], []
+    try:
+        for frame in source:
+            if len(durations) >= args.frames:
+                break
+            start = time.perf_counter()
+            persons = estimator.process(frame.image, frame.timestamp)
+            durations.append(time.perf_counter() - start)
+            detected.append(len(persons))
+    finally:
+        source.release()
+        estimator.close()
+    return np.array(durations), float(np.mean(detected)) if detected else 0.0
+
+
+def print_row(label, durations, people):
+    ms = durations * 1000
+    print(f"{label:<8} 平均 {ms.mean():8.3f} ms  p95 {np.percentile(ms, 95):8.3f} ms  "
+          f"每人 {ms.mean() / max(people, 1e-9):8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多人计数耗时基准")
+    parser.add_argument("--exercise", choices=["squat", "pushup"], default="squat")
+    parser.add_argument("--people", type=int, nargs="+", default=[1, 2, 4], help="画面人数")
+    parser.add_argument("--frames", type=int, default=1000, help="每种人数统计的帧数")
+    parser.add_argument("--source", help="统计 PoseLandmarker 推理耗时所用的视频（不指定时只统计计数阶段）")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="PoseLandmarker 模型文件（.task）")
+    parser.add_argument("--inference-size", type=int, default=MULTI_INFERENCE_SIZE,
+                        help="姿态推理图像的长边像素，0 表示使用原始分辨率")
+    args = parser.parse_args()
+
+    print(f"计数阶段（合成关键点，{args.exercise}，每种人数 {args.frames} 帧）")
+    for people in args.people:
+        durations, count = time_counting(args.exercise, people, args.frames)
+        print_row(f"{people} 人", durations, people)
+        print(f"         共计数 {count} 次")
+
+    if args.source:
+        print(f"\nPoseLandmarker 推理（{args.source}，inference_size={args.inference_size}）")
+        for num_poses in args.people:
+            durations, detected = time_inference(args, num_poses)
+            if not len(durations):
+                print(f"num_poses={num_poses}: 没有读到帧")
+                continue
+            print_row(f"{num_poses} 人", durations, detected)
+            print(f"         平均检测到 {detected:.1f} 人")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""文字叠加基准：对比每帧 cv2.putText 与预先光栅化的文字贴图（精灵缓存）的耗时和像素差异
+
+计数器画面直接使用 cv2.putText；这里保留曾尝试过的精灵缓存实现作为对照，用来复现
+"putText 更快、且缓存贴图与 putText 的像素不完全一致" 的测量结果。
+
+用法（在项目根目录下运行）：
+    python -m benchmarks.overlay --frames 500
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pose_utils import DISPLAY_WIDTH, DISPLAY_HEIGHT  # noqa: E402
+
+TRIPLEX, SIMPLEX = cv2.FONT_HERSHEY_TRIPLEX, cv2.FONT_HERSHEY_SIMPLEX
+
+# 计数器画面中典型的一帧文字：(文字, 位置, 字体, 字号, 颜色, 线宽, 线型)，位置为 None 表示水平居中
+SCENES = {
+    "深蹲倒计时": [
+        ("3", None, TRIPLEX, 8, (160, 145, 246), 15, cv2.LINE_8),
+    ],
+    "深蹲计数": [
+        ("Squats: 12", (50, 100), TRIPLEX, 2, (155, 247, 255), 4, cv2.LINE_8),
+        ("Status: down", (50, 150), TRIPLEX, 1, (255, 255, 255), 2, cv2.LINE_8),
+    ],
+    "俯卧撑计数": [
+        ("Status: DONE", (10, 30), SIMPLEX, 0.8, (155, 247, 255), 2, cv2.LINE_AA),
+        ("Pushups: 12", (DISPLAY_WIDTH - 540, 70), SIMPLEX, 2.5, (155, 247, 255), 5, cv2.LINE_AA),
+        ("Good depth! ", (10, DISPLAY_HEIGHT - 80), TRIPLEX, 1.2, (155, 247, 255), 2, cv2.LINE_AA),
+    ],
+}
+
+
+class TextSprite:
+    """预先光栅化的文字：非抗锯齿文字用布尔遮罩直接赋色，抗锯齿文字按 alpha 混合"""
+
+    def __init__(self, text, font, scale, color, thickness, line_type):
+        (width, height), baseline = cv2.getTextSize(text, font, scale, thickness)
+        pad = thickness + 2
+        mask = np.zeros((height + baseline + 2 * pad, width + 2 * pad), dtype=np.uint8)
+        self.origin = (pad, pad + height)
+        cv2.putText(mask, text, self.origin, font, scale, 255, thickness, line_type)
+        self.width = width
+        if line_type == cv2.LINE_AA:
+            self.mask = None
+            self.alpha = (mask.astype(np.float32) / 255.0)[:, :, None]
+            self.color = self.alpha * np.array(color, dtype=np.float32)
+        else:
+            self.mask = mask > 0
+            self.alpha = None
+            self.color = np.array(color, dtype=np.uint8)
+
+    def blit(self, image, org):
+        """把文字贴到图像上，org 与 cv2.putText 的含义相同（基线左端）"""
+        x0, y0 = org[0] - self.origin[0], org[1] - self.origin[1]
+        src = self.mask if self.mask is not None else self.alpha
+        h, w = src.shape[:2]
+        left, top = max(0, -x0), max(0, -y0)
+        right, bottom = min(w, image.shape[1] - x0), min(h, image.shape[0] - y0)
+        if left >= right or top >= bottom:
+            return
+        region = image[y0 + top:y0 + bottom, x0 + left:x0 + right]
+        if self.mask is not None:
+            region[self.mask[top:bottom, left:right]] = self.color
+        else:
+            alpha = self.alpha[top:bottom, left:right]
+            region[:] = (region * (1.0 - alpha) + self.color[top:bottom, left:right]).astype(np.uint8)
+
+
+def draw_direct(image, items):
+    """计数器的实现：每帧调用 getTextSize / putText"""
+    for text, org, font, scale, color, thickness, line_type in items:
+        if org is None:
+            width = cv2.getTextSize(text, font, scale, thickness)[0][0]
+            org = ((image.shape[1] - width) // 2, image.shape[0] // 2)
+        cv2.putText(image, text, org, font, scale, color, thickness, line_type)
+
+
+def draw_cached(sprites, image, items):
+    """对照实现：每种文字首次光栅化，之后只贴图"""
+    for item in items:
+        text, org, font, scale, color, thickness, line_type = item
+        key = (text, font, scale, color, thickness, line_type)
+        sprite = sprites.get(key)
+        if sprite is None:
+            sprite = sprites[key] = TextSprite(text, font, scale, color, thickness, line_type)
+        if org is None:
+            org = ((image.shape[1] - sprite.width) // 2, image.shape[0] // 2)
+        sprite.blit(image, org)
+
+
+def measure(draw, frames, background):
+    """返回每帧平均耗时（微秒），图像复制不计入"""
+    elapsed = 0.0
+    for _ in range(frames):
+        image = background.copy()
+        start = time.perf_counter()
+        draw(image)
+        elapsed += time.perf_counter() - start
+    return elapsed / frames * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="文字叠加耗时基准")
+    parser.add_argument("--frames", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    background = rng.integers(0, 255, (DISPLAY_HEIGHT, DISPLAY_WIDTH, 3), dtype=np.uint8)
+
+    print(f"{'场景':<10} {'putText':>12} {'缓存贴图':>12} {'缓存/putText':>12} {'差异像素':>10}")
+    for name, items in SCENES.items():
+        sprites = {}
+        direct = measure(lambda image: draw_direct(image, items), args.frames, background)
+        cached = measure(lambda image: draw_cached(sprites, image, items), args.frames, background)
+
+        # 两种方式绘制结果的差异（通道差大于 1 的像素数）
+        expected, actual = background.copy(), background.copy()
+        draw_direct(expected, items)
+        draw_cached(sprites, actual, items)
+        diff = int(np.count_nonzero(np.any(np.abs(expected.astype(int) - actual) > 1, axis=2)))
+
+        print(f"{name:<10} {direct:>10.1f}µs {cached:>10.1f}µs {cached / direct:>11.2f}x {diff:>10d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""帧处理流水线分阶段耗时基准：分别统计采集、镜像、缩放、颜色转换、姿态推理、关节角、状态机、骨架绘制、
+文字叠加和显示每一阶段的 p50/p95/p99 延迟与整体吞吐量，结果保存为 JSON，便于在不同提交之间对比
+
+各阶段与 squat_counter / pushup_counter 的实时循环一致。画面中检测不到人（如默认的合成画面）时，
+关节角及之后的阶段改用合成的（或 --landmarks 指定的录制的）关键点，保证每一阶段都有耗时数据。
+
+用法（在项目根目录下运行）：
+    python -m benchmarks.pipeline --frames 300 --json data/benchmarks/pipeline.json
+    python -m benchmarks.pipeline --source 录像.mp4 --exercise pushup --landmarks data/recordings/pushup-x.lmk
+    python -m benchmarks.pipeline --compare data/benchmarks/pipeline.json --max-regression 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import cv2
+import mediapipe as mp
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from backends import NullBeepBackend  # noqa: E402
+from benchmarks.exercise_classifier import synthetic_stream  # noqa: E402
+from capture import FrameClock, NullSource, open_source  # noqa: E402
+from exercise_engine import EXERCISES  # noqa: E402
+from landmark_log import read_recording  # noqa: E402
+from pose_utils import (DISPLAY_WIDTH, DISPLAY_HEIGHT, INFERENCE_SIZE, POSE_CONFIDENCE,  # noqa: E402
+                        joint_angles, landmarks_to_array)
+from pushup_counter import AutoCalibrationPushupCounter  # noqa: E402
+from speech import create_speech_service  # noqa: E402
+from squat_counter import SquatCounter  # noqa: E402
+
+# 阶段名称按流水线顺序排列
+STAGES = ("capture", "flip", "inference_resize", "bgr_to_rgb", "pose", "landmarks", "angles",
+          "state_machine", "display_resize", "draw_landmarks", "overlay", "display")
+
+PERCENTILES = (50, 95, 99)
+
+mp_pose = mp.solutions.pose
+mp_drawing = mp.solutions.drawing_utils
+LANDMARK_SPEC = mp_drawing.DrawingSpec(color=(155, 247, 255), thickness=2, circle_radius=2)
+CONNECTION_SPEC = mp_drawing.DrawingSpec(color=(160, 145, 246), thickness=2, circle_radius=2)
+
+
+def to_landmark_list(points):
+    """(33, 4) 关键点数组转换为 MediaPipe 的 NormalizedLandmarkList，用于绘制"""
+    landmarks = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z, visibility in points.tolist():
+        landmarks.landmark.add(x=x, y=y, z=z, visibility=visibility)
+    return landmarks
+
+
+def fallback_landmarks(exercise, path=None):
+    """检测不到人时使用的关键点序列：录制文件中有人的帧，或合成的训练动作"""
+    if path:
+        points, _ = read_recording(path)
+        points = points[~np.isnan(points[..., 0]).all(axis=1)]
+        if len(points):
+            return points
+    points, _, _ = synthetic_stream([(exercise, 10)])
+    return points
+
+
+class Counter:
+    """把两种计数器统一为 状态机 / 叠加层 两个阶段"""
+
+    def __init__(self, exercise, clock):
+        self.exercise = exercise
+        if exercise == "squat":
+            self.counter = SquatCounter(source=NullSource(), speech=create_speech_service("null"), clock=clock)
+        else:
+            self.counter = AutoCalibrationPushupCounter(speech=create_speech_service("null"),
+                                                        beeper=NullBeepBackend(), clock=clock)
+        self.scale = EXERCISES[exercise].angle_scale((DISPLAY_WIDTH, DISPLAY_HEIGHT))
+        self._arm_angles = None
+
+    def update(self, angles):
+        result = self.counter.update_angles(angles)
+        if self.exercise == "pushup":
+            self._arm_angles = result
+
+    def draw(self, image):
+        if self.exercise == "squat":
+            self.counter.display_info(image)
+        else:
+            self.counter.draw_calibration_display(image, *self._arm_angles)
+
+
+def run(args):
+    """逐帧运行流水线，返回 {阶段: 每帧耗时数组（秒）}，未执行的帧为 NaN"""
+    source = open_source(args.source)
+    fallback = fallback_landmarks(args.exercise, args.landmarks)
+    clock = FrameClock()
+    counter = Counter(args.exercise, clock)
+    timings = {stage: np.full(args.frames, np.nan) for stage in STAGES}
+    detected = 0
+
+    if args.display:
+        cv2.namedWindow("Pipeline Benchmark", cv2.WINDOW_NORMAL)
+
+    confidence = POSE_CONFIDENCE[args.exercise]
+    with mp_pose.Pose(model_complexity=args.model_complexity, min_detection_confidence=confidence,
+                      min_tracking_confidence=confidence) as pose:
+        total = args.warmup + args.frames
+        for n in range(total):
+            row = n - args.warmup
+            # 每个阶段结束时记一次时间，相邻两次之差即该阶段耗时
+            stamps = [time.perf_counter()]
+            mark = lambda: stamps.append(time.perf_counter())  # noqa: E731
+
+            frame = source.read()
+            if frame is None:
+                break
+            clock.tick(frame.timestamp)
+            mark()
+            image = cv2.flip(frame.image, 1)
+            mark()
+            # 与 prepare_inference_image 相同，拆开以分别计时缩放和颜色转换
+            small = image
+            if args.inference_size and max(image.shape[:2]) > args.inference_size:
+                scale = args.inference_size / max(image.shape[:2])
+                size = (max(1, round(image.shape[1] * scale)), max(1, round(image.shape[0] * scale)))
+                small = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+            mark()
+            rgb = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+            rgb.flags.writeable = False
+            mark()
+            results = pose.process(rgb)
+            mark()
+            if results.pose_landmarks:
+                points = landmarks_to_array(results.pose_landmarks.landmark)
+                landmarks = results.pose_landmarks
+                detected += row >= 0
+            else:
+                points = fallback[n % len(fallback)]
+                landmarks = to_landmark_list(points)
+            mark()
+            angles = joint_angles(points, counter.scale)
+            mark()
+            counter.update(angles)
+            mark()
+            display = cv2.resize(image, (DISPLAY_WIDTH, DISPLAY_HEIGHT))
+            mark()
+            mp_drawing.draw_landmarks(display, landmarks, mp_pose.POSE_CONNECTIONS, LANDMARK_SPEC, CONNECTION_SPEC)
+            mark()
+            counter.draw(display)
+            mark()
+            if args.display:
+                cv2.imshow("Pipeline Benchmark", display)
+                cv2.waitKey(1)
+                mark()
+
+            if row >= 0:
+                for stage, start, end in zip(STAGES, stamps, stamps[1:]):
+                    timings[stage][row] = end - start
+
+    source.release()
+    if args.display:
+        cv2.destroyAllWindows()
+    return timings, detected
+
+
+def summarize(timings):
+    """统计各阶段和整帧的耗时（毫秒）与吞吐量"""
+    stages = {}
+    for stage, values in timings.items():
+        values = values[~np.isnan(values)] * 1000
+        if not len(values):
+            continue
+        stages[stage] = {"mean": float(values.mean()), "max": float(values.max()),
+                         **{f"p{p}": float(np.percentile(values, p)) for p in PERCENTILES}}
+
+    per_frame = np.nansum(np.vstack(list(timings.values())), axis=0)
+    per_frame = per_frame[per_frame > 0] * 1000
+    total = {"mean": float(per_frame.mean()), "max": float(per_frame.max()),
+             **{f"p{p}": float(np.percentile(per_frame, p)) for p in PERCENTILES}}
+    return stages, total, len(per_frame) / (per_frame.sum() / 1000)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(report, baseline, max_regression):
+    """与基线对比各阶段的 p50，返回超出允许退化比例的阶段"""
+    regressions = []
+    print(f"\n与基线 {baseline['meta'].get('commit') or '?'} 对比（p50）")
+    for stage, stats in list(report["stages"].items()) + [("total", report["total"])]:
+        before = baseline["stages"].get(stage) if stage != "total" else baseline.get("total")
+        if not before or before["p50"] <= 0:
+            continue
+        change = stats["p50"] / before["p50"] - 1
+        flag = ""
+        # 耗时很短的阶段测量噪声较大，变化小于 0.05 ms 不计为退化
+        if change > max_regression and stats["p50"] - before["p50"] > 0.05:
+            regressions.append(stage)
+            flag = "  退化"
+        print(f"{stage:<18} {before['p50']:>9.3f} -> {stats['p50']:>9.3f} ms {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="帧处理流水线分阶段耗时基准")
+    parser.add_argument("--source", default="synthetic",
+                        help="帧源：synthetic（默认）、摄像头编号、视频文件或图片目录")
+    parser.add_argument("--exercise", choices=["squat", "pushup"], default="squat")
+    parser.add_argument("--landmarks", help="检测不到人时使用的关键点录制（.lmk），默认使用合成动作")
+    parser.add_argument("--frames", type=int, default=300, help="计入统计的帧数")
+    parser.add_argument("--warmup", type=int, default=10, help="预热帧数（不计入统计）")
+    parser.add_argument("--inference-size", type=int, default=INFERENCE_SIZE,
+                        help="姿态推理图像的长边像素，0 表示使用原始分辨率")
+    parser.add_argument("--model-complexity", type=int, choices=[0, 1, 2], default=1)
+    parser.add_argument("--display", action="store_true", help="显示画面并统计 imshow/waitKey 的耗时")
+    parser.add_argument("--json", help="保存结果到 JSON 文件")
+    parser.add_argument("--compare", help="与之前保存的 JSON 结果对比")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="对比时 p50 允许增加的比例，超出时返回非零退出码")
+    args = parser.parse_args()
+
+    timings, detected = run(args)
+    stages, total, fps = summarize(timings)
+    frames = int(np.sum(~np.isnan(timings["capture"])))
+
+    print(f"{frames} 帧（检测到人 {detected} 帧），source={args.source}，exercise={args.exercise}，"
+          f"inference_size={args.inference_size}，model_complexity={args.model_complexity}")
+    print(f"{'阶段':<16} {'平均':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'最大':>9}  (ms)")
+    for stage, stats in list(stages.items()) + [("total", total)]:
+        print(f"{stage:<18} {stats['mean']:>9.3f} {stats['p50']:>9.3f} {stats['p95']:>9.3f} "
+              f"{stats['p99']:>9.3f} {stats['max']:>9.3f}")
+    print(f"吞吐量: {fps:.1f} FPS")
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "opencv": cv2.__version__,
+            "mediapipe": mp.__version__,
+            "source": args.source,
+            "exercise": args.exercise,
+            "inference_size": args.inference_size,
+            "model_complexity": args.model_complexity,
+            "frames": frames,
+            "detected_frames": int(detected),
+        },
+        "stages": stages,
+        "total": total,
+        "fps": fps,
+    }
+    if args.json:
+        directory = os.path.dirname(args.json)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存到 {args.json}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.max_regression)
+        if regressions:
+            print(f"性能退化: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""启动耗时基准：对比每次训练新启动计数脚本与使用常驻计数进程的首帧时间
+
+首帧时间指从发起训练到计数器处理完第一帧（完成一次姿态推理）所用的时间。
+
+用法（在项目根目录下运行）：
+    python -m benchmarks.startup --runs 5
+    python -m benchmarks.startup --source 0        # 使用摄像头
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from control_channel import ControlServer, WorkerProcess  # noqa: E402
+
+
+class FirstFrameWatcher:
+    """监听控制通道上的 first_frame 事件"""
+
+    def __init__(self):
+        self.event = threading.Event()
+
+    def __call__(self, message_type, payload):
+        if message_type == "events" and any(e["kind"] == "first_frame" for e in payload["events"]):
+            self.event.set()
+
+
+def cold_start(script, script_args, timeout):
+    """新启动一个计数脚本，返回首帧时间（秒）"""
+    watcher = FirstFrameWatcher()
+    control = ControlServer(on_message=watcher)
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, script, *script_args], cwd=BASE_DIR,
+                               env=control.child_env(), stdout=subprocess.DEVNULL)
+    try:
+        deadline = start + timeout
+        while not watcher.event.wait(0.05):
+            if process.poll() is not None:
+                raise RuntimeError(f"计数脚本提前退出（返回码 {process.returncode}）")
+            if time.perf_counter() > deadline:
+                raise RuntimeError("等待首帧超时")
+        return time.perf_counter() - start
+    finally:
+        control.send("stop")
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        control.close()
+
+
+def warm_start(worker, watcher, exercise, timeout):
+    """在常驻进程中开始一次训练，返回首帧时间（秒）"""
+    watcher.event.clear()
+    start = time.perf_counter()
+    session = worker.start_session(exercise)
+    try:
+        if not watcher.event.wait(timeout):
+            raise RuntimeError("等待首帧超时")
+        return time.perf_counter() - start
+    finally:
+        worker.control.send("stop")
+        session.wait(timeout=5)
+
+
+def summarize(name, samples):
+    print(f"{name:<14} 中位数 {statistics.median(samples) * 1000:>8.0f} ms   "
+          f"最小 {min(samples) * 1000:>8.0f} ms   最大 {max(samples) * 1000:>8.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动耗时基准")
+    parser.add_argument("--exercise", choices=["squat", "pushup"], default="squat")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--source", default="synthetic", help="帧源，默认使用合成画面")
+    parser.add_argument("--model-complexity", type=int, choices=[0, 1, 2], default=1)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    common_args = ["--source", args.source, "--headless", "--speech", "null",
+                   "--model-complexity", str(args.model_complexity)]
+    script = os.path.join(BASE_DIR, f"{args.exercise}_counter.py")
+
+    cold = [cold_start(script, common_args, args.timeout) for _ in range(args.runs)]
+
+    watcher = FirstFrameWatcher()
+    worker = WorkerProcess(os.path.join(BASE_DIR, "counter_worker.py"), on_message=watcher,
+                           args=common_args, cwd=BASE_DIR)
+    try:
+        deadline = time.perf_counter() + args.timeout
+        while not worker.ready.wait(0.05):
+            if not worker.is_alive():
+                raise RuntimeError("常驻计数进程提前退出")
+            if time.perf_counter() > deadline:
+                raise RuntimeError("常驻计数进程启动超时")
+        warm = [warm_start(worker, watcher, args.exercise, args.timeout) for _ in range(args.runs)]
+    finally:
+        worker.close()
+
+    summarize("每次新启动", cold)
+    summarize("常驻进程", warm)
+    print(f"首帧时间缩短 {statistics.median(cold) / statistics.median(warm):.1f} 倍")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""主程序启动耗时检查：用 -X importtime 统计导入 main.py 的耗时，超出预算时返回非零退出码
+
+同时检查启动时不会导入重量级模块（pygame、PIL、win32com、OpenCV、MediaPipe、NumPy），
+有图形环境时还会测量从启动进程到主窗口显示的时间。
+
+用法（在项目根目录下运行）：
+    python -m benchmarks.startup_budget
+    python -m benchmarks.startup_budget --import-budget 150 --window-budget 800
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 这些模块只能在第一次用到时导入
+HEAVY_MODULES = ("pygame", "PIL", "win32com", "pythoncom", "cv2", "mediapipe", "numpy")
+
+WINDOW_SCRIPT = """
+import tkinter as tk
+import main
+root = tk.Tk()
+app = main.FitnessAppUI(root)
+root.update()
+print("shown", flush=True)
+if app.worker is not None:
+    app.worker.terminate()
+root.destroy()
+"""
+
+
+def parse_importtime(stderr):
+    """解析 -X importtime 输出，返回 [(模块名, 自身微秒, 累计微秒, 缩进层级)]"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue  # 表头
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), self_us, cumulative_us, depth))
+    return rows
+
+
+def measure_import(module):
+    """在新进程中导入模块，返回解析后的 importtime 数据"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=BASE_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def measure_window(timeout):
+    """返回从启动进程到主窗口显示的秒数，没有图形环境时返回 None"""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", WINDOW_SCRIPT], cwd=BASE_DIR,
+                            capture_output=True, text=True, timeout=timeout)
+    if "shown" not in result.stdout:
+        return None
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="主程序启动耗时检查")
+    parser.add_argument("--import-budget", type=float, default=200.0, help="导入 main.py 的耗时预算（毫秒）")
+    parser.add_argument("--window-budget", type=float, default=800.0, help="显示主窗口的耗时预算（毫秒）")
+    parser.add_argument("--top", type=int, default=10, help="列出耗时最多的前 N 个模块")
+    args = parser.parse_args()
+
+    failures = []
+    rows = measure_import("main")
+    main_index = next(i for i, row in enumerate(rows) if row[0] == "main" and row[3] == 0)
+    total_ms = rows[main_index][2] / 1000
+
+    print(f"导入 main.py: {total_ms:.1f} ms（预算 {args.import_budget:.0f} ms）")
+    print(f"{'模块':<40} {'累计 ms':>10}")
+    # importtime 先输出子模块再输出父模块，main 之前、上一个顶层模块之后缩进一层的即为 main 直接导入的模块
+    children = []
+    for row in reversed(rows[:main_index]):
+        if row[3] == 0:
+            break
+        if row[3] == 1:
+            children.append(row)
+    top_level = sorted(children, key=lambda r: -r[2])
+    for name, _, cumulative, _ in top_level[:args.top]:
+        print(f"{name:<40} {cumulative / 1000:>10.1f}")
+    if total_ms > args.import_budget:
+        failures.append(f"导入耗时 {total_ms:.1f} ms 超出预算 {args.import_budget:.0f} ms")
+
+    imported = {name.split(".")[0] for name, _, _, _ in rows[:main_index + 1]}
+    heavy = sorted(imported.intersection(HEAVY_MODULES))
+    if heavy:
+        failures.append(f"启动时导入了重量级模块: {', '.join(heavy)}")
+
+    window = measure_window(timeout=30)
+    if window is None:
+        print("没有图形环境，跳过主窗口显示耗时检查")
+    else:
+        print(f"显示主窗口: {window * 1000:.0f} ms（预算 {args.window_budget:.0f} ms）")
+        if window * 1000 > args.window_budget:
+            failures.append(f"显示主窗口耗时 {window * 1000:.0f} ms 超出预算 {args.window_budget:.0f} ms")
+
+    for failure in failures:
+        print(f"失败: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+class Frame:
+    """一帧图像及其采集时间戳（秒）"""
+
+    __slots__ = ("image", "timestamp", "index")
+
+    def __init__(self, image, timestamp, index):
+        self.image = image
+        self.timestamp = timestamp
+        self.index = index
+
+
+class FrameClock:
+    """以最近一帧的采集时间作为当前时间，使录像可以快于实时处理"""
+
+    def __init__(self):
+        self.now = time.time()
+
+    def tick(self, timestamp):
+        """推进到新一帧的采集时间"""
+        self.now = timestamp
+
+    def __call__(self):
+        return self.now
+
+
+class FrameSource:
+    """帧源基类：read() 返回 Frame，读完或出错时返回 None
+
+    离线源返回 None 表示已读完；实时源返回 None 只表示这一次读取失败，是否结束以 isOpened() 为准。
+    """
+
+    # 实时源（摄像头）需要丢弃过期帧，离线源需要逐帧处理
+    live = False
+
+    def read(self):
+        raise NotImplementedError
+
+    def isOpened(self):
+        raise NotImplementedError
+
+    def release(self):
+        pass
+
+    def stats_text(self):
+        """返回采集统计信息，无统计时为空字符串"""
+        return ""
+
+    def __iter__(self):
+        while self.isOpened():
+            frame = self.read()
+            if frame is None:
+                break
+            yield frame
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class CameraSource(FrameSource):
+    """摄像头帧源"""
+
+    live = True
+
+    def __init__(self, index=0):
+        self.cap = cv2.VideoCapture(index)
+        self._index = 0
+
+    def read(self):
+        ret, image = self.cap.read()
+        if not ret:
+            return None
+        frame = Frame(image, time.time(), self._index)
+        self._index += 1
+        return frame
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource(FrameSource):
+    """视频文件帧源，时间戳取自视频本身，不受处理速度影响"""
+
+    def __init__(self, path):
+        self.path = path
+        self.cap = cv2.VideoCapture(path)
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self._index = 0
+
+    def read(self):
+        ret, image = self.cap.read()
+        if not ret:
+            return None
+        timestamp = self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+        if timestamp <= 0 and self._index > 0:
+            timestamp = self._index / self.fps
+        frame = Frame(image, timestamp, self._index)
+        self._index += 1
+        return frame
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageDirectorySource(FrameSource):
+    """图片目录帧源，按文件名顺序读取，按固定帧率生成时间戳"""
+
+    EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+    def __init__(self, path, fps=30.0):
+        self.path = path
+        self.fps = fps
+        self.files = sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if name.lower().endswith(self.EXTENSIONS)
+        )
+        self._index = 0
+
+    def read(self):
+        while self._index < len(self.files):
+            index = self._index
+            self._index += 1
+            image = cv2.imread(self.files[index])
+            if image is not None:
+                return Frame(image, index / self.fps, index)
+        return None
+
+    def isOpened(self):
+        return self._index < len(self.files)
+
+
+class SyntheticSource(FrameSource):
+    """合成帧源：生成带移动圆点的测试画面，用于无摄像头的机器上做基准测试"""
+
+    def __init__(self, width=1280, height=720, fps=30.0, num_frames=300):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.num_frames = num_frames
+        self._index = 0
+
+        # 背景只生成一次，每帧复制后绘制
+        gradient = np.linspace(0, 255, width, dtype=np.uint8)
+        self._background = np.dstack([np.tile(gradient, (height, 1))] * 3)
+
+    def read(self):
+        if not self.isOpened():
+            return None
+        index = self._index
+        self._index += 1
+
+        image = self._background.copy()
+        phase = 2 * np.pi * index / self.fps
+        center = (int(self.width / 2 + self.width / 4 * np.sin(phase)),
+                  int(self.height / 2 + self.height / 4 * np.cos(phase)))
+        cv2.circle(image, center, self.height // 10, (160, 145, 246), -1)
+        return Frame(image, index / self.fps, index)
+
+    def isOpened(self):
+        return self.num_frames is None or self._index < self.num_frames
+
+
+class NullSource(FrameSource):
+    """不产生任何帧的帧源，只驱动计数状态机（如回放关键点录制）时使用"""
+
+    def read(self):
+        return None
+
+    def isOpened(self):
+        return False
+
+
+class LatestFrameCapture(FrameSource):
+    """后台线程从实时帧源采集，只保留最新一帧，来不及处理的旧帧直接丢弃
+
+    实时源偶尔读取失败（如摄像头掉一帧）时间隔 retry_interval 秒重试，
+    帧源已关闭或连续失败 max_read_failures 次才结束采集。
+    """
+
+    live = True
+
+    def __init__(self, source, max_read_failures=50, retry_interval=0.02):
+        self.source = source
+        self.max_read_failures = max_read_failures
+        self.retry_interval = retry_interval
+
+        # 最新帧缓冲区
+        self._cond = threading.Condition()
+        self._frame = None
+        self._captured_seq = 0
+        self._consumed_seq = 0
+        self._running = True
+
+        # 统计信息
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.read_failures = 0
+
+        self._thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._thread.start()
+
+    def _capture_loop(self):
+        """采集线程：持续读取帧源，用新帧覆盖未被消费的旧帧；帧源由本线程在退出时释放"""
+        try:
+            self._capture_frames()
+        finally:
+            with self._cond:
+                self._running = False
+                self._cond.notify_all()
+            self.source.release()
+
+    def _capture_frames(self):
+        failures = 0
+        while self._running:
+            frame = self.source.read()
+            if frame is None and self._should_retry(failures):
+                failures += 1
+                self.read_failures += 1
+                time.sleep(self.retry_interval)
+                continue
+            failures = 0
+            with self._cond:
+                if frame is None:
+                    break
+
+                # 上一帧还没被取走就被覆盖，记为丢帧
+                if self._captured_seq > self._consumed_seq:
+                    self.frames_dropped += 1
+                self._frame = frame
+                self._captured_seq += 1
+                self.frames_captured += 1
+                self._cond.notify_all()
+
+    def _should_retry(self, failures):
+        """读取失败时是否重试：只有仍打开的实时源才重试，离线源读不到帧即为结束"""
+        return (self._running and self.source.live and failures < self.max_read_failures
+                and self.source.isOpened())
+
+    def isOpened(self):
+        """采集是否仍在进行（或仍有未读取的帧）"""
+        with self._cond:
+            return self._running or self._captured_seq > self._consumed_seq
+
+    def read(self):
+        """阻塞直到有新帧，采集结束时返回 None"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._captured_seq > self._consumed_seq or not self._running)
+            if self._captured_seq > self._consumed_seq:
+                self._consumed_seq = self._captured_seq
+                return self._frame
+            return None
+
+    def release(self):
+        """停止采集线程；帧源由采集线程在当前 read() 返回后释放，不会在读取中途被释放"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+
+    def stats_text(self):
+        """返回采集统计信息"""
+        text = f"采集 {self.frames_captured} 帧，丢弃 {self.frames_dropped} 帧"
+        if self.read_failures:
+            text += f"，读取失败 {self.read_failures} 次"
+        return text
+
+
+def open_source(spec=None):
+    """根据参数创建帧源：摄像头编号、视频文件、图片目录或 "synthetic"
+
+    摄像头会包装为后台采集线程，离线源逐帧读取，不丢帧。
+    """
+    if spec is None or str(spec).isdigit():
+        return LatestFrameCapture(CameraSource(int(spec or 0)))
+    if spec == "synthetic":
+        return SyntheticSource()
+    if os.path.isdir(spec):
+        return ImageDirectorySource(spec)
+    return VideoFileSource(spec)
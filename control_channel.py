@@ -0,0 +1,275 @@
+"""主程序与计数子进程之间的本地控制通道
+
+主程序为每次训练新建一个只监听本机的 Listener，并通过环境变量把地址和一次性密钥传给子进程；
+子进程连接后双方收发带类型的消息：
+    主程序 -> 子进程: stop, reset
+    子进程 -> 主程序: start（开始计数）, ack（确认命令，附带当前计数）, events（实时事件，见 telemetry.py）
+常驻计数进程（counter_worker.py）另外使用：
+    主程序 -> 子进程: session（开始一次训练）, quit
+    子进程 -> 主程序: ready（模型已加载）
+每次训练使用新的地址和密钥，上一次训练残留的进程无法连入，也就不存在残留信号文件的问题。
+"""
+import binascii
+import os
+import subprocess
+import sys
+import threading
+from collections import deque
+from multiprocessing.connection import Client, Listener
+
+ENV_ADDRESS = "FITNESS_CONTROL_ADDRESS"
+ENV_AUTHKEY = "FITNESS_CONTROL_AUTHKEY"
+
+
+class ControlServer:
+    """主程序端：等待子进程连接，在后台线程中接收消息并回调 on_message(type, payload)"""
+
+    def __init__(self, on_message=None):
+        self.on_message = on_message
+        self._authkey = os.urandom(16)
+        self._listener = Listener(("127.0.0.1", 0), authkey=self._authkey)
+        self._conn = None
+        self._connected = threading.Event()
+        self._send_lock = threading.Lock()
+        self._closed = False
+
+        # 子进程最近一次报告的计数
+        self.last_count = None
+
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def child_env(self, env=None):
+        """返回传给子进程的环境变量"""
+        env = dict(os.environ if env is None else env)
+        host, port = self._listener.address
+        env[ENV_ADDRESS] = f"{host}:{port}"
+        env[ENV_AUTHKEY] = binascii.hexlify(self._authkey).decode("ascii")
+        return env
+
+    def _serve(self):
+        """接受连接并持续接收消息"""
+        try:
+            self._conn = self._listener.accept()
+        except Exception:
+            return
+        finally:
+            self._connected.set()
+
+        while not self._closed:
+            try:
+                message_type, payload = self._conn.recv()
+            except (EOFError, OSError):
+                break
+            if "count" in payload:
+                self.last_count = payload["count"]
+            if self.on_message:
+                self.on_message(message_type, payload)
+
+    def wait_connected(self, timeout=None):
+        """等待子进程连接"""
+        return self._connected.wait(timeout) and self._conn is not None
+
+    def send(self, message_type, **payload):
+        """向子进程发送命令，子进程尚未连接或已断开时返回 False"""
+        if not self.wait_connected(timeout=1.0):
+            return False
+        try:
+            with self._send_lock:
+                self._conn.send((message_type, payload))
+            return True
+        except (OSError, ValueError):
+            return False
+
+    def close(self):
+        """关闭通道"""
+        self._closed = True
+        try:
+            self._listener.close()
+        except Exception:
+            pass
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+
+
+class WorkerSession:
+    """常驻进程中的一次训练，提供与 subprocess.Popen 相同的 poll/wait/terminate 接口"""
+
+    def __init__(self, worker):
+        self.worker = worker
+        self.finished = threading.Event()
+
+    def poll(self):
+        return 0 if self.finished.is_set() else None
+
+    def wait(self, timeout=None):
+        if not self.finished.wait(timeout):
+            raise subprocess.TimeoutExpired("counter_worker", timeout)
+        return 0
+
+    def terminate(self):
+        """训练无响应时结束整个常驻进程，下一次训练会重新启动"""
+        self.worker.terminate()
+        self.finished.set()
+
+
+class WorkerProcess:
+    """主程序端：启动常驻计数进程，模型和摄像头在多次训练之间保持加载"""
+
+    def __init__(self, script_path, on_message=None, args=(), cwd=None):
+        self.on_message = on_message
+        self.ready = threading.Event()
+        self.session = None
+        self.control = ControlServer(on_message=self._handle_message)
+        self.process = subprocess.Popen(
+            [sys.executable, script_path, *args],
+            cwd=cwd,
+            env=self.control.child_env(),
+            creationflags=0
+        )
+        threading.Thread(target=self._watch, daemon=True).start()
+
+    def _handle_message(self, message_type, payload):
+        if message_type == "ready":
+            self.ready.set()
+        elif message_type == "ack" and payload.get("command") == "stop" and self.session is not None:
+            self.session.finished.set()
+        if self.on_message:
+            self.on_message(message_type, payload)
+
+    def _watch(self):
+        """进程意外退出时结束当前训练"""
+        self.process.wait()
+        if self.session is not None:
+            self.session.finished.set()
+
+    def is_alive(self):
+        return self.process.poll() is None
+
+    def start_session(self, exercise, connect_timeout=10.0):
+        """开始一次训练，返回 WorkerSession"""
+        if not self.control.wait_connected(connect_timeout):
+            raise RuntimeError("常驻计数进程未能连接")
+        self.control.last_count = None
+        self.session = WorkerSession(self)
+        if not self.control.send("session", exercise=exercise):
+            raise RuntimeError("无法连接常驻计数进程")
+        return self.session
+
+    def terminate(self):
+        try:
+            self.process.terminate()
+        except Exception:
+            pass
+        self.control.close()
+
+    def close(self, timeout=2.0):
+        """通知常驻进程退出，超时未退出则强制结束"""
+        if self.is_alive():
+            self.control.send("quit")
+            try:
+                self.process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                pass
+        self.terminate()
+
+
+class ControlClient:
+    """子进程端：后台线程接收命令，计数循环每帧只从内存队列取命令，不产生文件系统调用"""
+
+    connected = True
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._commands = deque()
+        self._pending = threading.Event()
+        self._send_lock = threading.Lock()
+        self.closed = False
+        self._thread = threading.Thread(target=self._receive, daemon=True)
+        self._thread.start()
+
+    def _receive(self):
+        while True:
+            try:
+                message_type, payload = self._conn.recv()
+            except (EOFError, OSError):
+                # 主程序退出或断开时停止训练
+                self.closed = True
+                self._commands.append(("stop", {}))
+                self._pending.set()
+                break
+            self._commands.append((message_type, payload))
+            self._pending.set()
+
+    def poll(self):
+        """取出所有待处理的命令，返回 [(类型, 参数), ...]"""
+        commands = []
+        while self._commands:
+            commands.append(self._commands.popleft())
+        return commands
+
+    def requeue(self, message_type, payload):
+        """把已取出的命令放回队首，留给外层循环处理（如训练中收到的 quit）"""
+        self._commands.appendleft((message_type, payload))
+        self._pending.set()
+
+    def wait(self, timeout=None):
+        """阻塞等待下一条命令 (类型, 参数)，超时返回 None"""
+        self._pending.clear()
+        if not self._commands:
+            self._pending.wait(timeout)
+        return self._commands.popleft() if self._commands else None
+
+    def send(self, message_type, **payload):
+        """向主程序发送消息，发送失败时忽略"""
+        try:
+            with self._send_lock:
+                self._conn.send((message_type, payload))
+        except (OSError, ValueError):
+            pass
+
+    def close(self):
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+
+
+class NullControlClient:
+    """独立运行（没有主程序）时使用的空通道"""
+
+    connected = False
+    closed = False
+
+    def poll(self):
+        return []
+
+    def requeue(self, message_type, payload):
+        pass
+
+    def wait(self, timeout=None):
+        return None
+
+    def send(self, message_type, **payload):
+        pass
+
+    def close(self):
+        pass
+
+
+def connect_control():
+    """按环境变量连接主程序的控制通道，未由主程序启动时返回空通道"""
+    address = os.environ.get(ENV_ADDRESS)
+    authkey = os.environ.get(ENV_AUTHKEY)
+    if not address or not authkey:
+        return NullControlClient()
+    host, port = address.rsplit(":", 1)
+    try:
+        conn = Client((host, int(port)), authkey=binascii.unhexlify(authkey))
+    except Exception as e:
+        print(f"连接主程序失败: {e}")
+        return NullControlClient()
+    return ControlClient(conn)
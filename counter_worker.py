@@ -0,0 +1,173 @@
+"""常驻计数进程：随主程序启动，提前加载姿态模型并打开摄像头
+
+每次训练只需主程序发送 session 命令切换到深蹲或俯卧撑，不必重新导入 OpenCV/MediaPipe、
+重建 Pose 计算图和重新打开摄像头。需由主程序（main.py）启动，通过控制通道接收命令。
+"""
+import argparse
+
+import mediapipe as mp
+
+from auto_counter import AutoExerciseCounter, run_session as run_auto_session
+from backends import create_beep_backend
+from capture import open_source
+from control_channel import connect_control
+from metrics import add_metrics_arguments, create_metrics
+from model_tuning import TARGET_FPS, choose_model_complexity, probe_frame
+from pose_utils import INFERENCE_SIZE, POSE_CONFIDENCE, prepare_inference_image
+from profiling import add_profile_arguments, create_profiler
+from pushup_counter import SPEECH_OPTIONS as PUSHUP_SPEECH_OPTIONS, AutoCalibrationPushupCounter, run_session
+from scheduler import InferenceScheduler
+from session_store import SessionStore
+from speech import create_speech_service
+from squat_counter import SPEECH_OPTIONS as SQUAT_SPEECH_OPTIONS, SquatCounter
+
+
+def run_squat(args, cap, pose, control, model_complexity, speech, store, metrics):
+    """运行一次深蹲训练，speech 为各运动的语音服务，store 为训练记录库，metrics 为运行指标"""
+    counter = SquatCounter(
+        source=cap,
+        inference_size=args.inference_size,
+        headless=args.headless,
+        speech=speech["squat"],
+        scheduler=InferenceScheduler() if args.adaptive else None,
+        model_complexity=model_complexity,
+        control=control,
+        store=store,
+        metrics=metrics,
+        profiler=create_profiler(args.profile, "squat"),
+    )
+    counter.run(pose=pose, release_source=False)
+
+
+def run_pushup(args, cap, pose, control, model_complexity, speech, store, metrics):
+    """运行一次俯卧撑训练"""
+    counter = AutoCalibrationPushupCounter(
+        speech=speech["pushup"],
+        beeper=create_beep_backend("null" if args.speech == "null" else "auto", headless=args.headless),
+        control=control,
+        store=store,
+        metrics=metrics,
+        profiler=create_profiler(args.profile, "pushup"),
+    )
+    scheduler = InferenceScheduler() if args.adaptive else None
+    run_session(counter, cap, pose, args.headless, args.inference_size, scheduler)
+
+
+def run_auto(args, cap, pose, control, model_complexity, speech, store, metrics):
+    """运行一次自动识别训练：按识别结果在深蹲和俯卧撑计数器之间切换"""
+    counter = AutoExerciseCounter(
+        SquatCounter(source=cap, inference_size=args.inference_size, headless=args.headless,
+                     speech=speech["squat"], model_complexity=model_complexity),
+        AutoCalibrationPushupCounter(
+            speech=speech["pushup"],
+            beeper=create_beep_backend("null" if args.speech == "null" else "auto", headless=args.headless),
+        ),
+        control=control,
+        store=store,
+        metrics=metrics,
+        profiler=create_profiler(args.profile, "auto"),
+    )
+    scheduler = InferenceScheduler() if args.adaptive else None
+    run_auto_session(counter, cap, pose, args.headless, args.inference_size, scheduler)
+
+
+SESSIONS = {"squat": run_squat, "pushup": run_pushup, "auto": run_auto}
+SPEECH_OPTIONS = {"squat": SQUAT_SPEECH_OPTIONS, "pushup": PUSHUP_SPEECH_OPTIONS}
+
+
+def create_poses(model_complexity, inference_size):
+    """为每种运动创建 Pose 实例，并用测速画面预热一次"""
+    frame = prepare_inference_image(probe_frame(), inference_size)
+    poses = {}
+    for exercise, confidence in POSE_CONFIDENCE.items():
+        pose = mp.solutions.pose.Pose(model_complexity=model_complexity,
+                                      min_detection_confidence=confidence,
+                                      min_tracking_confidence=confidence)
+        pose.process(frame)
+        poses[exercise] = pose
+    return poses
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="常驻计数进程")
+    parser.add_argument("--inference-size", type=int, default=INFERENCE_SIZE,
+                        help="姿态推理图像的长边像素，0 表示使用原始分辨率")
+    parser.add_argument("--source", default=None,
+                        help="帧源：摄像头编号（默认0）、视频文件、图片目录或 synthetic")
+    parser.add_argument("--headless", action="store_true", help="无界面模式：不显示窗口")
+    parser.add_argument("--speech", choices=["auto", "sapi", "null"], default="auto",
+                        help="语音后端，null 为关闭语音和提示音")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="运动自适应推理：无人或静止时降低推理频率")
+    parser.add_argument("--model-complexity", type=int, choices=[0, 1, 2], default=None,
+                        help="姿态模型复杂度，默认按本机速度自动选择")
+    parser.add_argument("--target-fps", type=float, default=TARGET_FPS,
+                        help="自动选择模型时要求达到的帧率")
+    add_metrics_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    control = connect_control()
+    if not control.connected:
+        print("常驻计数进程需由主程序启动")
+        return
+
+    model_complexity = choose_model_complexity(args.model_complexity, args.target_fps, args.inference_size)
+    poses = create_poses(model_complexity, args.inference_size)
+    cap = open_source(args.source)
+
+    # 每种运动一个语音服务，在多次训练之间复用（常用短语的缓存在后台预先合成）
+    speech = {exercise: create_speech_service(args.speech, headless=args.headless, **options)
+              for exercise, options in SPEECH_OPTIONS.items()}
+    # 训练记录库在多次训练之间复用，后台写入线程只启动一次
+    store = SessionStore()
+    # 运行指标在多次训练之间累计（导出端点也只开启一次）
+    metrics = create_metrics(args.metrics_file, args.metrics_port, args.hud)
+    control.send("ready")
+    print("常驻计数进程已就绪")
+
+    try:
+        while not control.closed:
+            command = control.wait(timeout=1.0)
+            if command is None:
+                continue
+            message_type, payload = command
+            if message_type == "quit":
+                break
+            if message_type != "session":
+                # 空闲时收到的 stop/reset 已无对应的训练，直接忽略
+                continue
+
+            exercise = payload.get("exercise")
+            if exercise not in SESSIONS:
+                print(f"未知的运动类型: {exercise}")
+                control.send("ack", command="stop", count=None)
+                continue
+
+            # 帧源已结束（摄像头断开或离线源读完）时重新打开
+            if not cap.isOpened():
+                cap.release()
+                cap = open_source(args.source)
+
+            # 自动识别两种运动共用一个 Pose，使用较低的（深蹲的）置信度
+            pose = poses["squat" if exercise == "auto" else exercise]
+            pose.reset()
+            try:
+                SESSIONS[exercise](args, cap, pose, control, model_complexity, speech, store, metrics)
+            except Exception as e:
+                print(f"训练出错: {e}")
+                control.send("ack", command="stop", count=None)
+    finally:
+        cap.release()
+        for pose in poses.values():
+            pose.close()
+        control.close()
+        store.close()
+        metrics.close()
+
+    print("常驻计数进程结束")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""运动类型在线识别：根据最近一小段时间的关节角特征判断正在做深蹲还是俯卧撑
+
+每帧只计算一次关节角（见 exercise_engine.exercise_angles，计数器已算过时直接传入），窗口统计用单调队列和滑动求和维护，
+每帧更新均摊 O(1)，CPU 上耗时远小于 1 毫秒。分类为最近质心：特征按尺度归一化后取距离最近的运动；
+候选结果需要连续保持 switch_seconds 才会切换，避免来回跳变。
+"""
+import math
+from collections import deque
+
+import numpy as np
+
+from exercise_engine import exercise_features
+from stability import StabilityDetector
+
+# 窗口特征：躯干倾角均值（0 为直立，90 为水平）、膝盖角度变化幅度、手肘角度变化幅度
+FEATURE_NAMES = ("torso_inclination", "knee_range", "elbow_range")
+
+# 各运动的特征质心和归一化尺度（度），可用 benchmarks/exercise_classifier.py --fit 从录制数据重新估计
+CENTROIDS = {
+    "squat": (10.0, 60.0, 10.0),
+    "pushup": (70.0, 10.0, 50.0),
+}
+FEATURE_SCALE = (30.0, 40.0, 40.0)
+
+# 左右肩、左右髋的关键点编号
+_SHOULDERS = [11, 12]
+_HIPS = [23, 24]
+
+
+def torso_inclination(points, scale=(1.0, 1.0)):
+    """躯干（髋部中点到肩部中点）与竖直方向的夹角（度），points 为 (33, k) 或 (N, 33, k)"""
+    xy = np.asarray(points)[..., :2] * np.asarray(scale, dtype=np.float64)
+    torso = xy[..., _SHOULDERS, :].mean(axis=-2) - xy[..., _HIPS, :].mean(axis=-2)
+    return np.degrees(np.arctan2(np.abs(torso[..., 0]), np.abs(torso[..., 1])))
+
+
+class ExerciseClassifier:
+    """流式运动类型识别器"""
+
+    def __init__(self, window_seconds=1.5, switch_seconds=1.0, centroids=CENTROIDS, feature_scale=FEATURE_SCALE):
+        self.window_seconds = window_seconds
+        self.switch_seconds = switch_seconds
+        self.labels = tuple(centroids)
+        self._centroids = np.array([centroids[label] for label in self.labels], dtype=np.float64)
+        self._scale = np.asarray(feature_scale, dtype=np.float64)
+
+        # 膝盖/手肘角度的窗口极差复用稳定性检测的单调队列，阈值不使用
+        self._knee = StabilityDetector(window_seconds, threshold=0.0)
+        self._elbow = StabilityDetector(window_seconds, threshold=0.0)
+        self._inclination = deque()  # (时间, 倾角)
+        self._inclination_sum = 0.0
+
+        self.label = None
+        self._candidate = None
+        self._candidate_since = None
+
+    def clear(self):
+        """清空窗口和识别结果"""
+        self._knee.clear()
+        self._elbow.clear()
+        self._inclination.clear()
+        self._inclination_sum = 0.0
+        self.label = None
+        self._candidate = None
+        self._candidate_since = None
+
+    def features(self):
+        """返回当前窗口的特征 (倾角均值, 膝盖幅度, 手肘幅度)"""
+        if not self._inclination:
+            return None
+        return (self._inclination_sum / len(self._inclination), self._knee.spread(), self._elbow.spread())
+
+    def predict(self, features):
+        """最近质心分类，返回 (运动名, 到各质心的归一化距离)"""
+        distances = np.sqrt((((np.asarray(features) - self._centroids) / self._scale) ** 2).sum(axis=-1))
+        return self.labels[int(np.argmin(distances))], distances
+
+    def update(self, points, timestamp, size=(1.0, 1.0), angles=None):
+        """加入一帧关键点 (33, k)，返回当前识别的运动类型，窗口未满时返回 None
+
+        size 为画面的 (宽, 高)，各运动的关节角按其规格的坐标系计算（与计数器一致），躯干倾角按像素计算；
+        angles 为 exercise_angles() 的结果，调用方已经计算过时传入，不再重复计算。
+        """
+        features = exercise_features(points, size, angles=angles)
+        knee, elbow = float(features["squat"]), float(features["pushup"])
+        inclination = float(torso_inclination(points, size))
+        # 关键点缺失（NaN）的帧跳过，NaN 会破坏单调队列和滑动求和
+        if not (math.isfinite(knee) and math.isfinite(elbow) and math.isfinite(inclination)):
+            return self.label
+        self._knee.update(knee, timestamp)
+        self._elbow.update(elbow, timestamp)
+
+        # 数据中断超过一个窗口时重新开始（与稳定性检测的处理一致）
+        if self._inclination and timestamp - self._inclination[-1][0] > self.window_seconds:
+            self._inclination.clear()
+            self._inclination_sum = 0.0
+        self._inclination.append((timestamp, inclination))
+        self._inclination_sum += inclination
+        cutoff = timestamp - self.window_seconds
+        while self._inclination[0][0] < cutoff:
+            self._inclination_sum -= self._inclination.popleft()[1]
+
+        if not self._knee.is_full():
+            return self.label
+
+        candidate, _ = self.predict(self.features())
+        if candidate == self.label:
+            self._candidate = None
+        elif self.label is None:
+            # 第一次识别不需要等待
+            self.label = candidate
+        elif candidate != self._candidate:
+            self._candidate = candidate
+            self._candidate_since = timestamp
+        elif timestamp - self._candidate_since >= self.switch_seconds:
+            self.label = candidate
+            self._candidate = None
+        return self.label
@@ -0,0 +1,228 @@
+"""声明式运动计数引擎
+
+每种运动用 ExerciseSpec 描述：取哪些关节角（多个时取平均）、上/下位置的角度阈值
+（固定角度，或相对校准角度的偏移）以及动作质量规则（最小幅度）。
+RepCounter 按规格运行统一的"上-下-上"状态机，Calibrator 按规格自动校准，ExerciseCounter 把两者组合起来；exercise_angles() 对一组关键点按各运动的坐标系
+只计算一次所有关节角，exercise_features() 再得到各运动的特征角度。新增弓步、仰卧起坐等运动只需添加一个规格。
+"""
+import numpy as np
+
+from pose_utils import JOINT_INDEX, joint_angles
+from stability import StabilityDetector
+
+
+class ExerciseSpec:
+    """运动规格
+
+    joints 为 pose_utils.JOINT_ANGLES 中的关节名，特征角度取其平均值；
+    角度大于 up_angle 为上位、小于 down_angle 为下位；
+    设置了 up_offset/down_offset 时，校准后改用 校准角度 - 偏移 作为阈值，
+    只有特征角度大于 min_calibration_angle、且在 stability_window 秒内波动小于 stability_threshold 时才开始校准，
+    保持稳定 calibration_hold 秒后以当时的角度作为校准角度；
+    pixel_angles 为 True 时关节角按画面像素坐标计算（阈值按此标定），否则按归一化坐标计算；
+    一次动作的幅度（顶部角度与最低角度之差）小于 min_depth_for_detection 视为无效动作，
+    小于 min_depth_for_count 视为幅度不足，均不计数。
+    """
+
+    def __init__(self, name, joints, up_angle, down_angle, up_offset=None, down_offset=None,
+                 min_calibration_angle=None, calibration_hold=3.0, stability_window=0.5, stability_threshold=5.0,
+                 min_depth_for_detection=0, min_depth_for_count=0, pixel_angles=False):
+        self.name = name
+        self.joints = tuple(joints)
+        self.up_angle = up_angle
+        self.down_angle = down_angle
+        self.up_offset = up_offset
+        self.down_offset = down_offset
+        self.min_calibration_angle = min_calibration_angle
+        self.calibration_hold = calibration_hold
+        self.stability_window = stability_window
+        self.stability_threshold = stability_threshold
+        self.min_depth_for_detection = min_depth_for_detection
+        self.min_depth_for_count = min_depth_for_count
+        self.pixel_angles = pixel_angles
+        self._index = np.array([JOINT_INDEX[joint] for joint in self.joints], dtype=np.intp)
+
+    @property
+    def calibrated(self):
+        """是否按校准角度设置阈值"""
+        return self.up_offset is not None
+
+    def angle_scale(self, size):
+        """计算关节角时 x、y 的缩放系数，size 为画面的 (宽, 高)"""
+        return tuple(size) if self.pixel_angles else (1.0, 1.0)
+
+    def feature(self, angles):
+        """从 joint_angles() 的结果 (J,) 或 (N, J) 中取出本运动的特征角度"""
+        return np.asarray(angles)[..., self._index].mean(axis=-1)
+
+
+SQUAT = ExerciseSpec("squat", ["left_knee"], up_angle=160, down_angle=90, pixel_angles=True)
+
+PUSHUP = ExerciseSpec("pushup", ["left_elbow", "right_elbow"], up_angle=160, down_angle=90,
+                      up_offset=15, down_offset=30, min_calibration_angle=140,
+                      calibration_hold=3.0, stability_window=0.5, stability_threshold=5.0,
+                      min_depth_for_detection=20, min_depth_for_count=40)
+
+EXERCISES = {spec.name: spec for spec in (SQUAT, PUSHUP)}
+
+
+def exercise_angles(points, size=(1.0, 1.0), specs=EXERCISES):
+    """按各运动的坐标系计算关节角，同一坐标系只计算一次，返回 {运动名: joint_angles() 的结果}"""
+    by_scale = {}
+    angles = {}
+    for name, spec in specs.items():
+        scale = spec.angle_scale(size)
+        if scale not in by_scale:
+            by_scale[scale] = joint_angles(points, scale)
+        angles[name] = by_scale[scale]
+    return angles
+
+
+def exercise_features(points=None, size=(1.0, 1.0), specs=EXERCISES, angles=None):
+    """返回 {运动名: 特征角度}，angles 为 exercise_angles() 的结果（已计算时传入，不再重复计算）"""
+    if angles is None:
+        angles = exercise_angles(points, size, specs)
+    return {name: spec.feature(angles[name]) for name, spec in specs.items()}
+
+
+class RepCounter:
+    """按运动规格计数：从下位回到上位时完成一次动作，并按质量规则判断是否计数
+
+    update() 返回本帧发生的事件：
+    "down" 开始下降，"rep" 计数一次，"shallow" 幅度不足，"minimal" 动作幅度过小，无事件时为 None。
+    完成一次动作（后三种事件）后，last_depth 和 last_quality（good/shallow/minimal）记录该次动作的幅度和质量。
+    """
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.reference = None
+        self.reset()
+
+    def reset(self):
+        """清零计数和阶段（保留校准角度）"""
+        self.count = 0
+        self.stage = None
+        self.min_angle = None
+        self.last_depth = None
+        self.last_quality = None
+
+    def calibrate(self, reference):
+        """设置校准角度，之后的阈值相对校准角度计算"""
+        self.reference = reference
+
+    def thresholds(self):
+        """返回当前的 (上位阈值, 下位阈值)"""
+        spec = self.spec
+        if spec.calibrated and self.reference is not None:
+            return self.reference - spec.up_offset, self.reference - spec.down_offset
+        return spec.up_angle, spec.down_angle
+
+    def depth(self, angle):
+        """角度相对动作顶部（校准角度或上位阈值）下降了多少"""
+        top = self.reference if self.spec.calibrated and self.reference is not None else self.spec.up_angle
+        return top - angle
+
+    def update(self, angle):
+        """加入一帧特征角度，返回本帧的事件"""
+        up, down = self.thresholds()
+        if self.stage == "down":
+            self.min_angle = min(self.min_angle, angle)
+            if angle > up:
+                self.stage = "up"
+                return self._finish_rep()
+        elif angle < down:
+            self.stage = "down"
+            self.min_angle = angle
+            return "down"
+        elif angle > up:
+            self.stage = "up"
+        return None
+
+    def _finish_rep(self):
+        """按质量规则判断刚完成的动作"""
+        depth = self.last_depth = float(self.depth(self.min_angle))
+        self.min_angle = None
+        if depth < self.spec.min_depth_for_detection:
+            self.last_quality = "minimal"
+            return "minimal"
+        if depth < self.spec.min_depth_for_count:
+            self.last_quality = "shallow"
+            return "shallow"
+        self.count += 1
+        self.last_quality = "good"
+        return "rep"
+
+
+class Calibrator:
+    """按规格自动校准的状态机：waiting（等待上位稳定）-> calibrating（保持中）-> done
+
+    update() 返回本帧的事件："low" 角度未达到 min_calibration_angle，"start" 开始保持，
+    "hold" 保持中（progress 为进度），"cancel" 保持中出现晃动、重新等待，"done" 校准完成（reference 为校准角度），
+    其余情况为 None。
+    """
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.stability = StabilityDetector(spec.stability_window, spec.stability_threshold)
+        self.reset()
+
+    def reset(self):
+        """重新等待校准"""
+        self.state = "waiting"
+        self.start_time = None
+        self.hold_time = 0.0
+        self.progress = 0
+        self.reference = None
+        self.spread = None  # 校准完成时窗口内的角度波动
+        self.stability.clear()
+
+    def update(self, angle, timestamp):
+        """加入一帧特征角度，返回本帧的校准事件"""
+        if self.state == "waiting":
+            if angle <= self.spec.min_calibration_angle:
+                return "low"
+            if self.stability.update(angle, timestamp):
+                self.state = "calibrating"
+                self.start_time = timestamp
+                return "start"
+            return None
+
+        if self.state == "calibrating":
+            if not self.stability.update(angle, timestamp):
+                self.reset()
+                return "cancel"
+            self.hold_time = timestamp - self.start_time
+            self.progress = min(100, int(self.hold_time / self.spec.calibration_hold * 100))
+            if self.hold_time < self.spec.calibration_hold:
+                return "hold"
+            self.state = "done"
+            self.reference = angle
+            self.spread = self.stability.spread()
+            self.stability.clear()
+            return "done"
+        return None
+
+
+class ExerciseCounter:
+    """按规格计数的完整流程：需要校准的运动先由 Calibrator 自动校准，之后交给 RepCounter 计数"""
+
+    def __init__(self, spec):
+        self.reps = RepCounter(spec)
+        self.calibrator = Calibrator(spec) if spec.calibrated else None
+
+    @property
+    def count(self):
+        return self.reps.count
+
+    @property
+    def ready(self):
+        """已校准（或不需要校准）"""
+        return self.calibrator is None or self.calibrator.state == "done"
+
+    def update(self, angle, timestamp):
+        """加入一帧特征角度，校准完成前返回 None，之后返回计数状态机的事件"""
+        if not self.ready:
+            if self.calibrator.update(angle, timestamp) == "done":
+                self.reps.calibrate(self.calibrator.reference)
+            return None
+        return self.reps.update(angle)
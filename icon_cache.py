@@ -0,0 +1,51 @@
+"""界面图标缓存：首次运行时用 PIL 把原图缩放为界面所需尺寸并保存为 PNG，
+之后由 Tk 直接加载缓存文件，启动时不必导入 PIL 和重新缩放图片。
+"""
+import os
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(BASE_DIR, "data", "icon_cache")
+
+
+def _render(src_path, cache_path, size, pad):
+    """用 PIL 生成缩放后的图标，pad 为 True 时等比缩放并居中放在白色方形画布上"""
+    from PIL import Image, ImageOps
+
+    img = Image.open(src_path)
+    if pad:
+        try:
+            img = ImageOps.exif_transpose(img)
+        except Exception:
+            pass
+        img.thumbnail((size, size), Image.Resampling.LANCZOS)
+        canvas = Image.new("RGBA", (size, size), (255, 255, 255, 255))
+        x = (size - img.width) // 2
+        y = (size - img.height) // 2
+        canvas.paste(img, (x, y), img if img.mode in ("RGBA", "LA") else None)
+        img = canvas
+    else:
+        img = img.resize((size, size), Image.Resampling.LANCZOS)
+
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    img.save(cache_path, "PNG")
+
+
+def cached_icon(src_path, size, pad=False, cache_dir=CACHE_DIR):
+    """返回缩放后图标的缓存路径；原图比缓存新时重新生成，原图不存在或无法生成时返回 None"""
+    if not os.path.exists(src_path):
+        return None
+
+    name = os.path.splitext(os.path.basename(src_path))[0]
+    cache_path = os.path.join(cache_dir, f"{name}_{size}{'_pad' if pad else ''}.png")
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(src_path):
+        return cache_path
+
+    try:
+        _render(src_path, cache_path, size, pad)
+    except ImportError:
+        print("警告: PIL/Pillow 未安装，无法生成图标缓存")
+        return None
+    except Exception as e:
+        print(f"生成图标 {os.path.basename(src_path)} 失败: {e}")
+        return None
+    return cache_path
@@ -0,0 +1,191 @@
+"""关键点录制：把每帧的姿态关键点追加写入内存映射的二进制文件，不保存视频
+
+文件由 64 字节的文件头和定长的帧记录组成，每帧为 float32 时间（相对录制开始的秒数）、
+33 个关键点的 int16 定点 x、y（单位 1/10000，约为 1280 宽画面的 0.13 像素）和 uint8 的 visibility，
+共 169 字节，30 FPS 下一小时约 18 MB。计数只用 x、y，深度 z 不录制。没有检测到人的帧 x 记为 -32768。
+要做到每小时几 MB 需要帧间差分等变长编码，会失去定长记录的随机读取和异常退出后仍可读取的特性，因此未采用。
+文件按块预先扩展并映射到内存，写一帧只是一次内存拷贝；文件头中的帧数每帧更新，进程异常退出也能读出已写入的帧。
+版本 1 的文件（float16 的 x, y, z, visibility，每帧 268 字节）仍可读取。
+"""
+import mmap
+import os
+import struct
+import time
+
+import numpy as np
+
+from pose_utils import NUM_LANDMARKS
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RECORDINGS_DIR = os.path.join(BASE_DIR, "data", "recordings")
+
+MAGIC = b"PLMK"
+VERSION = 2
+# 魔数、版本、关键点数、每点列数、帧记录字节数、帧数、录制开始时间（Unix 时间）
+HEADER = struct.Struct("<4sHHHHQd")
+HEADER_SIZE = 64
+_COUNT_OFFSET = struct.calcsize("<4sHHHH")
+
+# x、y 的定点系数，int16 可表示 ±3.27（画面外少量越界的关键点也能保存）
+XY_SCALE = 10000
+MISSING = -32768
+RECORD = np.dtype([("t", "<f4"), ("xy", "<i2", (NUM_LANDMARKS, 2)), ("visibility", "u1", (NUM_LANDMARKS,))])
+CHANNELS = 3
+
+# 各版本的 (帧记录格式, 每点列数)
+_FORMATS = {
+    1: (np.dtype([("t", "<f4"), ("points", "<f2", (NUM_LANDMARKS, 4))]), 4),
+    VERSION: (RECORD, CHANNELS),
+}
+
+
+def default_recording_path(exercise):
+    """按运动和开始时间生成录制文件路径"""
+    return os.path.join(RECORDINGS_DIR, f"{exercise}-{time.strftime('%Y%m%d-%H%M%S')}.lmk")
+
+
+class LandmarkRecorder:
+    """只追加的关键点录制文件，grow_frames 为每次扩展文件的帧数"""
+
+    def __init__(self, path, grow_frames=4096):
+        self.path = path
+        self.grow_frames = grow_frames
+        self.count = 0
+        self.start_time = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "w+b")
+        self._mmap = None
+        self._frames = None
+        self._capacity = 0
+        # 量化用的缓冲区，每帧复用（列与 points 相同，z 乘 0 不使用）
+        self._scaled = np.empty((NUM_LANDMARKS, 4), dtype=np.float32)
+        self._factors = np.array([XY_SCALE, XY_SCALE, 0, 255], dtype=np.float32)
+        self._grow()
+
+    def _grow(self):
+        """扩展文件并重新映射"""
+        self._release_map()
+        self._capacity += self.grow_frames
+        self._file.truncate(HEADER_SIZE + self._capacity * RECORD.itemsize)
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        self._write_header()
+        self._frames = np.ndarray((self._capacity,), dtype=RECORD, buffer=self._mmap, offset=HEADER_SIZE)
+        # 各字段的视图只取一次，写一帧时直接按下标赋值
+        self._t, self._xy, self._visibility = self._frames["t"], self._frames["xy"], self._frames["visibility"]
+
+    def _release_map(self):
+        if self._mmap is not None:
+            self._frames = self._t = self._xy = self._visibility = None  # 先释放数组视图，否则无法关闭映射
+            self._mmap.flush()
+            self._mmap.close()
+            self._mmap = None
+
+    def _write_header(self):
+        HEADER.pack_into(self._mmap, 0, MAGIC, VERSION, NUM_LANDMARKS, CHANNELS, RECORD.itemsize,
+                         self.count, self.start_time or 0.0)
+
+    def write(self, timestamp, points):
+        """追加一帧：timestamp 为帧时间（秒），points 为 (33, 4) 关键点，没有检测到人时为 None"""
+        if self._file is None:
+            return
+        if self.start_time is None:
+            self.start_time = timestamp
+            self._write_header()
+        if self.count == self._capacity:
+            self._grow()
+
+        index = self.count
+        self._t[index] = timestamp - self.start_time
+        if points is None:
+            self._xy[index] = MISSING
+            self._visibility[index] = 0
+        else:
+            # x、y、visibility 一次缩放、取整和限幅（np.clip 的调用开销较大，用 maximum/minimum）
+            scaled = self._scaled
+            np.multiply(points, self._factors, out=scaled)
+            finite = np.isfinite(scaled).all()
+            np.rint(scaled, out=scaled)
+            np.maximum(scaled, MISSING + 1, out=scaled)
+            np.minimum(scaled, 32767, out=scaled)
+            if not finite:
+                # NaN/inf 直接转换为整数的结果不确定：x、y 非有限的关键点记为缺失，其余非有限值记为 0
+                missing = ~np.isfinite(points[:, :2]).all(axis=1)
+                np.nan_to_num(scaled, copy=False, nan=0.0)
+                scaled[missing, :2] = MISSING
+            self._xy[index] = scaled[:, :2]
+            self._visibility[index] = scaled[:, 3]
+        self.count += 1
+        struct.pack_into("<Q", self._mmap, _COUNT_OFFSET, self.count)
+
+    def close(self):
+        """截掉预留的空间并关闭文件"""
+        if self._file is None:
+            return
+        self._write_header()
+        self._release_map()
+        self._file.truncate(HEADER_SIZE + self.count * RECORD.itemsize)
+        self._file.close()
+        self._file = None
+
+    def stats_text(self):
+        """录制统计信息"""
+        size = HEADER_SIZE + self.count * RECORD.itemsize
+        return f"关键点录制: {self.count} 帧，{size / 1e6:.1f} MB -> {self.path}"
+
+
+class NullLandmarkRecorder:
+    """不录制时使用的空录制器"""
+
+    def write(self, timestamp, points):
+        pass
+
+    def close(self):
+        pass
+
+    def stats_text(self):
+        return ""
+
+
+def create_recorder(path, exercise):
+    """path 为 None 时不录制，为空字符串时按运动和时间自动命名"""
+    if path is None:
+        return NullLandmarkRecorder()
+    return LandmarkRecorder(path or default_recording_path(exercise))
+
+
+def read_recording(path):
+    """读取录制文件，返回 (points (N, 33, 4) float32, timestamps (N,) float64)
+
+    timestamps 为录制时的帧时间（Unix 时间）；没有检测到人的帧和录制时坐标无效的关键点 points 为 NaN；
+    列为 x, y, z, visibility，与 pose_utils.landmarks_to_array 相同，版本 2 不录制 z，读出为 0。
+    """
+    with open(path, "rb") as f:
+        header = f.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError(f"不是关键点录制文件: {path}")
+    magic, version, num_landmarks, channels, record_size, count, start_time = HEADER.unpack(header)
+    if magic != MAGIC or version not in _FORMATS:
+        raise ValueError(f"不是关键点录制文件或版本不支持: {path}")
+    record, expected_channels = _FORMATS[version]
+    if (num_landmarks, channels, record_size) != (NUM_LANDMARKS, expected_channels, record.itemsize):
+        raise ValueError(f"关键点格式不匹配: {path}")
+
+    # 异常退出时文件末尾可能还有预留的空间，以文件头中的帧数为准
+    count = min(count, (os.path.getsize(path) - HEADER_SIZE) // record.itemsize)
+    if count <= 0:
+        return np.empty((0, NUM_LANDMARKS, 4), dtype=np.float32), np.empty(0)
+    frames = np.memmap(path, dtype=record, mode="r", offset=HEADER_SIZE, shape=(count,))
+    if version == 1:
+        points = frames["points"].astype(np.float32)
+    else:
+        xy = np.asarray(frames["xy"])
+        points = np.zeros((count, NUM_LANDMARKS, 4), dtype=np.float32)
+        points[..., :2] = xy / XY_SCALE
+        points[..., 3] = frames["visibility"] / 255.0
+        points[xy[..., 0] == MISSING] = np.nan
+    timestamps = start_time + frames["t"].astype(np.float64)
+    del frames
+    return points, timestamps
@@ -1,28 +1,24 @@
 import os
 import subprocess
-import sys
 import threading
+import time
 import tkinter as tk
 from tkinter import messagebox
-import pygame
 
-try:
-    from PIL import Image, ImageTk, ImageOps
+from control_channel import WorkerProcess
+from icon_cache import cached_icon
+from session_store import SessionStore
+from speech import PRIORITY_HIGH, PRIORITY_NORMAL, create_speech_service
+from telemetry import LiveStats
 
-    HAS_PIL = True
-except ImportError:
-    HAS_PIL = False
-    print("警告: PIL/Pillow 未安装，图像功能将不可用")
+# pygame（背景音乐）、win32com（语音）和 PIL（生成图标缓存）都在第一次用到时才导入，
+# 窗口可以在这些模块加载之前显示出来
 
-try:
-    import win32com.client
+# 自动识别时界面显示的运动名称
+EXERCISE_NAMES = {"squat": "深蹲", "pushup": "俯卧撑"}
 
-    HAS_SPEECH = True
-except ImportError:
-    HAS_SPEECH = False
-    print("警告: win32com 未安装，COM相关功能将不可用")
-
-pygame.mixer.init()
+# 等待常驻计数进程连接的最长时间（秒），等待期间界面照常响应
+WORKER_CONNECT_TIMEOUT = 10.0
 
 
 class FitnessAppUI:
@@ -77,9 +73,8 @@ class FitnessAppUI:
         self.images_dir = os.path.join(self.assets_dir, "images")
         self.audio_dir = os.path.join(self.assets_dir, "audio")
 
-        # 训练脚本路径
-        self.squat_script = os.path.join(self.base_dir, "squat_counter.py")
-        self.pushup_script = os.path.join(self.base_dir, "pushup_counter.py")
+        # 常驻计数进程脚本路径
+        self.worker_script = os.path.join(self.base_dir, "counter_worker.py")
 
         # 背景音乐文件路径
         self.squat_music = os.path.join(self.audio_dir, "squat_music.mp3")
@@ -99,34 +94,35 @@ class FitnessAppUI:
         self.countdown_job = None
         self.elapsed_seconds = 0
 
-        # 信号文件路径
-        self.signal_file = os.path.join(self.data_dir, ".start_signal")
-        self.stop_signal_file = os.path.join(self.data_dir, ".stop_signal")
-        self.signal_check_job = None
+        # 常驻计数进程及其控制通道
+        self.worker = None
+        self.control = None
+        self.waiting_for_start = False
+        # 等待常驻进程连接时轮询的定时任务
+        self.session_job = None
 
-        # 初始化语音引擎
-        self.speaker = None
-        if HAS_SPEECH:
-            try:
-                self.speaker = win32com.client.Dispatch("SAPI.SpVoice")
-                self.speaker.Rate = 0
-            except Exception as e:
-                print(f"语音引擎初始化失败: {e}")
-                self.speaker = None
+        # 子进程发来的实时统计
+        self.live_stats = LiveStats()
+
+        # 语音引擎和音频播放器在第一次使用时初始化
+        self.speech = None
+        self.mixer = None
 
         # 防止重复处理退出的标志
         self.exit_handling = False
 
-        # 加载图标资源
+        # 加载图标资源（使用预先缩放好的缓存）
         self.icons = {}
-        if HAS_PIL:
-            self.set_window_icon()
-            self._load_icon("squat", "squat.png")
-            self._load_icon("pushup", "pushup.png")
+        self.set_window_icon()
+        self._load_icon("squat", "squat.png")
+        self._load_icon("pushup", "pushup.png")
 
         # 创建UI界面
         self._create_ui()
 
+        # 提前启动常驻计数进程，加载模型和打开摄像头的时间与用户操作界面重叠
+        self._ensure_worker()
+
         # 启动进程状态轮询
         self.root.after(200, self._poll_process)
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
@@ -163,8 +159,8 @@ class FitnessAppUI:
             "highlightbackground": self.colors["border"],
             "highlightcolor": self.colors["border"],
             "compound": "top",
-            "width": 180 if HAS_PIL else 20,
-            "height": 180 if HAS_PIL else 2,
+            "width": 180 if self.icons else 20,
+            "height": 180 if self.icons else 2,
             "cursor": "hand2"
         }
 
@@ -172,7 +168,7 @@ class FitnessAppUI:
         self.btn_squat = tk.Button(
             action_frame,
             text="\n深蹲训练",
-            command=lambda: self.start_script(self.squat_script, "深蹲"),
+            command=lambda: self.start_training("squat", "深蹲"),
             **btn_style
         )
         if "squat" in self.icons:
@@ -183,13 +179,32 @@ class FitnessAppUI:
         self.btn_pushup = tk.Button(
             action_frame,
             text="\n俯卧撑训练",
-            command=lambda: self.start_script(self.pushup_script, "俯卧撑"),
+            command=lambda: self.start_training("pushup", "俯卧撑"),
             **btn_style
         )
         if "pushup" in self.icons:
             self.btn_pushup.config(image=self.icons["pushup"])
         self.btn_pushup.grid(row=0, column=1, padx=15)
 
+        # 自动识别按钮：不必预先选择运动
+        self.btn_auto = tk.Button(
+            action_frame,
+            text="自动识别运动",
+            font=("Microsoft YaHei UI", 11),
+            bg=self.colors["button_bg"],
+            fg=self.colors["button_fg"],
+            activebackground=self.colors["button_hover"],
+            activeforeground=self.colors["button_fg"],
+            command=lambda: self.start_training("auto", "动作"),
+            relief="flat",
+            bd=1,
+            highlightthickness=1,
+            highlightbackground=self.colors["border"],
+            pady=6,
+            cursor="hand2"
+        )
+        self.btn_auto.grid(row=1, column=0, columnspan=2, padx=15, pady=(12, 0), sticky="ew")
+
         # 倒计时显示容器
         self.status_container = tk.Frame(self.root, bg=self.colors["bg"])
         self.status_container.pack(pady=0, fill="x")
@@ -204,6 +219,16 @@ class FitnessAppUI:
         )
         self.countdown_label.pack()
 
+        # 实时统计标签
+        self.live_label = tk.Label(
+            self.status_container,
+            text="",
+            font=("Microsoft YaHei UI", 11),
+            fg=self.colors["sub_text"],
+            bg=self.colors["bg"]
+        )
+        self.live_label.pack()
+
         # 倒计时设置区域
         self._add_countdown_controls()
 
@@ -283,45 +308,32 @@ class FitnessAppUI:
             self.colors["danger_hover"]
         )
 
+        # 自动识别按钮悬停效果
+        add_effect(
+            self.btn_auto,
+            self.colors["button_bg"],
+            self.colors["button_hover"]
+        )
+
     def set_window_icon(self):
         """设置主窗口图标"""
-        if not HAS_PIL:
-            return
-
-        icon_path = os.path.join(self.images_dir, "icon.png")
-        if os.path.exists(icon_path):
+        icon_path = cached_icon(os.path.join(self.images_dir, "icon.png"), 64)
+        if icon_path:
             try:
-                img = Image.open(icon_path)
-                img = img.resize((64, 64), Image.Resampling.LANCZOS)
-                icon_photo = ImageTk.PhotoImage(img)
+                icon_photo = tk.PhotoImage(file=icon_path)
                 self.root.iconphoto(True, icon_photo)
                 self.window_icon = icon_photo
             except Exception as e:
                 print(f"设置图标失败: {e}")
 
-
     def _load_icon(self, name, filename):
-        """加载并处理图标文件"""
-        path = os.path.join(self.images_dir, filename)
-        if not os.path.exists(path):
+        """加载缩放到按钮尺寸的图标"""
+        path = cached_icon(os.path.join(self.images_dir, filename), 120, pad=True)
+        if not path:
             return
 
         try:
-            img = Image.open(path)
-            try:
-                img = ImageOps.exif_transpose(img)
-            except Exception:
-                pass
-
-            target = 120
-            img.thumbnail((target, target), Image.Resampling.LANCZOS)
-
-            canvas = Image.new("RGBA", (target, target), (255, 255, 255, 255))
-            x = (target - img.width) // 2
-            y = (target - img.height) // 2
-            canvas.paste(img, (x, y), img if img.mode in ("RGBA", "LA") else None)
-
-            self.icons[name] = ImageTk.PhotoImage(canvas)
+            self.icons[name] = tk.PhotoImage(file=path)
         except Exception as e:
             print(f"加载图标 {filename} 失败: {e}")
 
@@ -502,36 +514,22 @@ class FitnessAppUI:
         if self.countdown_job:
             self.root.after_cancel(self.countdown_job)
             self.countdown_job = None
-        if self.signal_check_job:
-            self.root.after_cancel(self.signal_check_job)
-            self.signal_check_job = None
+        self.waiting_for_start = False
         self.countdown_label.config(text="")
 
-    def speak(self, text, callback=None):
-        """语音播报"""
-        if not HAS_SPEECH:
+    def speak(self, text, callback=None, priority=PRIORITY_NORMAL):
+        """语音播报，语音服务在第一次播报时创建"""
+        if self.speech is None:
+            # 界面只播报训练结束的总结（内容随次数变化），不需要预先合成计数短语
+            self.speech = create_speech_service(rate=0, phrases=())
+        if not self.speech.enabled:
             if callback:
                 self.root.after(100, callback)
             return
 
-        def _speak():
-            try:
-                import pythoncom
-                pythoncom.CoInitialize()
-                try:
-                    speaker = win32com.client.Dispatch("SAPI.SpVoice")
-                    speaker.Rate = 0
-                    speaker.Speak(text)
-                finally:
-                    pythoncom.CoUninitialize()
-            except Exception as e:
-                print(f"语音播报失败: {e}")
-            finally:
-                if callback:
-                    self.root.after(0, callback)
-
-        thread = threading.Thread(target=_speak, daemon=True)
-        thread.start()
+        # 播报在语音服务的后台线程中完成，回调转到界面线程
+        self.speech.say(text, callback=(lambda: self.root.after(0, callback)) if callback else None,
+                        priority=priority)
 
     def on_countdown_finished(self):
         """倒计时结束后的处理"""
@@ -544,34 +542,14 @@ class FitnessAppUI:
         self.stop_music()
 
         if self.current_process and self.current_process.poll() is None:
-            try:
-                with open(self.stop_signal_file, 'w') as f:
-                    f.write('stop')
-
-                try:
-                    self.current_process.wait(timeout=3)
-                except subprocess.TimeoutExpired:
-                    self.current_process.terminate()
-                    self.current_process.wait(timeout=1)
-            except Exception as e:
-                print(f"停止子进程出错: {e}")
-                try:
-                    self.current_process.terminate()
-                except:
-                    pass
-            finally:
-                if os.path.exists(self.stop_signal_file):
-                    try:
-                        os.remove(self.stop_signal_file)
-                    except:
-                        pass
+            self._stop_process(timeout=3)
 
         self.root.after(500, lambda: self._finish_training_with_speech(finished_name))
 
     def _finish_training_with_speech(self, finished_name):
         """播报语音后完成训练"""
         final_count = self.get_final_count(finished_name)
-        self.speak(f"{finished_name}训练结束，共完成{final_count}个，辛苦了！")
+        self.speak(f"{finished_name}训练结束，共完成{final_count}个，辛苦了！", priority=PRIORITY_HIGH)
         self.root.after(2000, lambda: self._show_finish_dialog(finished_name, final_count))
 
     def _show_finish_dialog(self, finished_name, final_count):
@@ -678,37 +656,56 @@ class FitnessAppUI:
     def _on_volume_change(self, value):
         """音量变化"""
         self.music_volume = int(value) / 100
-        pygame.mixer.music.set_volume(self.music_volume)
+        if self.mixer:
+            self.mixer.music.set_volume(self.music_volume)
         self.volume_value_label.config(text=f"{int(value)}%")
 
+    def _get_mixer(self):
+        """第一次播放音乐时才导入 pygame 并初始化音频，失败时返回 None"""
+        if self.mixer is None:
+            try:
+                import pygame
+
+                pygame.mixer.init()
+                self.mixer = pygame.mixer
+            except Exception as e:
+                print(f"音频初始化失败: {e}")
+                self.mixer = False
+        return self.mixer or None
+
     def play_music(self, music_path):
         """播放音乐"""
         if not self.music_enabled:
             return
         if not os.path.exists(music_path):
             return
+        mixer = self._get_mixer()
+        if mixer is None:
+            return
         try:
-            pygame.mixer.music.load(music_path)
-            pygame.mixer.music.set_volume(self.music_volume)
-            pygame.mixer.music.play(-1)
+            mixer.music.load(music_path)
+            mixer.music.set_volume(self.music_volume)
+            mixer.music.play(-1)
             self.current_music = music_path
         except Exception as e:
             print(f"播放音乐失败: {e}")
 
     def stop_music(self):
         """停止音乐"""
+        if not self.mixer:
+            return
         try:
-            pygame.mixer.music.stop()
+            self.mixer.music.stop()
             self.current_music = None
         except Exception:
             pass
 
-
     def _set_buttons_running(self, running):
         """设置按钮状态"""
         state = tk.DISABLED if running else tk.NORMAL
         self.btn_squat.config(state=state)
         self.btn_pushup.config(state=state)
+        self.btn_auto.config(state=state)
 
     def _watch_child(self, proc):
         """监视子进程"""
@@ -752,42 +749,59 @@ class FitnessAppUI:
             return f"{secs}秒"
 
     def get_final_count(self, name):
-        """获取最终计数"""
-        if name == "深蹲":
-            count_file = os.path.join(self.data_dir, "squat_count.txt")
-        else:
-            count_file = os.path.join(self.data_dir, "pushup_count.txt")
-        
+        """获取最终计数，优先使用子进程通过控制通道报告的计数"""
+        if self.control is not None and self.control.last_count is not None:
+            return self.control.last_count
+
+        # 没有收到报告时（如子进程异常退出），读取训练记录中最近一次训练的次数
+        exercise = {"深蹲": "squat", "俯卧撑": "pushup", "动作": "auto"}.get(name)
+        if exercise is None or not os.path.exists(os.path.join(self.data_dir, "sessions.db")):
+            return 0
+        store = SessionStore(os.path.join(self.data_dir, "sessions.db"))
         try:
-            if os.path.exists(count_file):
-                with open(count_file, 'r') as f:
-                    return int(f.read().strip())
+            return store.last_count(exercise) or 0
         except Exception:
-            pass
-        return 0
+            return 0
+        finally:
+            store.close()
 
     def _poll_process(self):
-        """轮询检查进程状态"""
+        """轮询检查进程状态，并刷新实时统计"""
         if self.current_process and self.current_process.poll() is not None:
             self._on_child_exit()
+        if self.current_process:
+            self._update_live_label()
+        elif self.live_label.cget("text"):
+            self.live_label.config(text="")
         self.root.after(200, self._poll_process)
 
+    def _update_live_label(self):
+        """显示实时次数、速率和帧率"""
+        stats = self.live_stats.snapshot()
+        if stats["calibration_progress"] is not None:
+            text = f"校准中 {stats['calibration_progress']}%"
+        elif self.countdown_active:
+            text = (f"{stats['count']} 个  |  当前 {stats['current_rate']:.1f} 个/分"
+                    f"  |  平均 {stats['average_rate']:.1f} 个/分")
+        else:
+            text = ""
+        # 自动识别时显示当前识别到的运动
+        if text and stats["exercise"] in EXERCISE_NAMES:
+            text = f"{EXERCISE_NAMES[stats['exercise']]}  |  {text}"
+        if stats["fps"]:
+            text = f"{text}  |  {stats['fps']:.0f} FPS" if text else f"{stats['fps']:.0f} FPS"
+        self.live_label.config(text=text)
+
     def reset_current(self):
         """重置当前运动计数"""
         if self.current_process and self.current_process.poll() is None:
             try:
-                # 创建重置信号文件
-                flag_path = os.path.join(self.data_dir, "reset.flag")
-                with open(flag_path, 'w') as f:
-                    f.write('reset')
+                # 通知子进程重置
+                if not self.control.send("reset"):
+                    raise RuntimeError("无法连接训练进程")
                 # 重置计时器
                 self.stop_countdown()
                 self.countdown_label.config(text="准备中...", fg=self.colors["sub_text"])
-                if os.path.exists(self.signal_file):
-                    try:
-                        os.remove(self.signal_file)
-                    except:
-                        pass
                 self.wait_for_start_signal()
 
             except Exception as e:
@@ -795,32 +809,70 @@ class FitnessAppUI:
         else:
             messagebox.showinfo("提示", "当前没有运行中的训练")
 
-    def start_script(self, script_path, name):
-        """启动训练脚本"""
-        if not os.path.exists(script_path):
-            messagebox.showerror("错误", f"找不到脚本：\n{script_path}")
-            return
+    def _ensure_worker(self):
+        """确保常驻计数进程在运行，进程退出或被结束后重新启动"""
+        if self.worker is not None and self.worker.is_alive():
+            return self.worker
+        if self.worker is not None:
+            self.worker.terminate()
+            self.worker = None
+        if not os.path.exists(self.worker_script):
+            print(f"找不到脚本：{self.worker_script}")
+            return None
+        try:
+            self.worker = WorkerProcess(self.worker_script, on_message=self._post_control_message,
+                                        cwd=self.base_dir)
+        except Exception as e:
+            print(f"启动常驻计数进程失败: {e}")
+        return self.worker
+
+    def start_training(self, exercise, name):
+        """在常驻计数进程中开始一次训练"""
 
         if self.current_process and self.current_process.poll() is None:
             messagebox.showinfo("提示", f"当前正在运行：{self.current_name}\n请先停止或等待结束。")
             return
+        if self.session_job is not None:
+            return
 
         try:
             self.stop_music()
             self.stop_countdown()
             self.exit_handling = False
 
-            if os.path.exists(self.signal_file):
-                os.remove(self.signal_file)
+            worker = self._ensure_worker()
+            if worker is None:
+                raise RuntimeError("常驻计数进程未运行")
+            self.control = worker.control
+            self.live_stats.clear()
+        except Exception as e:
+            messagebox.showerror("启动失败", f"{name} 启动失败：\n{e}")
+            return
 
-            self.current_process = subprocess.Popen(
-                [sys.executable, script_path],
-                cwd=self.base_dir,
-                creationflags=0
-            )
+        # 常驻进程还在加载模型时先禁用按钮，连接后再发送训练命令，不在界面线程中阻塞等待
+        self._set_buttons_running(True)
+        loading = "模型加载中..." if not worker.ready.is_set() else "准备中..."
+        self.countdown_label.config(text=loading, fg=self.colors["sub_text"])
+        self._begin_session(exercise, name, time.monotonic() + WORKER_CONNECT_TIMEOUT)
+
+    def _begin_session(self, exercise, name, deadline):
+        """常驻进程连接后开始训练，尚未连接时用 root.after 轮询"""
+        self.session_job = None
+        worker = self.worker
+        try:
+            if worker is None or not worker.is_alive():
+                raise RuntimeError("常驻计数进程已退出")
+            if not worker.control.wait_connected(0):
+                if time.monotonic() < deadline:
+                    self.session_job = self.root.after(
+                        100, lambda: self._begin_session(exercise, name, deadline))
+                    return
+                raise RuntimeError("常驻计数进程未能连接")
+
+            # 训练对象提供与子进程相同的 poll/wait/terminate 接口
+            self.current_process = worker.start_session(exercise, connect_timeout=0)
             self.current_name = name
 
-            self.countdown_label.config(text="准备中...", fg=self.colors["sub_text"])
             self.wait_for_start_signal()
 
             if name == "深蹲":
@@ -828,29 +880,55 @@ class FitnessAppUI:
             else:
                 self.play_music(self.pushup_music)
 
-            self._set_buttons_running(True)
-
             watcher = threading.Thread(target=self._watch_child, args=(self.current_process,), daemon=True)
             watcher.start()
         except Exception as e:
             self.current_process = None
             self.current_name = None
+            self._set_buttons_running(False)
+            self.countdown_label.config(text="")
             messagebox.showerror("启动失败", f"{name} 启动失败：\n{e}")
 
     def wait_for_start_signal(self):
-        """等待子脚本发送开始信号"""
-        if os.path.exists(self.signal_file):
+        """等待子脚本通过控制通道发送开始消息"""
+        self.waiting_for_start = True
+
+    def _post_control_message(self, message_type, payload):
+        """控制通道的消息在后台线程中收到，转到界面线程处理"""
+        # 实时事件只更新统计，由进程轮询定时刷新显示
+        if message_type == "events":
+            self.live_stats.apply(payload["events"])
+            return
+        try:
+            self.root.after(0, lambda: self._on_control_message(message_type, payload))
+        except (RuntimeError, tk.TclError):
+            pass
+
+    def _on_control_message(self, message_type, payload):
+        """处理子进程发来的消息"""
+        if message_type == "ready" and self.countdown_label.cget("text") == "模型加载中...":
+            self.countdown_label.config(text="准备中...")
+        if message_type == "start" and self.waiting_for_start:
+            if self.current_process and self.current_process.poll() is None:
+                self.waiting_for_start = False
+                self.start_countdown()
+
+    def _stop_process(self, timeout):
+        """通过控制通道通知子进程保存计数并退出，超时未退出则强制结束"""
+        try:
+            if not self.control.send("stop"):
+                raise RuntimeError("无法连接训练进程")
             try:
-                os.remove(self.signal_file)
+                self.current_process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                self.current_process.terminate()
+                self.current_process.wait(timeout=1)
+        except Exception as e:
+            print(f"停止子进程出错: {e}")
+            try:
+                self.current_process.terminate()
             except:
                 pass
-            self.start_countdown()
-            self.signal_check_job = None
-        elif self.current_process and self.current_process.poll() is None:
-            self.signal_check_job = self.root.after(100, self.wait_for_start_signal)
-        else:
-            self.signal_check_job = None
-            self.countdown_label.config(text="")
 
     def stop_current(self):
         """停止当前训练并退出程序"""
@@ -862,27 +940,7 @@ class FitnessAppUI:
 
             self.stop_countdown()
             self.stop_music()
-
-            try:
-                with open(self.stop_signal_file, 'w') as f:
-                    f.write('stop')
-
-                try:
-                    self.current_process.wait(timeout=3)
-                except subprocess.TimeoutExpired:
-                    self.current_process.terminate()
-                    self.current_process.wait(timeout=1)
-            except Exception:
-                try:
-                    self.current_process.terminate()
-                except:
-                    pass
-            finally:
-                if os.path.exists(self.stop_signal_file):
-                    try:
-                        os.remove(self.stop_signal_file)
-                    except:
-                        pass
+            self._stop_process(timeout=3)
 
             final_count = 0
             if finished_name:
@@ -899,40 +957,22 @@ class FitnessAppUI:
 
     def on_close(self):
         """关闭程序"""
-        if os.path.exists(self.signal_file):
-            try:
-                os.remove(self.signal_file)
-            except:
-                pass
-
-        if os.path.exists(self.stop_signal_file):
-            try:
-                os.remove(self.stop_signal_file)
-            except:
-                pass
-
+        if self.session_job is not None:
+            self.root.after_cancel(self.session_job)
+            self.session_job = None
         self.stop_countdown()
         self.stop_music()
 
-        if self.current_process:
-            try:
-                if self.current_process.poll() is None:
-                    with open(self.stop_signal_file, 'w') as f:
-                        f.write('stop')
-                    try:
-                        self.current_process.wait(timeout=2)
-                    except:
-                        self.current_process.terminate()
-            except Exception:
-                pass
-            finally:
-                if os.path.exists(self.stop_signal_file):
-                    try:
-                        os.remove(self.stop_signal_file)
-                    except:
-                        pass
-
-        pygame.mixer.quit()
+        if self.current_process and self.current_process.poll() is None:
+            self._stop_process(timeout=2)
+
+        if self.worker is not None:
+            self.worker.close()
+            self.worker = None
+            self.control = None
+
+        if self.mixer:
+            self.mixer.quit()
         self.root.destroy()
 
 
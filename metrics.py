@@ -0,0 +1,294 @@
+"""运行指标：计数主循环的每帧耗时和推理耗时直方图、帧率、丢帧、语音队列深度和完成次数
+
+可选在画面上显示帧率/耗时（HUD），并导出为 Prometheus 文本格式：定期写入文件
+（node_exporter 的 textfile collector 可直接读取），或在本机开启 HTTP /metrics 端点。
+未开启时使用 NullMetrics，每帧只多几次空方法调用；丢帧和语音队列只在导出时读取，不增加每帧开销。
+"""
+import bisect
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+
+# 命令行参数未指定时读取的环境变量（主程序启动的常驻进程会继承）
+ENV_FILE = "FITNESS_METRICS_FILE"
+ENV_PORT = "FITNESS_METRICS_PORT"
+ENV_HUD = "FITNESS_HUD"
+
+# 耗时直方图的桶上界（秒）
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.02, 0.033, 0.05, 0.075, 0.1, 0.15, 0.25, 0.5, 1.0)
+
+
+class Histogram:
+    """固定桶的直方图，observe() 为一次二分查找"""
+
+    def __init__(self, bounds=SECONDS_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.buckets = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def render(self, name, help_text):
+        """Prometheus 文本格式，桶计数为累计值"""
+        lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        cumulative = 0
+        for bound, count in zip(self.bounds + (float("inf"),), list(self.buckets)):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{name}_bucket{{le="{le}"}} {cumulative}')
+        lines.append(f"{name}_sum {self.sum}")
+        lines.append(f"{name}_count {self.count}")
+        return lines
+
+
+class FrameMetrics:
+    """计数主循环的指标：每帧调用 begin_frame()/end_frame()，推理后调用 inference()
+
+    hud 为 True 时 draw_hud() 在画面左下角显示最近 hud_interval 秒的帧率、平均推理和每帧耗时。
+    """
+
+    enabled = True
+
+    def __init__(self, hud=False, hud_interval=0.5):
+        self.hud = hud
+        self.hud_interval = hud_interval
+        self.exporters = []
+
+        self.exercise = ""
+        self.source = None
+        self.speech = None
+        self.frames = 0
+        self.reps = 0
+        self.reps_total = 0
+        self.frame_seconds = Histogram()
+        self.inference_seconds = Histogram()
+
+        # 最近一个统计窗口的结果（HUD 和 fps 指标使用）
+        self.fps = 0.0
+        self.inference_ms = 0.0
+        self.frame_ms = 0.0
+        self._frame_start = None
+        self._window_start = time.perf_counter()
+        self._window_frames = 0
+        self._window_frame_seconds = 0.0
+        self._window_inferences = 0
+        self._window_inference_seconds = 0.0
+
+    def attach(self, exercise, source=None, speech=None):
+        """开始一次训练：记录运动类型，丢帧和语音队列在导出时从 source/speech 读取"""
+        self.exercise = exercise
+        self.source = source
+        self.speech = speech
+        self.reps = 0
+
+    def begin_frame(self):
+        """取得一帧后调用"""
+        self._frame_start = time.perf_counter()
+
+    def inference(self, seconds):
+        """记录一次姿态推理的耗时"""
+        self.inference_seconds.observe(seconds)
+        self._window_inferences += 1
+        self._window_inference_seconds += seconds
+
+    def end_frame(self, count):
+        """一帧处理（含显示）完成，count 为当前完成次数"""
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            elapsed = now - self._frame_start
+            self.frame_seconds.observe(elapsed)
+            self._window_frame_seconds += elapsed
+        self.frames += 1
+        if count > self.reps:
+            self.reps_total += count - self.reps
+        self.reps = count
+
+        self._window_frames += 1
+        window = now - self._window_start
+        if window >= self.hud_interval:
+            self.fps = self._window_frames / window
+            self.frame_ms = self._window_frame_seconds / self._window_frames * 1000
+            if self._window_inferences:
+                self.inference_ms = self._window_inference_seconds / self._window_inferences * 1000
+            self._window_start = now
+            self._window_frames = self._window_inferences = 0
+            self._window_frame_seconds = self._window_inference_seconds = 0.0
+
+    @property
+    def dropped_frames(self):
+        return getattr(self.source, "frames_dropped", 0)
+
+    def draw_hud(self, image):
+        """在画面左下角显示帧率和耗时"""
+        if not self.hud:
+            return image
+        text = (f"FPS {self.fps:.1f}  infer {self.inference_ms:.1f} ms  "
+                f"frame {self.frame_ms:.1f} ms  drop {self.dropped_frames}")
+        cv2.putText(image, text, (10, image.shape[0] - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.6,
+                    (0, 255, 0), 1, cv2.LINE_AA)
+        return image
+
+    def render(self):
+        """导出为 Prometheus 文本格式"""
+        lines = [
+            "# HELP fitness_session_info Current exercise.",
+            "# TYPE fitness_session_info gauge",
+            f'fitness_session_info{{exercise="{self.exercise}"}} 1',
+            "# HELP fitness_frames_total Frames processed by the counter loop.",
+            "# TYPE fitness_frames_total counter",
+            f"fitness_frames_total {self.frames}",
+            "# HELP fitness_dropped_frames_total Camera frames dropped because the loop fell behind.",
+            "# TYPE fitness_dropped_frames_total counter",
+            f"fitness_dropped_frames_total {self.dropped_frames}",
+            "# HELP fitness_fps Frames per second over the last window.",
+            "# TYPE fitness_fps gauge",
+            f"fitness_fps {self.fps:.2f}",
+            "# HELP fitness_reps Completed reps in the current session.",
+            "# TYPE fitness_reps gauge",
+            f"fitness_reps {self.reps}",
+            "# HELP fitness_reps_total Completed reps across all sessions.",
+            "# TYPE fitness_reps_total counter",
+            f"fitness_reps_total {self.reps_total}",
+        ]
+        if self.speech is not None:
+            stats = self.speech.stats()
+            lines += [
+                "# HELP fitness_speech_queue_depth Announcements waiting to be spoken.",
+                "# TYPE fitness_speech_queue_depth gauge",
+                f"fitness_speech_queue_depth {stats['depth']}",
+                "# HELP fitness_speech_dropped_total Stale count announcements dropped.",
+                "# TYPE fitness_speech_dropped_total counter",
+                f"fitness_speech_dropped_total {stats['dropped']}",
+            ]
+        lines += self.frame_seconds.render("fitness_frame_seconds", "Per-frame processing time, read to display.")
+        lines += self.inference_seconds.render("fitness_inference_seconds", "Pose inference time.")
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        """停止导出（导出文件会写入最后一次结果）"""
+        for exporter in self.exporters:
+            exporter.close()
+        self.exporters = []
+
+
+class NullMetrics:
+    """不收集指标时使用的空对象"""
+
+    enabled = False
+
+    def attach(self, exercise, source=None, speech=None):
+        pass
+
+    def begin_frame(self):
+        pass
+
+    def inference(self, seconds):
+        pass
+
+    def end_frame(self, count):
+        pass
+
+    def draw_hud(self, image):
+        return image
+
+    def close(self):
+        pass
+
+
+class TextFileExporter:
+    """每 interval 秒把指标写入文件（先写临时文件再替换，读取方不会读到写了一半的内容）"""
+
+    def __init__(self, metrics, path, interval=5.0):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def write(self):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(self.metrics.render())
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"写入运行指标失败: {e}")
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def close(self):
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+        self.write()
+
+
+class HttpExporter:
+    """在本机 port 端口提供 GET /metrics"""
+
+    def __init__(self, metrics, port, host="127.0.0.1"):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def create_metrics(path=None, port=None, hud=False):
+    """按参数（未指定时按环境变量）创建指标收集器，都未开启时返回 NullMetrics"""
+    path = path or os.environ.get(ENV_FILE) or None
+    if port is None and os.environ.get(ENV_PORT, "").isdigit():
+        port = int(os.environ[ENV_PORT])
+    hud = hud or os.environ.get(ENV_HUD, "") not in ("", "0")
+    if not (path or port or hud):
+        return NullMetrics()
+
+    metrics = FrameMetrics(hud=hud)
+    if path:
+        metrics.exporters.append(TextFileExporter(metrics, path))
+    if port:
+        try:
+            metrics.exporters.append(HttpExporter(metrics, port))
+            print(f"运行指标: http://127.0.0.1:{port}/metrics")
+        except OSError as e:
+            print(f"开启运行指标端点失败: {e}")
+    return metrics
+
+
+def add_metrics_arguments(parser):
+    """为计数脚本添加指标相关的命令行参数"""
+    parser.add_argument("--hud", action="store_true", help=f"在画面上显示帧率和耗时（或设置环境变量 {ENV_HUD}=1）")
+    parser.add_argument("--metrics-file", default=None, metavar="PATH",
+                        help=f"定期把运行指标写入 Prometheus 文本文件（或环境变量 {ENV_FILE}）")
+    parser.add_argument("--metrics-port", type=int, default=None, metavar="PORT",
+                        help=f"在本机端口提供 /metrics（或环境变量 {ENV_PORT}）")
@@ -0,0 +1,126 @@
+"""姿态模型自动选择：启动时测量本机各 model_complexity 的推理速度，
+选择满足目标帧率的最高精度模型，结果按主机缓存在 data/model_profile.json 中。
+"""
+import json
+import os
+import platform
+import time
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from capture import SyntheticSource
+from pose_utils import DISPLAY_WIDTH, DISPLAY_HEIGHT, INFERENCE_SIZE, prepare_inference_image
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_PATH = os.path.join(BASE_DIR, "data", "model_profile.json")
+PROBE_IMAGE = os.path.join(BASE_DIR, "assets", "images", "squat.png")
+
+# 按精度从高到低排列
+MODEL_COMPLEXITIES = (2, 1, 0)
+DEFAULT_MODEL_COMPLEXITY = 1
+TARGET_FPS = 20.0
+
+# 环境变量覆盖，优先级低于命令行参数
+ENV_OVERRIDE = "FITNESS_MODEL_COMPLEXITY"
+
+
+def probe_frame():
+    """生成测速用的画面：把素材中的人物贴到显示尺寸的背景上，没有素材时使用合成画面"""
+    sprite = cv2.imread(PROBE_IMAGE, cv2.IMREAD_UNCHANGED)
+    if sprite is None or sprite.ndim != 3 or sprite.shape[2] != 4:
+        return SyntheticSource(DISPLAY_WIDTH, DISPLAY_HEIGHT).read().image
+
+    scale = DISPLAY_HEIGHT * 0.9 / sprite.shape[0]
+    sprite = cv2.resize(sprite, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    h, w = sprite.shape[:2]
+    frame = np.full((DISPLAY_HEIGHT, DISPLAY_WIDTH, 3), 200, dtype=np.uint8)
+    y, x = (DISPLAY_HEIGHT - h) // 2, (DISPLAY_WIDTH - w) // 2
+    alpha = sprite[:, :, 3:4].astype(np.float32) / 255.0
+    region = frame[y:y + h, x:x + w]
+    region[:] = (sprite[:, :, :3] * alpha + region * (1 - alpha)).astype(np.uint8)
+    return frame
+
+
+def probe_fps(model_complexity, frame, inference_size=INFERENCE_SIZE, frames=20, warmup=3):
+    """测量指定 model_complexity 在本机上的推理帧率"""
+    image = prepare_inference_image(frame, inference_size)
+    with mp.solutions.pose.Pose(model_complexity=model_complexity) as pose:
+        for _ in range(warmup):
+            pose.process(image)
+        start = time.perf_counter()
+        for _ in range(frames):
+            pose.process(image)
+        elapsed = time.perf_counter() - start
+    return frames / elapsed if elapsed > 0 else float("inf")
+
+
+def _load_cache(cache_path):
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache_path, cache):
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        print(f"保存模型选择缓存失败: {e}")
+
+
+def choose_model_complexity(override=None, target_fps=TARGET_FPS, inference_size=INFERENCE_SIZE,
+                            cache_path=CACHE_PATH, refresh=False):
+    """选择 model_complexity
+
+    优先使用 override（命令行）或环境变量 FITNESS_MODEL_COMPLEXITY；
+    否则读取本机缓存，缓存不存在、参数变化或 refresh 为 True 时重新测速。
+    """
+    if override is None and os.environ.get(ENV_OVERRIDE, "").isdigit():
+        override = int(os.environ[ENV_OVERRIDE])
+    if override is not None:
+        return override
+
+    host = platform.node() or "unknown"
+    cache = _load_cache(cache_path)
+    profile = cache.get(host)
+    if (not refresh and profile
+            and profile.get("target_fps") == target_fps
+            and profile.get("inference_size") == inference_size
+            and profile.get("mediapipe") == mp.__version__):
+        return profile["model_complexity"]
+
+    print("正在测试本机姿态模型速度...")
+    frame = probe_frame()
+    chosen, measured = None, {}
+    for complexity in MODEL_COMPLEXITIES:
+        try:
+            fps = probe_fps(complexity, frame, inference_size)
+        except Exception as e:
+            print(f"model_complexity={complexity} 测速失败: {e}")
+            continue
+        measured[str(complexity)] = round(fps, 1)
+        print(f"model_complexity={complexity}: {fps:.1f} FPS")
+        if fps >= target_fps:
+            chosen = complexity
+            break
+
+    # 都达不到目标帧率时使用最快的模型；全部失败时使用 MediaPipe 默认值
+    if chosen is None:
+        chosen = min(int(c) for c in measured) if measured else DEFAULT_MODEL_COMPLEXITY
+
+    cache[host] = {
+        "model_complexity": chosen,
+        "target_fps": target_fps,
+        "inference_size": inference_size,
+        "mediapipe": mp.__version__,
+        "fps": measured,
+        "probed_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    _save_cache(cache_path, cache)
+    print(f"已选择 model_complexity={chosen}")
+    return chosen
@@ -0,0 +1,289 @@
+"""多人计数：一个摄像头同时统计画面中多人的深蹲/俯卧撑次数（团体课）
+
+使用 MediaPipe Tasks 的 PoseLandmarker（num_poses 人），每帧只做一次缩放和颜色转换，
+人体检测在视频模式下由跟踪结果复用，不必每人每帧重新检测；所有人的关节角在一次批量计算中得到。
+PersonTracker 按躯干中心在帧间匹配，给每个人固定的编号，每人一个独立的计数状态机。
+
+模型文件需单独下载，默认放在 assets/models/pose_landmarker_lite.task：
+https://storage.googleapis.com/mediapipe-models/pose_landmarker/pose_landmarker_lite/float16/latest/pose_landmarker_lite.task
+"""
+import argparse
+import os
+import time
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from capture import FrameClock, open_source
+from control_channel import NullControlClient, connect_control
+from exercise_engine import EXERCISES, ExerciseCounter
+from pose_utils import (DISPLAY_WIDTH, DISPLAY_HEIGHT, POSE_CONFIDENCE, joint_angles, landmarks_to_array,
+                        prepare_inference_image)
+from session_store import NullSessionStore, NullSessionWriter, SessionStore
+from telemetry import Telemetry
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODEL = os.path.join(BASE_DIR, "assets", "models", "pose_landmarker_lite.task")
+
+# 多人时每人在画面中较小，推理尺寸默认比单人大
+MULTI_INFERENCE_SIZE = 640
+
+# 左右肩、左右髋的关键点编号，取平均作为躯干中心
+_TORSO = [11, 12, 23, 24]
+
+# 每个人的骨架颜色（BGR），按编号循环使用
+PERSON_COLORS = [(155, 247, 255), (160, 145, 246), (120, 220, 120), (255, 200, 120), (120, 180, 255)]
+
+
+class MultiPoseEstimator:
+    """PoseLandmarker 的视频模式封装：输入 BGR 帧，返回每个人的 (33, 4) 关键点数组"""
+
+    def __init__(self, model_path=DEFAULT_MODEL, num_poses=4, confidence=0.5, inference_size=MULTI_INFERENCE_SIZE):
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"找不到姿态模型文件: {model_path}（下载地址见 multi_person.py 说明）")
+        vision = mp.tasks.vision
+        options = vision.PoseLandmarkerOptions(
+            base_options=mp.tasks.BaseOptions(model_asset_path=model_path),
+            running_mode=vision.RunningMode.VIDEO,
+            num_poses=num_poses,
+            min_pose_detection_confidence=confidence,
+            min_pose_presence_confidence=confidence,
+            min_tracking_confidence=confidence,
+        )
+        self.landmarker = vision.PoseLandmarker.create_from_options(options)
+        self.inference_size = inference_size
+        self._last_ms = -1
+
+    def process(self, frame, timestamp):
+        """对一帧 BGR 图像推理，timestamp 为帧时间（秒），返回 [(33, 4) 数组]"""
+        image = mp.Image(image_format=mp.ImageFormat.SRGB,
+                         data=np.ascontiguousarray(prepare_inference_image(frame, self.inference_size)))
+        # 视频模式要求时间戳严格递增
+        timestamp_ms = max(int(timestamp * 1000), self._last_ms + 1)
+        self._last_ms = timestamp_ms
+        result = self.landmarker.detect_for_video(image, timestamp_ms)
+        return [landmarks_to_array(landmarks) for landmarks in result.pose_landmarks]
+
+    def close(self):
+        self.landmarker.close()
+
+
+class PersonTracker:
+    """按躯干中心在帧间匹配，给每个人分配固定编号
+
+    距离小于 max_distance（归一化坐标）才视为同一人，超过 max_missing 秒未出现的编号作废。
+    """
+
+    def __init__(self, max_distance=0.15, max_missing=1.0):
+        self.max_distance = max_distance
+        self.max_missing = max_missing
+        self.tracks = {}  # 编号 -> (躯干中心, 最后出现时间)
+        self._next_id = 1
+
+    def clear(self):
+        self.tracks.clear()
+        self._next_id = 1
+
+    def update(self, centers, timestamp):
+        """centers 为 (P, 2) 的躯干中心，返回每个人的编号列表"""
+        self.tracks = {track_id: track for track_id, track in self.tracks.items()
+                       if timestamp - track[1] <= self.max_missing}
+
+        ids = [None] * len(centers)
+        track_ids = list(self.tracks)
+        if track_ids and len(centers):
+            previous = np.array([self.tracks[track_id][0] for track_id in track_ids])
+            distances = np.linalg.norm(centers[:, None, :] - previous[None, :, :], axis=-1)
+            # 贪心匹配：从距离最近的一对开始，每人、每个编号只用一次
+            used = set()
+            for flat in np.argsort(distances, axis=None):
+                person, track = divmod(int(flat), len(track_ids))
+                if distances[person, track] > self.max_distance:
+                    break
+                if ids[person] is None and track not in used:
+                    ids[person] = track_ids[track]
+                    used.add(track)
+
+        for person, center in enumerate(centers):
+            if ids[person] is None:
+                ids[person] = self._next_id
+                self._next_id += 1
+            self.tracks[ids[person]] = (center, timestamp)
+        return ids
+
+
+class MultiPersonCounter:
+    """为画面中每个被跟踪的人维护一个 ExerciseCounter（校准规则与单人计数器相同，见 exercise_engine）"""
+
+    def __init__(self, exercise, tracker=None, control=None, store=None):
+        """store 为训练记录库，每次动作连同人员编号记录在同一次训练中，默认不保存记录"""
+        self.spec = EXERCISES[exercise]
+        self.tracker = tracker if tracker is not None else PersonTracker()
+        self.control = control if control is not None else NullControlClient()
+        self.clock = FrameClock()
+        self.telemetry = Telemetry(self.control, clock=self.clock)
+        self.store = store if store is not None else NullSessionStore()
+        self.session = NullSessionWriter()
+        self.people = {}  # 编号 -> ExerciseCounter，离开画面后保留计数
+        self.started = False
+
+    @property
+    def counter(self):
+        """所有人的总次数"""
+        return sum(person.count for person in self.people.values())
+
+    def update(self, persons, width=DISPLAY_WIDTH, height=DISPLAY_HEIGHT):
+        """persons 为每个人的 (33, 4) 关键点数组，返回对应的编号列表"""
+        if not persons:
+            self.tracker.update(np.empty((0, 2)), self.clock())
+            return []
+        if not self.started:
+            self.started = True
+            self.control.send("start")
+            self.telemetry.start()
+
+        # 所有人的关节角和躯干中心一次批量计算
+        points = np.stack(persons)
+        angles = self.spec.feature(joint_angles(points, self.spec.angle_scale((width, height))))
+        ids = self.tracker.update(points[:, _TORSO, :2].mean(axis=1), self.clock())
+
+        for person_id, angle in zip(ids, angles):
+            person = self.people.get(person_id)
+            if person is None:
+                person = self.people[person_id] = ExerciseCounter(self.spec)
+            event = person.update(float(angle), self.clock())
+            if event == "rep":
+                self.telemetry.rep(self.counter)
+            if event in ("rep", "shallow", "minimal"):
+                self.session.rep(person.count, person.reps.last_depth, person.reps.last_quality, person=person_id)
+        return ids
+
+    def reset(self):
+        """清零所有人的计数并重新分配编号"""
+        self.people.clear()
+        self.tracker.clear()
+        self.telemetry.reset()
+
+    def draw(self, image, persons, ids):
+        """绘制每个人的骨架、编号和次数"""
+        h, w, _ = image.shape
+        for points, person_id in zip(persons, ids):
+            color = PERSON_COLORS[person_id % len(PERSON_COLORS)]
+            xy = (points[:, :2] * (w, h)).astype(np.int32)
+            for a, b in mp.solutions.pose.POSE_CONNECTIONS:
+                cv2.line(image, tuple(xy[a]), tuple(xy[b]), color, 2)
+            person = self.people[person_id]
+            label = f"#{person_id}: {person.count}" if person.ready else f"#{person_id}: calibrating"
+            x, y = xy[_TORSO[:2]].mean(axis=0).astype(int)
+            cv2.putText(image, label, (x - 60, max(30, y - 60)),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1.0, color, 2, cv2.LINE_AA)
+
+        cv2.putText(image, f"People: {len(ids)}  Total: {self.counter}", (10, 40),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 2, cv2.LINE_AA)
+        return image
+
+
+def run_session(counter, cap, estimator, headless=False):
+    """运行一次多人计数，直到收到停止命令、窗口关闭或帧源结束"""
+    counter.session = counter.store.start_session(counter.spec.name, clock=counter.clock, source="multi_person")
+
+    WINDOW_NAME = 'Multi-person Counter'
+    if not headless:
+        cv2.namedWindow(WINDOW_NAME, cv2.WINDOW_NORMAL)
+        cv2.resizeWindow(WINDOW_NAME, DISPLAY_WIDTH, DISPLAY_HEIGHT)
+
+    frames = 0
+    inference_seconds = 0.0
+    stop_requested = False
+    while cap.isOpened():
+        # 处理主程序发来的命令（只读内存队列，不访问文件系统）
+        for command, payload in counter.control.poll():
+            if command == "stop":
+                stop_requested = True
+            elif command == "quit":
+                # 结束本次训练，退出命令留给常驻进程的外层循环处理
+                counter.control.requeue(command, payload)
+                stop_requested = True
+            elif command == "reset":
+                counter.reset()
+                counter.control.send("ack", command="reset", count=counter.counter)
+        if stop_requested:
+            break
+
+        if not headless and cv2.getWindowProperty(WINDOW_NAME, cv2.WND_PROP_VISIBLE) < 1:
+            break
+
+        frame = cap.read()
+        if frame is None:
+            break
+        counter.clock.tick(frame.timestamp)
+        image = cv2.flip(frame.image, 1)
+
+        inference_start = time.perf_counter()
+        persons = estimator.process(image, frame.timestamp)
+        inference_seconds += time.perf_counter() - inference_start
+        frames += 1
+
+        ids = counter.update(persons)
+        counter.telemetry.frame()
+
+        if headless:
+            continue
+        image = cv2.resize(image, (DISPLAY_WIDTH, DISPLAY_HEIGHT))
+        cv2.imshow(WINDOW_NAME, counter.draw(image, persons, ids))
+
+        key = cv2.waitKey(1) & 0xFF
+        if key == ord('q'):
+            break
+        elif key == ord('r'):
+            counter.reset()
+
+    if not headless:
+        cv2.destroyAllWindows()
+
+    for person_id, person in sorted(counter.people.items()):
+        print(f"#{person_id}: {person.count} 个")
+    if frames:
+        print(f"共 {frames} 帧，平均推理 {inference_seconds / frames * 1000:.1f} ms/帧")
+    counter.session.finish(counter.counter)
+    counter.telemetry.flush()
+    counter.control.send("ack", command="stop", count=counter.counter)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="多人运动计数")
+    parser.add_argument("--exercise", choices=sorted(EXERCISES), default="squat", help="运动类型")
+    parser.add_argument("--num-poses", type=int, default=4, help="最多同时跟踪的人数")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="PoseLandmarker 模型文件（.task）")
+    parser.add_argument("--inference-size", type=int, default=MULTI_INFERENCE_SIZE,
+                        help="姿态推理图像的长边像素，0 表示使用原始分辨率")
+    parser.add_argument("--source", default=None,
+                        help="帧源：摄像头编号（默认0）、视频文件、图片目录或 synthetic")
+    parser.add_argument("--headless", action="store_true", help="无界面模式：不显示窗口")
+    args = parser.parse_args()
+
+    print("多人计数器启动")
+
+    estimator = MultiPoseEstimator(args.model, num_poses=args.num_poses,
+                                   confidence=POSE_CONFIDENCE[args.exercise],
+                                   inference_size=args.inference_size)
+    cap = open_source(args.source)
+    control = connect_control()
+    counter = MultiPersonCounter(args.exercise, control=control, store=SessionStore())
+    try:
+        run_session(counter, cap, estimator, args.headless)
+    finally:
+        cap.release()
+        estimator.close()
+        control.close()
+        counter.store.close()
+    if cap.stats_text():
+        print(cap.stats_text())
+
+    print("程序结束")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import cv2
+import numpy as np
+
+# 显示分辨率（叠加层按此尺寸绘制）
+DISPLAY_WIDTH, DISPLAY_HEIGHT = 1280, 720
+
+# 姿态推理默认尺寸（长边像素），0 表示使用原始分辨率
+INFERENCE_SIZE = 384
+
+# 各运动的姿态检测/跟踪置信度，与交互式计数器的默认值一致
+POSE_CONFIDENCE = {"squat": 0.5, "pushup": 0.7}
+
+
+def prepare_inference_image(frame, size=INFERENCE_SIZE):
+    """将BGR帧按长边等比缩小到推理尺寸，并转换为只读的RGB图像
+
+    MediaPipe 输出的是归一化坐标，因此在小图上推理的结果可以直接绘制到全分辨率画面上。
+    """
+    height, width = frame.shape[:2]
+    if size and max(height, width) > size:
+        scale = size / max(height, width)
+        new_size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        frame = cv2.resize(frame, new_size, interpolation=cv2.INTER_AREA)
+
+    image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    image.flags.writeable = False
+    return image
+
+
+# MediaPipe Pose 关键点数量
+NUM_LANDMARKS = 33
+
+# 关节角定义：名称 -> (端点, 顶点, 端点)，使用 MediaPipe Pose 的 33 个关键点编号
+JOINT_ANGLES = {
+    "left_knee": (23, 25, 27),       # 左髋-左膝-左踝
+    "right_knee": (24, 26, 28),      # 右髋-右膝-右踝
+    "left_elbow": (11, 13, 15),      # 左肩-左肘-左腕
+    "right_elbow": (12, 14, 16),     # 右肩-右肘-右腕
+    "left_hip": (11, 23, 25),        # 左肩-左髋-左膝
+    "right_hip": (12, 24, 26),       # 右肩-右髋-右膝
+    "left_shoulder": (13, 11, 23),   # 左肘-左肩-左髋
+    "right_shoulder": (14, 12, 24),  # 右肘-右肩-右髋
+}
+JOINT_NAMES = tuple(JOINT_ANGLES)
+JOINT_INDEX = {name: i for i, name in enumerate(JOINT_NAMES)}
+_JOINT_TRIPLETS = np.array(list(JOINT_ANGLES.values()), dtype=np.intp)
+
+def landmarks_to_array(landmarks):
+    """将 MediaPipe 关键点列表一次性转换为 (33, 4) 的连续 float32 数组，列为 x, y, z, visibility"""
+    return np.array([(lm.x, lm.y, lm.z, lm.visibility) for lm in landmarks], dtype=np.float32)
+
+
+def joint_angles(points, scale=(1.0, 1.0)):
+    """一次性计算 JOINT_NAMES 中所有关节角（度）
+
+    points 为 (33, k) 或 (N, 33, k) 的关键点数组，只使用前两列 x、y；
+    scale 为 x、y 的缩放系数（如画面宽高），用于在像素坐标系下计算角度。
+    返回 (J,) 或 (N, J) 数组，列顺序与 JOINT_NAMES 一致。
+    """
+    xy = np.asarray(points)[..., :2] * np.asarray(scale, dtype=np.float64)
+    a = xy[..., _JOINT_TRIPLETS[:, 0], :]
+    b = xy[..., _JOINT_TRIPLETS[:, 1], :]
+    c = xy[..., _JOINT_TRIPLETS[:, 2], :]
+
+    ba, bc = a - b, c - b
+    dot = np.einsum("...i,...i->...", ba, bc)
+    norm = np.sqrt(np.einsum("...i,...i->...", ba, ba) * np.einsum("...i,...i->...", bc, bc))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cosine = np.clip(dot / norm, -1.0, 1.0)
+    return np.degrees(np.arccos(cosine))
@@ -0,0 +1,156 @@
+"""可选的性能分析：在计数主循环中对一段帧窗口运行 cProfile，同时对主线程调用栈采样
+
+跳过开头 skip 帧（模型初始化、首帧）后分析 frames 帧，结束时在 data/profiles/ 下生成：
+    <名称>-<时间>.prof       cProfile 原始结果（可用 snakeviz 等工具查看）
+    <名称>-<时间>.txt        按累计耗时和自身耗时排序的函数统计
+    <名称>-<时间>.collapsed  采样得到的折叠调用栈（flamegraph.pl、speedscope 可直接读取）
+由 --profile [帧数] 或环境变量 FITNESS_PROFILE=帧数 开启，不需要修改源码；未开启时每帧只多一次空方法调用。
+"""
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROFILE_DIR = os.path.join(BASE_DIR, "data", "profiles")
+
+# 命令行参数未指定时读取的环境变量（主程序启动的常驻进程会继承），值为分析的帧数
+ENV_PROFILE = "FITNESS_PROFILE"
+DEFAULT_FRAMES = 300
+
+
+class StackSampler:
+    """后台线程每 interval 秒采样一次目标线程的调用栈，按折叠格式计数"""
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+
+    def collapsed(self):
+        """flamegraph.pl 的折叠栈格式：每行 "根;...;叶 样本数" """
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class FrameProfiler:
+    """在计数主循环中每帧调用 frame()，跳过 skip 帧后对接下来的 frames 帧做性能分析"""
+
+    enabled = True
+
+    def __init__(self, name, frames=DEFAULT_FRAMES, skip=30, output_dir=PROFILE_DIR):
+        self.name = name
+        self.frames = frames
+        self.skip = skip
+        self.output_dir = output_dir
+        self._index = 0
+        self._profile = None
+        self._sampler = None
+        self._start = None
+        self._done = False
+
+    def frame(self):
+        """每读取一帧调用一次"""
+        if self._done:
+            return
+        if self._index == self.skip:
+            self._begin()
+        elif self._index == self.skip + self.frames:
+            self._finish(self.frames)
+        self._index += 1
+
+    def _begin(self):
+        self._sampler = StackSampler(threading.get_ident())
+        self._profile = cProfile.Profile()
+        self._start = time.perf_counter()
+        self._sampler.start()
+        self._profile.enable()
+
+    def _finish(self, frames):
+        self._profile.disable()
+        elapsed = time.perf_counter() - self._start
+        self._sampler.stop()
+        self._done = True
+        try:
+            self._dump(frames, elapsed)
+        except OSError as e:
+            print(f"保存性能分析结果失败: {e}")
+
+    def _dump(self, frames, elapsed):
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f"{self.name}-{time.strftime('%Y%m%d-%H%M%S')}")
+        self._profile.dump_stats(f"{base}.prof")
+
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=stream)
+        stream.write(f"{self.name}: 第 {self.skip} 帧起分析 {frames} 帧，用时 {elapsed:.2f} 秒，"
+                     f"平均 {elapsed / max(1, frames) * 1000:.1f} ms/帧（{frames / elapsed:.1f} FPS）\n\n")
+        stream.write("按累计耗时排序：\n")
+        stats.sort_stats("cumulative").print_stats(40)
+        stream.write("按自身耗时排序：\n")
+        stats.sort_stats("tottime").print_stats(25)
+        stream.write("耗时最多的函数的调用方：\n")
+        stats.print_callers(10)
+        with open(f"{base}.txt", "w", encoding="utf-8") as f:
+            f.write(stream.getvalue())
+
+        with open(f"{base}.collapsed", "w", encoding="utf-8") as f:
+            f.write(self._sampler.collapsed())
+        print(f"性能分析结果已保存: {base}.txt / .prof / .collapsed")
+
+    def close(self):
+        """训练提前结束时保存已分析的部分"""
+        if self._profile is not None and not self._done:
+            self._finish(self._index - self.skip)
+        self._done = True
+
+
+class NullProfiler:
+    """不做性能分析时使用的空对象"""
+
+    enabled = False
+
+    def frame(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def create_profiler(frames, name):
+    """frames 为分析的帧数（未指定时读取环境变量 FITNESS_PROFILE），为空或 0 时不分析"""
+    if frames is None and os.environ.get(ENV_PROFILE, "").isdigit():
+        frames = int(os.environ[ENV_PROFILE])
+    if not frames:
+        return NullProfiler()
+    return FrameProfiler(name, frames=frames)
+
+
+def add_profile_arguments(parser):
+    """为计数脚本添加性能分析的命令行参数"""
+    parser.add_argument("--profile", type=int, nargs="?", const=DEFAULT_FRAMES, default=None, metavar="FRAMES",
+                        help=f"对 FRAMES 帧（默认 {DEFAULT_FRAMES}）做性能分析，结果保存到 data/profiles/"
+                             f"（或环境变量 {ENV_PROFILE}=帧数）")
@@ -1,44 +1,46 @@
 import cv2
 import mediapipe as mp
-import numpy as np
 import time
-from queue import Queue
-import threading
-import winsound
-import pythoncom
-import win32com.client
-import os
+import argparse
+
+from backends import create_beep_backend
+from capture import FrameClock, open_source
+from control_channel import NullControlClient, connect_control
+from exercise_engine import PUSHUP, Calibrator, RepCounter
+from landmark_log import NullLandmarkRecorder, create_recorder
+from metrics import NullMetrics, add_metrics_arguments, create_metrics
+from model_tuning import TARGET_FPS, choose_model_complexity
+from profiling import NullProfiler, add_profile_arguments, create_profiler
+from scheduler import InferenceScheduler
+from session_store import NullSessionStore, NullSessionWriter, SessionStore
+from speech import PRIORITY_HIGH, PRIORITY_NORMAL, create_speech_service
+from telemetry import Telemetry
+from pose_utils import (DISPLAY_WIDTH, DISPLAY_HEIGHT, INFERENCE_SIZE, JOINT_INDEX,
+                        joint_angles, landmarks_to_array, prepare_inference_image)
+
+
+# 俯卧撑播报使用的语音设置
+SPEECH_OPTIONS = {"rate": -1, "volume": 100, "prefer_chinese": True}
 
 
 class AutoCalibrationPushupCounter:
     """自动校准俯卧撑计数器"""
 
-    def __init__(self):
-        # 基本计数器
-        self.counter = 0
-        self.stage = None
-
-        # 校准状态
-        self.calibration_state = "waiting"  
-        self.calibration_start_time = None
-        self.calibration_hold_time = 3.0  
-        self.calibration_progress = 0  
-
-        # 角度阈值
-        self.up_threshold = 160  
-        self.down_threshold = 90  
-        self.calibration_margin = 10
-        self.min_depth_for_count = 40  
-        self.min_depth_for_detection = 20
-
-        # 动作检测状态
-        self.was_down = False 
-        self.rep_start_angle = None
-
-        # 稳定性检测
-        self.stable_angles_buffer = [] 
-        self.buffer_size = 15
-        self.stability_threshold = 5.0
+    def __init__(self, speech=None, beeper=None, control=None, store=None, recorder=None, clock=None,
+                 metrics=None, profiler=None):
+        """speech 为语音播报服务（SpeechService），beeper 为提示音后端，默认在 Windows 下使用 SAPI 和 winsound；
+        control 为与主程序之间的控制通道，默认不连接主程序；store 为训练记录库（SessionStore），默认不保存记录；
+        recorder 为关键点录制器（LandmarkRecorder），默认不录制；
+        clock 为计时基准（FrameClock），回放录制时由调用方注入并推进，默认按帧的采集时间计时；
+        metrics 为运行指标（FrameMetrics），默认不收集；profiler 为性能分析（FrameProfiler），默认不分析"""
+        # 计数状态机（阈值和质量规则见 exercise_engine.PUSHUP）
+        self.reps = RepCounter(PUSHUP)
+
+        # 自动校准（保持时间、稳定性窗口和最小角度见 exercise_engine.PUSHUP）
+        self.calibrator = Calibrator(PUSHUP)
+
+        # 角度阈值（校准后相对校准角度设置）
+        self.up_threshold, self.down_threshold = self.reps.thresholds()
 
         # 显示信息
         self.feedback = "Get into pushup starting position"
@@ -52,185 +54,130 @@ class AutoCalibrationPushupCounter:
             'calibration_stability': None
         }
 
-        # 防误触保护
-        self.min_calibration_angle = 140
-
-        # 语音线程
-        self.speech_queue = Queue()
-        self.speech_thread = threading.Thread(target=self._speech_worker, daemon=True)
-        self.speech_thread.start()
-
-    def calculate_angle(self, a, b, c):
-        """计算三点之间的角度"""
-        a, b, c = np.array(a), np.array(b), np.array(c)
-        ba, bc = a - b, c - b
-        cosine_angle = np.dot(ba, bc) / (np.linalg.norm(ba) * np.linalg.norm(bc))
-        cosine_angle = np.clip(cosine_angle, -1.0, 1.0)
-        return np.degrees(np.arccos(cosine_angle))
-
-    def analyze_posture(self, landmarks):
-        """分析姿势，返回手臂角度（平均、左、右）"""
-        # 获取关键点坐标
-        left_shoulder = [
-            landmarks[mp.solutions.pose.PoseLandmark.LEFT_SHOULDER.value].x,
-            landmarks[mp.solutions.pose.PoseLandmark.LEFT_SHOULDER.value].y
-        ]
-        right_shoulder = [
-            landmarks[mp.solutions.pose.PoseLandmark.RIGHT_SHOULDER.value].x,
-            landmarks[mp.solutions.pose.PoseLandmark.RIGHT_SHOULDER.value].y
-        ]
-        left_elbow = [
-            landmarks[mp.solutions.pose.PoseLandmark.LEFT_ELBOW.value].x,
-            landmarks[mp.solutions.pose.PoseLandmark.LEFT_ELBOW.value].y
-        ]
-        right_elbow = [
-            landmarks[mp.solutions.pose.PoseLandmark.RIGHT_ELBOW.value].x,
-            landmarks[mp.solutions.pose.PoseLandmark.RIGHT_ELBOW.value].y
-        ]
-        left_wrist = [
-            landmarks[mp.solutions.pose.PoseLandmark.LEFT_WRIST.value].x,
-            landmarks[mp.solutions.pose.PoseLandmark.LEFT_WRIST.value].y
-        ]
-        right_wrist = [
-            landmarks[mp.solutions.pose.PoseLandmark.RIGHT_WRIST.value].x,
-            landmarks[mp.solutions.pose.PoseLandmark.RIGHT_WRIST.value].y
-        ]
-
-        # 计算左右手臂角度
-        left_arm_angle = self.calculate_angle(left_shoulder, left_elbow, left_wrist)
-        right_arm_angle = self.calculate_angle(right_shoulder, right_elbow, right_wrist)
-        avg_arm_angle = (left_arm_angle + right_arm_angle) / 2
-        return avg_arm_angle, left_arm_angle, right_arm_angle
-
-    def check_stability(self, current_angle):
-        """检查姿势是否稳定"""
-        self.stable_angles_buffer.append(current_angle)
-        if len(self.stable_angles_buffer) > self.buffer_size:
-            self.stable_angles_buffer.pop(0)
-        if len(self.stable_angles_buffer) < self.buffer_size:
-            return False
-        return max(self.stable_angles_buffer) - min(self.stable_angles_buffer) < self.stability_threshold
+        # 以帧的采集时间作为计时基准，录像可以快于实时处理
+        self.clock = clock if clock is not None else FrameClock()
+
+        # 与主程序之间的控制通道
+        self.control = control if control is not None else NullControlClient()
+
+        # 实时事件流（完成次数、阶段、校准进度、帧率），批量发送给主程序
+        self.telemetry = Telemetry(self.control, clock=self.clock)
+
+        # 训练记录：每次训练一条记录，每次动作（包括幅度不足的）一条明细
+        self.store = store if store is not None else NullSessionStore()
+        self.session = NullSessionWriter()
+        self.recorder = recorder if recorder is not None else NullLandmarkRecorder()
+        self.metrics = metrics if metrics is not None else NullMetrics()
+        self.profiler = profiler if profiler is not None else NullProfiler()
+
+        # 语音和提示音后端
+        self.speech = speech if speech is not None else create_speech_service(**SPEECH_OPTIONS)
+        self.beeper = beeper if beeper is not None else create_beep_backend()
+
+    @property
+    def counter(self):
+        """已完成的俯卧撑次数"""
+        return self.reps.count
+
+    @property
+    def stage(self):
+        """当前阶段："up"、"down" 或 None"""
+        return self.reps.stage
+
+    def analyze_posture(self, points):
+        """分析姿势，points 为 (33, 4) 关键点数组，返回手臂角度（平均、左、右）"""
+        # 一次性计算所有关节角
+        return self.arm_angles(joint_angles(points))
+
+    def arm_angles(self, angles):
+        """从关节角 (J,) 中取出手臂角度（平均、左、右），特征角度为左右手肘的平均"""
+        left_arm_angle = angles[JOINT_INDEX["left_elbow"]]
+        right_arm_angle = angles[JOINT_INDEX["right_elbow"]]
+        return PUSHUP.feature(angles), left_arm_angle, right_arm_angle
+
+    def update(self, points):
+        """根据一帧关键点数组 (33, 4) 更新校准和计数，返回手臂角度（平均、左、右）"""
+        return self.update_angles(joint_angles(points))
+
+    def update_angles(self, angles):
+        """根据一帧的关节角 (J,)（见 pose_utils.joint_angles，按归一化坐标计算）更新校准和计数"""
+        avg_angle, left_angle, right_angle = self.arm_angles(angles)
+        self.update_calibration_state(avg_angle)
+        if self.calibration_state == "done":
+            self.detect_pushup(avg_angle)
+        return avg_angle, left_angle, right_angle
 
-    def update_calibration_state(self, current_angle):
-        """更新校准状态机"""
-        # 等待校准
-        if self.calibration_state == "waiting":
-            if current_angle > self.min_calibration_angle:
-                if self.check_stability(current_angle):
-                    self.calibration_state = "calibrating"
-                    self.calibration_start_time = time.time()
-                    self.feedback = "Hold still... Calibrating"
-                    return False
-            else:
-                self.feedback = f"Extend arms more!"
-            return False
-
-        # 正在校准
-        elif self.calibration_state == "calibrating":
-            if not self.check_stability(current_angle):
-                self.calibration_state = "waiting"
-                self.calibration_start_time = None
-                self.stable_angles_buffer.clear()
-                self.feedback = "Movement detected. Calibration canceled."
-                self.calibration_progress = 0
-                return False
-
-            hold_time = time.time() - self.calibration_start_time
-            self.calibration_progress = min(100, int((hold_time / self.calibration_hold_time) * 100))
-            self.feedback = f"Calibrating... {self.calibration_progress}% ({hold_time:.1f}s/{self.calibration_hold_time}s)"
-
-            if hold_time >= self.calibration_hold_time:
-                self.complete_calibration(current_angle)
-                return True
-            return False
+    @property
+    def calibration_state(self):
+        """校准状态：waiting、calibrating 或 done"""
+        return self.calibrator.state
 
-        # 校准完成
-        elif self.calibration_state == "done":
+    @property
+    def calibration_progress(self):
+        """校准进度（0～100）"""
+        return self.calibrator.progress
+
+    def update_calibration_state(self, current_angle):
+        """推进校准状态机（见 exercise_engine.Calibrator），更新提示文字和校准进度"""
+        calibrator = self.calibrator
+        if calibrator.state == "done":
             if abs(current_angle - self.calibration_data['calibrated_up_angle']) > 30:
                 self.feedback = "Pose changed significantly. Consider recalibrating."
             return True
+
+        event = calibrator.update(current_angle, self.clock())
+        if event == "low":
+            self.feedback = f"Extend arms more!"
+        elif event == "start":
+            self.feedback = "Hold still... Calibrating"
+        elif event == "cancel":
+            self.feedback = "Movement detected. Calibration canceled."
+            self.telemetry.calibration(0)
+        elif event in ("hold", "done"):
+            hold = PUSHUP.calibration_hold
+            self.feedback = f"Calibrating... {calibrator.progress}% ({calibrator.hold_time:.1f}s/{hold}s)"
+            self.telemetry.calibration(calibrator.progress)
+            if event == "done":
+                self.complete_calibration(calibrator.reference)
+                return True
         return False
 
     def detect_pushup(self, current_angle):
-        """检测俯卧撑动作"""
+        """检测俯卧撑动作，返回当前阶段"""
         if self.calibration_state != "done":
             return None
 
-        # 初始化动作周期变量
-        if not hasattr(self, 'min_angle_in_rep'):
-            self.min_angle_in_rep = current_angle
-        if self.rep_start_angle is None:
-            self.rep_start_angle = current_angle
-        if current_angle < self.min_angle_in_rep:
-            self.min_angle_in_rep = current_angle
-
-        calibrated_up = self.calibration_data['calibrated_up_angle']
-        is_down_position = current_angle < (calibrated_up - 30)
-        is_up_position = current_angle > (calibrated_up - 15)
-
-        # 确定当前阶段
-        current_stage = None
-        if is_up_position:
-            current_stage = "up"
-        elif is_down_position:
-            current_stage = "down"
-            self.was_down = True
-
-        # 状态转换：开始下降
-        if self.stage == "up" and current_stage == "down":
-            self.rep_start_angle = current_angle
-            self.min_angle_in_rep = current_angle
-            self.stage = "down"
+        event = self.reps.update(current_angle)
+        if event == "down":
             self.feedback = "Going down..."
-
-        # 状态转换：完成上升，判断计数
-        elif self.stage == "down" and current_stage == "up":
-            actual_depth = calibrated_up - self.min_angle_in_rep
-
-            if actual_depth >= self.min_depth_for_detection:
-                if self.was_down:
-                    if actual_depth >= self.min_depth_for_count:
-                        self.counter += 1
-                        self.feedback = f"Good! Pushup #{self.counter}"
-                        self.performance_quality = "Good form"
-                        self.speak(f"第{self.counter}个")
-                        try:
-                            winsound.Beep(1000, 150)
-                        except Exception:
-                            pass
-                    else:
-                        self.feedback = f"Too shallow!"
-                        self.performance_quality = "Shallow - bend more"
-                        self.speak(f"试着再低一点")
-                else:
-                    self.feedback = f"Partial movement!"
-                    self.performance_quality = "Incomplete"
-            else:
-                self.feedback = f"Minimal movement!"
-                self.performance_quality = "Minimal"
-
-            # 重置状态
-            self.stage = "up"
-            self.min_angle_in_rep = calibrated_up
-            self.was_down = False
-            self.rep_start_angle = None
-
-        # 初始状态判断
-        elif self.stage is None:
-            self.stage = "up" if current_angle > (calibrated_up - 15) else "down"
-
-        # 下降过程中的实时反馈
+        elif event == "rep":
+            self.telemetry.rep(self.counter)
+            self.feedback = f"Good! Pushup #{self.counter}"
+            self.performance_quality = "Good form"
+            self.speech.say_count(self.counter)
+            self.beep()
+        elif event == "shallow":
+            self.feedback = f"Too shallow!"
+            self.performance_quality = "Shallow - bend more"
+            self.speak(f"试着再低一点")
+        elif event == "minimal":
+            self.feedback = f"Minimal movement!"
+            self.performance_quality = "Minimal"
         elif self.stage == "down":
-            current_depth = calibrated_up - current_angle
-            target_depth = self.min_depth_for_count
-            if current_depth < 20:
+            # 下降过程中的实时反馈
+            current_depth = self.reps.depth(current_angle)
+            if current_depth < PUSHUP.min_depth_for_detection:
                 self.feedback = "Start bending..."
-            elif current_depth < target_depth:
+            elif current_depth < PUSHUP.min_depth_for_count:
                 self.feedback = f"Bending... "
             else:
                 self.feedback = f"Good depth! "
 
-        return current_stage
+        if event in ("rep", "shallow", "minimal"):
+            self.session.rep(self.counter, self.reps.last_depth, self.reps.last_quality, exercise=PUSHUP.name)
+        if self.stage is not None:
+            self.telemetry.stage(self.stage)
+        return self.stage
 
     def complete_calibration(self, calibrated_angle):
         """完成校准过程"""
@@ -238,26 +185,28 @@ class AutoCalibrationPushupCounter:
         self.calibration_data['calibrated_up_angle'] = calibrated_angle
         self.calibration_data['calibrated_down_angle'] = calibrated_angle - 55 
         self.calibration_data['calibration_time'] = time.strftime("%Y-%m-%d %H:%M:%S")
-        self.calibration_data['calibration_stability'] = max(self.stable_angles_buffer) - min(self.stable_angles_buffer)
+        self.calibration_data['calibration_stability'] = self.calibrator.spread
         
         # 设置计数阈值
-        self.up_threshold = calibrated_angle - 15
-        self.down_threshold = calibrated_angle - 30
+        self.reps.calibrate(calibrated_angle)
+        self.up_threshold, self.down_threshold = self.reps.thresholds()
 
-        self.calibration_state = "done"
         self.feedback = f"Calibration complete! "
         self.performance_quality = "Ready for pushups"
-        self.speak("校准完成")
-        self.stable_angles_buffer.clear()
+        self.speak("校准完成", priority=PRIORITY_HIGH)
+        self.send_start_signal()
 
-        # 发送开始信号
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        signal_file = os.path.join(base_dir, "data", ".start_signal")
-        try:
-            with open(signal_file, "w") as f:
-                f.write("start")
-        except:
-            pass
+    def send_start_signal(self):
+        """发送开始信号给主程序"""
+        self.control.send("start")
+        self.telemetry.start()
+
+    def recalibrate(self):
+        """清零计数并重新校准"""
+        self.calibrator.reset()
+        self.reps.reset()
+        self.feedback = "Manual recalibration triggered"
+        self.telemetry.reset()
 
     def draw_calibration_display(self, image, current_angle, left_angle=None, right_angle=None):
         """绘制校准状态显示"""
@@ -275,11 +224,8 @@ class AutoCalibrationPushupCounter:
         if self.calibration_state == "done":
             cv2.putText(image, f"Pushups: {self.counter}", (w - 540, 70),
                         cv2.FONT_HERSHEY_SIMPLEX, 2.5, TEXT_COLOR, 5, cv2.LINE_AA)
-    
-        # 绘制反馈信息
-        cv2.putText(image, self.feedback, (10, h - 80), FONT_TYPE, 1.2, TEXT_COLOR, 2, cv2.LINE_AA)
 
-       # 绘制反馈信息
+        # 绘制反馈信息
         cv2.putText(image, self.feedback, (10, h - 80), FONT_TYPE, 1.2, TEXT_COLOR, 2, cv2.LINE_AA)
 
         # 绘制校准进度条
@@ -290,161 +236,192 @@ class AutoCalibrationPushupCounter:
             progress_width = int(bar_width * self.calibration_progress / 100)
             cv2.rectangle(image, (bar_x, bar_y), (bar_x + progress_width, bar_y + bar_height), TEXT_COLOR, -1)
 
-    def _speech_worker(self):
-        """后台语音播放线程"""
-        pythoncom.CoInitialize()
-        voice = win32com.client.Dispatch("SAPI.SpVoice")
-        voice.Rate, voice.Volume = -1, 100
+    def speak(self, text, priority=PRIORITY_NORMAL):
+        """将要播报的文本交给语音服务"""
+        self.speech.say(text, priority=priority)
 
-        # 尝试设置中文语音
-        try:
-            zh_voices = voice.GetVoices("Language=804")
-            if zh_voices.Count > 0:
-                voice.Voice = zh_voices.Item(0)
-        except Exception:
-            pass
-
-        while True:
-            text = self.speech_queue.get()
-            try:
-                voice.Speak(text) 
-            except Exception as e:
-                print(f"TTS error: {e}")
-                try:
-                    pythoncom.CoUninitialize()
-                except Exception:
-                    pass
-                time.sleep(0.1)
-                pythoncom.CoInitialize()
-                voice = win32com.client.Dispatch("SAPI.SpVoice")
-                voice.Rate = -1
-                voice.Volume = 100
-            finally:
-                self.speech_queue.task_done()
-
-    def speak(self, text):
-        """将要播报的文本加入队列"""
-        if text:
-            self.speech_queue.put(text)
+    def beep(self):
+        """计数提示音"""
+        self.beeper.beep(1000, 150)
 
 
-def main():
-    """主函数"""
-    print("俯卧撑计数器启动")
+def run_session(counter, cap, pose, headless=False, inference_size=INFERENCE_SIZE, scheduler=None):
+    """运行一次俯卧撑训练，直到收到停止命令、窗口关闭或帧源结束
 
-    # 定义文件路径
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    data_dir = os.path.join(base_dir, "data")
-    count_file = os.path.join(data_dir, "pushup_count.txt")
-    stop_signal_file = os.path.join(data_dir, ".stop_signal")
-    flag_path = os.path.join(data_dir, "reset.flag")
+    cap 和 pose 由调用方创建和释放，常驻进程可以在多次训练之间复用。
+    """
+    counter.session = counter.store.start_session("pushup", clock=counter.clock)
+    counter.metrics.attach("pushup", source=cap, speech=counter.speech)
 
-    # 初始化计数器
-    counter = AutoCalibrationPushupCounter()
-    counter.speak("准备校准，请伸直手臂并保持稳定")
-
-    # 初始化MediaPipe
     mp_pose = mp.solutions.pose
     mp_drawing = mp.solutions.drawing_utils
 
-    # 初始化摄像头和窗口
-    cap = cv2.VideoCapture(0)
-    TARGET_WIDTH, TARGET_HEIGHT = 1280, 720
+    counter.speak("准备校准，请伸直手臂并保持稳定", priority=PRIORITY_HIGH)
+
     WINDOW_NAME = 'Pushup Counter'
-    cv2.namedWindow(WINDOW_NAME, cv2.WINDOW_NORMAL)
-    cv2.resizeWindow(WINDOW_NAME, TARGET_WIDTH, TARGET_HEIGHT)
-
-    with mp_pose.Pose(min_detection_confidence=0.7,min_tracking_confidence=0.7) as pose:
-        while cap.isOpened():
-            # 检查停止信号
-            if os.path.exists(stop_signal_file):
-                try:
-                    with open(count_file, 'w') as f:
-                        f.write(str(counter.counter))
-                except Exception as e:
-                    print(f"保存计数失败: {e}")
-                break
-
-            # 检查窗口是否被关闭
-            if cv2.getWindowProperty(WINDOW_NAME, cv2.WND_PROP_VISIBLE) < 1:
-                break
-
-            # 读取并处理视频帧
-            success, image = cap.read()
-            if not success:
-                continue
-            image = cv2.resize(image, (TARGET_WIDTH, TARGET_HEIGHT))
-            image = cv2.flip(image, 1)
-
-             # 姿势检测
-            image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            image_rgb.flags.writeable = False
-            results = pose.process(image_rgb)
-            image_rgb.flags.writeable = True
-            image = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR)
-
-            # 处理检测结果
-            try:
+    if not headless:
+        cv2.namedWindow(WINDOW_NAME, cv2.WINDOW_NORMAL)
+        cv2.resizeWindow(WINDOW_NAME, DISPLAY_WIDTH, DISPLAY_HEIGHT)
+
+    results = None
+    stop_requested = False
+    while cap.isOpened():
+        # 处理主程序发来的命令（只读内存队列，不访问文件系统）
+        for command, payload in counter.control.poll():
+            if command == "stop":
+                stop_requested = True
+            elif command == "quit":
+                # 结束本次训练，退出命令留给常驻进程的外层循环处理
+                counter.control.requeue(command, payload)
+                stop_requested = True
+            elif command == "reset":
+                counter.recalibrate()
+                counter.speak("重新校准，请伸直手臂并保持稳定", priority=PRIORITY_HIGH)
+                counter.control.send("ack", command="reset", count=counter.counter)
+        if stop_requested:
+            break
+
+        # 检查窗口是否被关闭
+        if not headless and cv2.getWindowProperty(WINDOW_NAME, cv2.WND_PROP_VISIBLE) < 1:
+            break
+
+        # 读取并处理视频帧
+        frame = cap.read()
+        if frame is None:
+            break
+        counter.clock.tick(frame.timestamp)
+        counter.metrics.begin_frame()
+        counter.profiler.frame()
+        image = cv2.flip(frame.image, 1)
+
+        # 姿势检测：在缩小的图像上推理，在全分辨率图像上绘制；静止时沿用上一次的结果
+        if results is None or scheduler is None or scheduler.should_infer(image, counter.clock()):
+            inference_start = time.perf_counter()
+            results = pose.process(prepare_inference_image(image, inference_size))
+            inference_seconds = time.perf_counter() - inference_start
+            counter.metrics.inference(inference_seconds)
+            if scheduler is not None:
+                points = None
                 if results.pose_landmarks:
+                    points = landmarks_to_array(results.pose_landmarks.landmark)
+                scheduler.record_inference(inference_seconds, points, counter.clock())
+        counter.telemetry.frame()
+
+        # 录制计数器看到的每一帧关键点（沿用上一次推理结果的帧也记录，回放时与实际计数一致）
+        points = landmarks_to_array(results.pose_landmarks.landmark) if results.pose_landmarks else None
+        counter.recorder.write(counter.clock(), points)
+
+        if not headless:
+            image = cv2.resize(image, (DISPLAY_WIDTH, DISPLAY_HEIGHT))
+
+        # 处理检测结果（无界面模式下只计数，不绘制）
+        try:
+            if points is not None:
+                if not headless:
                     mp_drawing.draw_landmarks(
                         image, results.pose_landmarks, mp_pose.POSE_CONNECTIONS,
                         mp_drawing.DrawingSpec(color=(155, 247, 255), thickness=2, circle_radius=2),
                         mp_drawing.DrawingSpec(color=(160, 145, 246), thickness=2, circle_radius=2)
                     )
-                    avg_angle, left_angle, right_angle = counter.analyze_posture(
-                        results.pose_landmarks.landmark
-                    )
-                    counter.update_calibration_state(avg_angle)
-                    if counter.calibration_state == "done":
-                        counter.detect_pushup(avg_angle)
+                avg_angle, left_angle, right_angle = counter.update(points)
+                if not headless:
                     counter.draw_calibration_display(image, avg_angle, left_angle, right_angle)
-            except Exception as e:
-                print(f"Error: {e}")
-
-            # 处理外部重新校准请求
-            if os.path.exists(flag_path):
-                counter.calibration_state = "waiting"
-                counter.counter = 0
-                counter.stage = None
-                counter.feedback = "Manual recalibration triggered"
-                counter.stable_angles_buffer.clear()
-                counter.speak("重新校准，请伸直手臂并保持稳定")
-                try:
-                    os.remove(flag_path)
-                except Exception:
-                    pass
-            
-            cv2.imshow(WINDOW_NAME, image)
-
-            # 按键控制
-            key = cv2.waitKey(1) & 0xFF
-            if key == ord('q'):
-                try:
-                    with open(count_file, 'w') as f:
-                        f.write(str(counter.counter))
-                except Exception as e:
-                    print(f"保存计数失败: {e}")
-                break
-            elif key == ord('r'):
-                counter.calibration_state = "waiting"
-                counter.counter = 0
-                counter.stage = None
-                counter.feedback = "Manual recalibration triggered"
-                counter.stable_angles_buffer.clear()
+        except Exception as e:
+            print(f"Error: {e}")
+
+        if headless:
+            counter.metrics.end_frame(counter.counter)
+            continue
+        cv2.imshow(WINDOW_NAME, counter.metrics.draw_hud(image))
+
+        # 按键控制
+        key = cv2.waitKey(1) & 0xFF
+        counter.metrics.end_frame(counter.counter)
+        if key == ord('q'):
+            # 退出后统一保存计数
+            break
+        elif key == ord('r'):
+            counter.recalibrate()
+
+    if not headless:
+        cv2.destroyAllWindows()
+
+    # 保存计数，并通过控制通道报告给主程序
+    counter.session.finish(counter.counter)
+    counter.profiler.close()
+    counter.recorder.close()
+    if counter.recorder.stats_text():
+        print(counter.recorder.stats_text())
+    counter.telemetry.flush()
+    counter.control.send("ack", command="stop", count=counter.counter)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="俯卧撑计数器")
+    parser.add_argument("--inference-size", type=int, default=INFERENCE_SIZE,
+                        help="姿态推理图像的长边像素，0 表示使用原始分辨率")
+    parser.add_argument("--source", default=None,
+                        help="帧源：摄像头编号（默认0）、视频文件、图片目录或 synthetic")
+    parser.add_argument("--headless", action="store_true", help="无界面模式：不显示窗口")
+    parser.add_argument("--speech", choices=["auto", "sapi", "null"], default="auto",
+                        help="语音后端，null 为关闭语音和提示音")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="运动自适应推理：无人或静止时降低推理频率")
+    parser.add_argument("--model-complexity", type=int, choices=[0, 1, 2], default=None,
+                        help="姿态模型复杂度，默认按本机速度自动选择")
+    parser.add_argument("--target-fps", type=float, default=TARGET_FPS,
+                        help="自动选择模型时要求达到的帧率")
+    parser.add_argument("--retune", action="store_true", help="忽略缓存，重新测试模型速度")
+    parser.add_argument("--record", nargs="?", const="", default=None, metavar="PATH",
+                        help="录制每帧关键点（不保存视频），默认保存到 data/recordings/")
+    add_metrics_arguments(parser)
+    add_profile_arguments(parser)
+    parser.add_argument("--detection-confidence", type=float, default=0.7)
+    parser.add_argument("--tracking-confidence", type=float, default=0.7)
+    args = parser.parse_args()
+
+    print("俯卧撑计数器启动")
+
+    # 初始化计数器
+    counter = AutoCalibrationPushupCounter(
+        speech=create_speech_service(args.speech, headless=args.headless, **SPEECH_OPTIONS),
+        beeper=create_beep_backend("null" if args.speech == "null" else "auto", headless=args.headless),
+        control=connect_control(),
+        store=SessionStore(),
+        recorder=create_recorder(args.record, PUSHUP.name),
+        metrics=create_metrics(args.metrics_file, args.metrics_port, args.hud),
+        profiler=create_profiler(args.profile, PUSHUP.name),
+    )
+
+    # 初始化帧源（摄像头使用后台线程采集，只保留最新帧）
+    cap = open_source(args.source)
+
+    # 运动自适应推理调度
+    scheduler = InferenceScheduler() if args.adaptive else None
+
+    model_complexity = choose_model_complexity(args.model_complexity, args.target_fps,
+                                               args.inference_size, refresh=args.retune)
+
+    with mp.solutions.pose.Pose(model_complexity=model_complexity,
+                                min_detection_confidence=args.detection_confidence,
+                                min_tracking_confidence=args.tracking_confidence) as pose:
+        run_session(counter, cap, pose, args.headless, args.inference_size, scheduler)
 
     # 清理资源
     cap.release()
-    cv2.destroyAllWindows()
-
-    # 保存计数
-    try:
-        with open(count_file, 'w') as f:
-            f.write(str(counter.counter))
-    except Exception as e:
-        print(f"保存计数失败: {e}")
+    if cap.stats_text():
+        print(cap.stats_text())
+    if scheduler is not None and scheduler.stats_text():
+        print(scheduler.stats_text())
+    if counter.speech.stats_text():
+        print(counter.speech.stats_text())
+    counter.control.close()
+    counter.store.close()
+    counter.metrics.close()
 
     print("程序结束")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
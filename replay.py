@@ -0,0 +1,156 @@
+"""关键点回放：把录制的关键点序列（见 landmark_log.py）直接送入计数状态机，不经过摄像头和 MediaPipe
+
+计数器使用注入的 FrameClock，按录制的帧时间推进：倒计时、3 秒校准保持和文字显示时长与实际训练一致，
+但不必等待真实时间，同一段录制每次回放的计数和每次动作的明细完全相同。
+深蹲和俯卧撑的关节角对整段录制一次批量计算，逐帧只运行状态机；自动识别需要逐帧识别运动类型。
+
+用法：
+    python replay.py data/recordings/squat-20240101-080000.lmk --reps
+    python replay.py data/recordings/*.lmk --exercise pushup --json replay.json
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from auto_counter import AutoExerciseCounter
+from backends import NullBeepBackend
+from capture import FrameClock, NullSource
+from exercise_engine import EXERCISES as SPECS
+from landmark_log import read_recording
+from pose_utils import DISPLAY_HEIGHT, DISPLAY_WIDTH, joint_angles
+from pushup_counter import AutoCalibrationPushupCounter
+from speech import create_speech_service
+from squat_counter import SquatCounter
+
+EXERCISES = ("squat", "pushup", "auto")
+
+
+class RepLog:
+    """在内存中记录每次完成的动作，接口与 session_store.SessionWriter 相同"""
+
+    def __init__(self, exercise, clock):
+        self.exercise = exercise
+        self.clock = clock
+        self.start = clock()
+        self.reps = []
+
+    def rep(self, count, depth=None, quality="good", exercise=None, person=None):
+        self.reps.append({"t": round(self.clock() - self.start, 3), "exercise": exercise or self.exercise,
+                          "count": count, "depth": None if depth is None else round(depth, 1),
+                          "quality": quality})
+
+    def finish(self, count):
+        pass
+
+
+def _squat_counter(clock):
+    return SquatCounter(source=NullSource(), headless=True, speech=create_speech_service("null"), clock=clock)
+
+
+def _pushup_counter(clock):
+    return AutoCalibrationPushupCounter(speech=create_speech_service("null"), beeper=NullBeepBackend(), clock=clock)
+
+
+def create_counter(exercise, clock):
+    """创建不播报、不连接主程序、使用注入时钟的计数器"""
+    if exercise == "squat":
+        return _squat_counter(clock)
+    if exercise == "pushup":
+        return _pushup_counter(clock)
+    if exercise == "auto":
+        return AutoExerciseCounter(_squat_counter(clock), _pushup_counter(clock), clock=clock)
+    raise ValueError(f"未知的运动类型: {exercise}")
+
+
+def _count(counter, exercise):
+    return counter.squat_counter if exercise == "squat" else counter.counter
+
+
+def replay(exercise, points, timestamps):
+    """回放一段关键点序列 (N, 33, 4)，返回计数结果和每次动作的明细"""
+    clock = FrameClock()
+    clock.tick(float(timestamps[0]) if len(timestamps) else 0.0)
+    counter = create_counter(exercise, clock)
+    log = RepLog(exercise, clock)
+    if exercise == "auto":
+        counter.squat.session = counter.pushup.session = log
+    else:
+        counter.session = log
+
+    # 没有检测到人的帧只推进时钟，与实时计数一致
+    present = ~np.isnan(points[..., 0]).all(axis=1)
+    start = time.perf_counter()
+    if exercise == "auto":
+        for timestamp, frame, ok in zip(timestamps.tolist(), points, present.tolist()):
+            counter.tick(timestamp)
+            if ok:
+                counter.update(frame)
+    else:
+        # 与实时计数相同的角度坐标系（见 ExerciseSpec.pixel_angles）
+        angles = joint_angles(points, SPECS[exercise].angle_scale((DISPLAY_WIDTH, DISPLAY_HEIGHT)))
+        update = counter.update_angles
+        for timestamp, row, ok in zip(timestamps.tolist(), angles, present.tolist()):
+            clock.tick(timestamp)
+            if ok:
+                update(row)
+    elapsed = time.perf_counter() - start
+
+    duration = float(timestamps[-1] - timestamps[0]) if len(timestamps) else 0.0
+    return {
+        "exercise": exercise,
+        "count": _count(counter, exercise),
+        "frames": len(points),
+        "pose_frames": int(present.sum()),
+        "recording_seconds": duration,
+        "elapsed_seconds": elapsed,
+        "speedup": duration / elapsed if elapsed > 0 else 0.0,
+        "reps": log.reps,
+    }
+
+
+def replay_file(path, exercise=None):
+    """回放一个录制文件；exercise 为空时按文件名前缀（如 squat-20240101-080000.lmk）判断"""
+    if exercise is None:
+        exercise = os.path.basename(path).split("-")[0]
+        if exercise not in EXERCISES:
+            raise ValueError(f"无法从文件名判断运动类型，请用 --exercise 指定: {path}")
+    points, timestamps = read_recording(path)
+    result = replay(exercise, points, timestamps)
+    result["file"] = path
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="回放关键点录制，离线复现计数")
+    parser.add_argument("recordings", nargs="+", help=".lmk 关键点录制文件")
+    parser.add_argument("--exercise", choices=EXERCISES, default=None, help="运动类型，默认按文件名判断")
+    parser.add_argument("--reps", action="store_true", help="列出每次动作的时间、幅度和质量")
+    parser.add_argument("--json", help="保存结果（含每次动作明细）到 JSON 文件")
+    args = parser.parse_args()
+
+    results = []
+    for path in args.recordings:
+        try:
+            result = replay_file(path, args.exercise)
+        except (OSError, ValueError) as e:
+            print(f"{path}: 回放失败: {e}")
+            continue
+        results.append(result)
+        print(f"{path}: {result['exercise']} {result['count']} 个，{result['frames']} 帧"
+              f"（{result['recording_seconds']:.0f} 秒），回放 {result['elapsed_seconds'] * 1000:.0f} ms，"
+              f"{result['speedup']:.0f} 倍实时")
+        if args.reps:
+            for rep in result["reps"]:
+                depth = "-" if rep["depth"] is None else f"{rep['depth']:.1f}°"
+                print(f"    {rep['t']:8.2f}s  {rep['exercise']:<6} #{rep['count']:<4} 幅度 {depth:>7}  {rep['quality']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
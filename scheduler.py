@@ -0,0 +1,84 @@
+import math
+
+import cv2
+import numpy as np
+
+
+class InferenceScheduler:
+    """运动自适应的推理调度器
+
+    每帧先做一次廉价的缩略图帧差检测，画面或关键点在动时每帧都推理；
+    连续静止 idle_after 秒后进入低功耗模式，每 idle_interval 帧才推理一次。
+    一旦检测到运动，当前帧立即恢复推理，因此不会漏掉动作。
+    """
+
+    def __init__(self, idle_interval=5, idle_after=1.0, diff_threshold=3.0,
+                 velocity_threshold=0.05, probe_size=(64, 36)):
+        self.idle_interval = idle_interval
+        self.idle_after = idle_after
+        self.diff_threshold = diff_threshold          # 缩略图平均灰度差（0-255）
+        self.velocity_threshold = velocity_threshold  # 关键点平均速度（画面比例/秒）
+        self.probe_size = probe_size
+
+        self._last_probe = None
+        self._last_points = None
+        self._last_points_time = None
+        self._last_motion_time = -math.inf
+        self._frames_since_inference = idle_interval
+
+        # 统计信息
+        self.frames = 0
+        self.inferences = 0
+        self.inference_seconds = 0.0
+
+    def is_idle(self, timestamp):
+        """是否处于低功耗模式"""
+        return timestamp - self._last_motion_time >= self.idle_after
+
+    def should_infer(self, image, timestamp):
+        """根据帧差判断当前帧是否需要运行姿态推理"""
+        self.frames += 1
+
+        probe = cv2.resize(cv2.cvtColor(image, cv2.COLOR_BGR2GRAY), self.probe_size,
+                           interpolation=cv2.INTER_AREA)
+        if self._last_probe is not None:
+            if cv2.absdiff(probe, self._last_probe).mean() > self.diff_threshold:
+                self._last_motion_time = timestamp
+        self._last_probe = probe
+
+        if not self.is_idle(timestamp) or self._frames_since_inference >= self.idle_interval:
+            self._frames_since_inference = 0
+            return True
+        self._frames_since_inference += 1
+        return False
+
+    def record_inference(self, seconds, points, timestamp):
+        """记录一次推理的耗时和关键点 (33, k)，关键点移动较快时视为运动"""
+        self.inferences += 1
+        self.inference_seconds += seconds
+
+        if points is not None and self._last_points is not None:
+            dt = timestamp - self._last_points_time
+            if dt > 0:
+                velocity = np.abs(points[:, :2] - self._last_points[:, :2]).mean() / dt
+                if velocity > self.velocity_threshold:
+                    self._last_motion_time = timestamp
+        self._last_points = points
+        self._last_points_time = timestamp
+
+    @property
+    def skipped(self):
+        return self.frames - self.inferences
+
+    def cpu_saved_seconds(self):
+        """按平均推理耗时估算跳过推理节省的 CPU 时间"""
+        if self.inferences == 0:
+            return 0.0
+        return self.skipped * self.inference_seconds / self.inferences
+
+    def stats_text(self):
+        """返回调度统计信息"""
+        if self.frames == 0:
+            return ""
+        return (f"推理 {self.inferences}/{self.frames} 帧（跳过 {self.skipped / self.frames:.0%}），"
+                f"约节省 {self.cpu_saved_seconds():.1f} 秒 CPU")
@@ -0,0 +1,235 @@
+"""训练记录：用 SQLite（WAL 模式）保存每次训练和其中的每一次动作
+
+记录只追加不覆盖（训练结束时补写一次结束时间和总次数），历史不会丢失。
+写入由后台线程批量完成，计数主循环只把记录放进队列；按时间和运动类型建了索引，多年的记录也能快速查询。
+"""
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.path.join(BASE_DIR, "data", "sessions.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    exercise TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    ended_at REAL,
+    count INTEGER,
+    source TEXT
+);
+CREATE TABLE IF NOT EXISTS reps (
+    session_id INTEGER NOT NULL REFERENCES sessions(id),
+    t REAL NOT NULL,
+    exercise TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    depth REAL,
+    quality TEXT NOT NULL,
+    person INTEGER
+);
+CREATE INDEX IF NOT EXISTS sessions_started_at ON sessions(started_at);
+CREATE INDEX IF NOT EXISTS sessions_exercise_started_at ON sessions(exercise, started_at);
+CREATE INDEX IF NOT EXISTS reps_session_t ON reps(session_id, t);
+"""
+
+
+class SessionWriter:
+    """一次训练的记录句柄，rep() 只入队，不阻塞计数主循环"""
+
+    def __init__(self, store, session_id, exercise, clock):
+        self.store = store
+        self.id = session_id
+        self.exercise = exercise
+        self.clock = clock
+        self._start = clock()
+
+    def rep(self, count, depth=None, quality="good", exercise=None, person=None):
+        """记录一次完成的动作：count 为完成后的次数，depth 为动作幅度（度），quality 为 good/shallow/minimal"""
+        t = self.clock() - self._start
+        self.store._put(("rep", (self.id, t, exercise or self.exercise, count, depth, quality, person)))
+
+    def finish(self, count):
+        """训练结束，补写结束时间和总次数"""
+        self.store._put(("finish", (time.time(), count, self.id)))
+
+
+class NullSessionWriter:
+    """不保存记录时使用的空句柄"""
+
+    id = None
+
+    def rep(self, count, depth=None, quality="good", exercise=None, person=None):
+        pass
+
+    def finish(self, count):
+        pass
+
+
+class SessionStore:
+    """训练记录库：所有读写都在一个后台线程中完成，连续的动作记录合并为一个事务写入"""
+
+    def __init__(self, path=DB_PATH, flush_interval=0.5, batch_size=500):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._closed = False
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # 在后台线程中打开数据库，打开失败时第一次调用会抛出异常
+        self._thread = threading.Thread(target=self._writer, daemon=True)
+        self._thread.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        return conn
+
+    def _put(self, op):
+        if not self._closed:
+            self._queue.put(op)
+
+    def _call(self, func):
+        """在后台线程中执行 func(conn) 并等待结果"""
+        if self._closed:
+            raise RuntimeError("训练记录库已关闭")
+        future = Future()
+        self._queue.put(("call", func, future))
+        return future.result()
+
+    def _writer(self):
+        """后台写入线程：收集一批操作后在一个事务中执行"""
+        try:
+            conn = self._connect()
+        except sqlite3.Error as e:
+            print(f"打开训练记录失败: {e}")
+            conn = None
+
+        running = True
+        while running:
+            ops = [self._queue.get()]
+            # 动作记录在 flush_interval 内攒成一批，其他操作立即执行
+            deadline = time.monotonic() + self.flush_interval
+            while ops[-1][0] == "rep" and len(ops) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    ops.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            running = self._apply(conn, ops)
+
+        if conn is not None:
+            conn.close()
+
+    def _apply(self, conn, ops):
+        """在一个事务中执行一批操作，返回是否继续运行"""
+        running = True
+        rows = []
+        try:
+            if conn is None:
+                raise sqlite3.OperationalError("训练记录库未打开")
+            with conn:
+                for op in ops:
+                    if op[0] == "rep":
+                        rows.append(op[1])
+                        continue
+                    if rows:
+                        conn.executemany("INSERT INTO reps VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                        rows = []
+                    if op[0] == "finish":
+                        conn.execute("UPDATE sessions SET ended_at = ?, count = ? WHERE id = ?", op[1])
+                    elif op[0] == "call":
+                        op[2].set_result(op[1](conn))
+                    elif op[0] == "stop":
+                        running = False
+                if rows:
+                    conn.executemany("INSERT INTO reps VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        except Exception as e:
+            print(f"保存训练记录失败: {e}")
+            for op in ops:
+                if op[0] == "call" and not op[2].done():
+                    op[2].set_exception(e)
+                elif op[0] == "stop":
+                    running = False
+        return running
+
+    def start_session(self, exercise, clock=time.time, source=None):
+        """新建一次训练记录，clock 为计数器的帧时钟（动作时间记录为相对训练开始的秒数）"""
+        def insert(conn):
+            return conn.execute("INSERT INTO sessions (exercise, started_at, source) VALUES (?, ?, ?)",
+                                (exercise, time.time(), source)).lastrowid
+
+        try:
+            session_id = self._call(insert)
+        except Exception as e:
+            print(f"创建训练记录失败: {e}")
+            return NullSessionWriter()
+        return SessionWriter(self, session_id, exercise, clock)
+
+    def flush(self):
+        """等待已入队的记录全部写入"""
+        self._call(lambda conn: None)
+
+    def last_count(self, exercise):
+        """最近一次已结束训练的次数，没有记录时返回 None"""
+        row = self._call(lambda conn: conn.execute(
+            "SELECT count FROM sessions WHERE exercise = ? AND ended_at IS NOT NULL "
+            "ORDER BY started_at DESC LIMIT 1", (exercise,)).fetchone())
+        return row[0] if row else None
+
+    def recent_sessions(self, exercise=None, limit=20):
+        """最近的训练记录 [(id, exercise, started_at, ended_at, count)]"""
+        if exercise is None:
+            sql, params = "SELECT id, exercise, started_at, ended_at, count FROM sessions", ()
+        else:
+            sql, params = ("SELECT id, exercise, started_at, ended_at, count FROM sessions WHERE exercise = ?",
+                           (exercise,))
+        return self._call(lambda conn: conn.execute(
+            f"{sql} ORDER BY started_at DESC LIMIT ?", params + (limit,)).fetchall())
+
+    def session_reps(self, session_id):
+        """一次训练中的每一次动作 [(t, exercise, count, depth, quality, person)]"""
+        return self._call(lambda conn: conn.execute(
+            "SELECT t, exercise, count, depth, quality, person FROM reps WHERE session_id = ? ORDER BY t",
+            (session_id,)).fetchall())
+
+    def daily_totals(self, exercise, since=None):
+        """按天（本地时间）汇总次数 [(日期, 训练次数, 总次数)]，since 为起始时间戳"""
+        return self._call(lambda conn: conn.execute(
+            "SELECT date(started_at, 'unixepoch', 'localtime') AS day, COUNT(*), SUM(count) FROM sessions "
+            "WHERE exercise = ? AND started_at >= ? AND ended_at IS NOT NULL GROUP BY day ORDER BY day",
+            (exercise, since or 0.0)).fetchall())
+
+    def close(self):
+        """写完剩余记录后关闭"""
+        if self._closed:
+            return
+        self._put(("stop",))
+        self._closed = True
+        self._thread.join(timeout=5.0)
+
+
+class NullSessionStore:
+    """不保存训练记录时使用的空记录库"""
+
+    def start_session(self, exercise, clock=time.time, source=None):
+        return NullSessionWriter()
+
+    def flush(self):
+        pass
+
+    def last_count(self, exercise):
+        return None
+
+    def close(self):
+        pass
@@ -0,0 +1,188 @@
+"""统一的语音播报服务
+
+所有播报都交给一个后台线程完成，后端可替换（见 backends.py）。
+常用短语（"第N个"、倒计时数字、"开始"、"校准完成" 等）在后台预先合成为 WAV 缓存到
+data/speech_cache/，之后直接播放文件，没有实时合成的延迟。
+
+播报队列按优先级出队：校准、结束等重要提示优先于普通提示，计数播报优先级最低；
+计数播报只保留最新的一条，动作快于播报速度时旧的计数直接丢弃，语音不会落后于计数。
+"""
+import hashlib
+import itertools
+import os
+import threading
+import time
+
+from backends import create_speech_backend
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(BASE_DIR, "data", "speech_cache")
+
+# 预先合成的计数播报上限
+COUNT_PHRASE_LIMIT = 50
+
+# 播报优先级，数值越小越先播
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_COUNT = 2
+
+
+def count_phrase(count):
+    """计数播报文本"""
+    return f"第{count}个"
+
+
+COMMON_PHRASES = tuple(count_phrase(n) for n in range(1, COUNT_PHRASE_LIMIT + 1)) + (
+    "三", "二", "一", "开始", "准备", "请站直",
+    "校准完成", "试着再低一点",
+    "准备校准，请伸直手臂并保持稳定", "重新校准，请伸直手臂并保持稳定",
+)
+
+
+class SpeechService:
+    """语音播报服务：say() 立即返回，由后台线程按优先级播报，播报结束（或被丢弃）后调用 callback"""
+
+    def __init__(self, backend, phrases=COMMON_PHRASES, cache_dir=CACHE_DIR):
+        self.backend = backend
+        self.cache_dir = os.path.join(cache_dir, backend.cache_key) if backend.cache_key else None
+
+        # 已合成好的短语 -> 文件路径
+        self._cached = {}
+
+        # 待播报队列：[(优先级, 序号, 文本, 回调, 合并键, 入队时间)]
+        self._pending = []
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+
+        # 统计信息
+        self.spoken = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+
+        if self.enabled:
+            threading.Thread(target=self._worker, daemon=True).start()
+            if self.cache_dir and phrases:
+                threading.Thread(target=self._warm_cache, args=(phrases,), daemon=True).start()
+
+    @property
+    def enabled(self):
+        return self.backend.enabled
+
+    def _cache_path(self, text):
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{digest}.wav")
+
+    def _warm_cache(self, phrases):
+        """后台合成尚未缓存的短语，已存在的文件直接登记；某一条合成失败时跳过，继续合成其余短语"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        except OSError as e:
+            print(f"创建语音缓存目录失败: {e}")
+            return
+
+        for text in phrases:
+            path = self._cache_path(text)
+            if not os.path.exists(path):
+                # 先写临时文件，避免播放到写了一半的文件
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                try:
+                    self.backend.synthesize(text, tmp_path)
+                    os.replace(tmp_path, path)
+                except Exception as e:
+                    print(f"合成语音缓存失败（{text}）: {e}")
+                    try:
+                        os.remove(tmp_path)
+                    except OSError:
+                        pass
+                    continue
+            self._cached[text] = path
+
+    def _next(self):
+        """阻塞取出优先级最高、最早入队的一条"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._pending)
+            item = min(self._pending)
+            self._pending.remove(item)
+        _, _, text, callback, _, queued_at = item
+
+        lag = time.monotonic() - queued_at
+        self.spoken += 1
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+        return text, callback
+
+    def _worker(self):
+        """后台播报线程"""
+        while True:
+            text, callback = self._next()
+            try:
+                path = self._cached.get(text)
+                if path is not None:
+                    self.backend.play_file(path)
+                else:
+                    self.backend.speak(text)
+            except Exception as e:
+                print(f"语音播报失败: {e}")
+            finally:
+                if callback:
+                    callback()
+
+    def say(self, text, callback=None, priority=PRIORITY_NORMAL, coalesce_key=None):
+        """加入播报队列；语音关闭时直接调用 callback
+
+        coalesce_key 相同的播报只保留最新一条，尚未播出的旧播报被丢弃（其 callback 立即调用）。
+        """
+        if not text or not self.enabled:
+            if callback:
+                callback()
+            return
+
+        dropped = []
+        with self._cond:
+            if coalesce_key is not None:
+                dropped = [item for item in self._pending if item[4] == coalesce_key]
+                for item in dropped:
+                    self._pending.remove(item)
+                self.dropped += len(dropped)
+            self._pending.append((priority, next(self._seq), text, callback, coalesce_key, time.monotonic()))
+            self.max_depth = max(self.max_depth, len(self._pending))
+            self._cond.notify()
+
+        for item in dropped:
+            if item[3]:
+                item[3]()
+
+    def say_count(self, count):
+        """播报计数：最低优先级，只保留最新的计数"""
+        self.say(count_phrase(count), priority=PRIORITY_COUNT, coalesce_key="count")
+
+    @property
+    def depth(self):
+        """当前排队的播报数"""
+        return len(self._pending)
+
+    def stats(self):
+        """返回队列统计：当前/最大深度、已播、丢弃条数，平均/最大排队延迟（秒）"""
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "spoken": self.spoken,
+            "dropped": self.dropped,
+            "mean_lag": self.total_lag / self.spoken if self.spoken else 0.0,
+            "max_lag": self.max_lag,
+        }
+
+    def stats_text(self):
+        """返回播报统计信息"""
+        if not self.spoken and not self.dropped:
+            return ""
+        stats = self.stats()
+        return (f"播报 {stats['spoken']} 条，合并丢弃 {stats['dropped']} 条，最大排队 {stats['max_depth']} 条，"
+                f"排队延迟平均 {stats['mean_lag']:.2f} 秒、最大 {stats['max_lag']:.2f} 秒")
+
+
+def create_speech_service(name="auto", headless=False, phrases=COMMON_PHRASES, **options):
+    """按名称创建语音后端（见 create_speech_backend）并包装为播报服务"""
+    return SpeechService(create_speech_backend(name, headless=headless, **options), phrases=phrases)
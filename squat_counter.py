@@ -1,33 +1,84 @@
 import cv2
 import mediapipe as mp
-import numpy as np
 import time
-import win32com.client
-import threading
-import os
+import argparse
+
+from capture import FrameClock, open_source
+from control_channel import NullControlClient, connect_control
+from exercise_engine import SQUAT, RepCounter
+from landmark_log import NullLandmarkRecorder, create_recorder
+from metrics import NullMetrics, add_metrics_arguments, create_metrics
+from model_tuning import DEFAULT_MODEL_COMPLEXITY, TARGET_FPS, choose_model_complexity
+from profiling import NullProfiler, add_profile_arguments, create_profiler
+from scheduler import InferenceScheduler
+from session_store import NullSessionStore, NullSessionWriter, SessionStore
+from speech import create_speech_service
+from stability import StabilityDetector
+from telemetry import Telemetry
+from pose_utils import (DISPLAY_WIDTH, DISPLAY_HEIGHT, INFERENCE_SIZE,
+                        joint_angles, landmarks_to_array, prepare_inference_image)
+
+
+# 深蹲播报使用的语音设置
+SPEECH_OPTIONS = {"rate": 0}
 
 
 class SquatCounter:
-    def __init__(self):
-        """初始化深蹲计数器"""
+    def __init__(self, source=None, inference_size=INFERENCE_SIZE, headless=False, speech=None,
+                 scheduler=None, model_complexity=DEFAULT_MODEL_COMPLEXITY,
+                 detection_confidence=0.5, tracking_confidence=0.5, control=None, store=None,
+                 recorder=None, clock=None, metrics=None, profiler=None):
+        """初始化深蹲计数器
+
+        source 为帧源（默认打开摄像头）；headless 为 True 时不创建窗口、不绘制画面；
+        speech 为语音播报服务（SpeechService），默认在 Windows 下使用 SAPI，无界面模式下不播报；
+        scheduler 为推理调度器，静止时降低推理频率，默认每帧推理；
+        model_complexity 和两个置信度直接传给 MediaPipe Pose；
+        control 为与主程序之间的控制通道，默认不连接主程序；
+        store 为训练记录库（SessionStore），默认不保存记录；
+        recorder 为关键点录制器（LandmarkRecorder），默认不录制；
+        clock 为计时基准（FrameClock），回放录制时由调用方注入并推进，默认按帧的采集时间计时；
+        metrics 为运行指标（FrameMetrics），默认不收集；
+        profiler 为性能分析（FrameProfiler），默认不分析。
+        """
         # 初始化MediaPipe
         self.mp_drawing = mp.solutions.drawing_utils
         self.mp_pose = mp.solutions.pose
 
         # 初始化语音引擎
-        self.speaker = win32com.client.Dispatch("SAPI.SpVoice")
-        self.speaker.Rate = 0
+        self.headless = headless
+        self.speech = speech if speech is not None else create_speech_service(headless=headless, **SPEECH_OPTIONS)
 
-        # 打开摄像头
-        self.cap = cv2.VideoCapture(0)
+        # 打开帧源（摄像头使用后台线程采集，只保留最新帧）
+        self.cap = source if source is not None else open_source()
 
-        # 创建窗口
-        cv2.namedWindow('Squat Counter', cv2.WINDOW_NORMAL)
-        cv2.resizeWindow('Squat Counter', 1280, 720)
+        # 与主程序之间的控制通道
+        self.control = control if control is not None else NullControlClient()
+
+        # 以帧的采集时间作为计时基准，录像可以快于实时处理
+        self.clock = clock if clock is not None else FrameClock()
+
+        # 实时事件流（完成次数、阶段、帧率），批量发送给主程序
+        self.telemetry = Telemetry(self.control, clock=self.clock)
 
-        # 计数变量
-        self.squat_counter = 0
-        self.stage = None
+        # 训练记录：每次训练一条记录，每次动作一条明细
+        self.store = store if store is not None else NullSessionStore()
+        self.session = NullSessionWriter()
+        self.recorder = recorder if recorder is not None else NullLandmarkRecorder()
+        self.metrics = metrics if metrics is not None else NullMetrics()
+        self.profiler = profiler if profiler is not None else NullProfiler()
+
+        # 姿态推理尺寸（长边像素），绘制仍使用全分辨率
+        self.inference_size = inference_size
+        self.scheduler = scheduler
+
+        # 姿态模型参数
+        self.model_complexity = model_complexity
+        self.detection_confidence = detection_confidence
+        self.tracking_confidence = tracking_confidence
+
+        # 计数状态机（阈值见 exercise_engine.SQUAT）
+        self.reps = RepCounter(SQUAT)
         self.last_spoken_count = 0
 
         # 状态变量
@@ -39,13 +90,12 @@ class SquatCounter:
         # 显示控制
         self.current_display_text = ""
         self.current_voice_text = ""
-        self.display_start_time = 0
+        self.display_start_time = None
         self.display_duration = 1.0
         self.speak_complete = True
 
-        # 角度阈值
-        self.squat_down_angle = 90
-        self.squat_up_angle = 160
+        # 站立稳定性检测：膝盖角度在窗口内波动较小才算站稳
+        self.standing_detector = StabilityDetector(window_seconds=0.3, threshold=10.0)
 
     def speak_and_display(self, display_text, voice_text=None, duration=1.0):
         """同时设置显示文字和语音播报"""
@@ -54,29 +104,30 @@ class SquatCounter:
 
         self.current_display_text = display_text
         self.current_voice_text = voice_text
-        self.display_start_time = time.time()
+        self.display_start_time = self.clock()
         self.display_duration = duration
+
+        # 开始语音播报，播报结束后才允许进入下一状态（语音关闭时立即完成）
         self.speak_complete = False
+        self.speech.say(voice_text, callback=self._on_speak_complete)
+
+    @property
+    def squat_counter(self):
+        """已完成的深蹲次数"""
+        return self.reps.count
 
-        # 开始语音播报
-        def _speak():
-            self.is_speaking = True
-            try:
-                self.speaker.Speak(self.current_voice_text)
-            except:
-                pass
-            finally:
-                self.is_speaking = False
-                self.speak_complete = True
-
-        thread = threading.Thread(target=_speak)
-        thread.daemon = True
-        thread.start()
+    @property
+    def stage(self):
+        """当前阶段："up"、"down" 或 None"""
+        return self.reps.stage
+
+    def _on_speak_complete(self):
+        self.speak_complete = True
 
     def clear_display(self):
         """清除显示"""
         self.current_display_text = ""
-        self.display_start_time = 0
+        self.display_start_time = None
 
     def should_display(self):
         """检查是否应该显示当前文字"""
@@ -84,8 +135,8 @@ class SquatCounter:
             return False
 
         # 检查显示时间是否超过持续时间
-        if self.display_start_time > 0:
-            elapsed = time.time() - self.display_start_time
+        if self.display_start_time is not None:
+            elapsed = self.clock() - self.display_start_time
             return elapsed < self.display_duration
 
         return True
@@ -93,122 +144,19 @@ class SquatCounter:
     def speak_count(self):
         """播报当前计数"""
         if self.squat_counter > self.last_spoken_count:
-            voice_text = f"第{self.squat_counter}个"
-
-            def _speak():
-                try:
-                    self.speaker.Speak(voice_text)
-                except:
-                    pass
-
-            thread = threading.Thread(target=_speak)
-            thread.daemon = True
-            thread.start()
-
+            self.speech.say_count(self.squat_counter)
             self.last_spoken_count = self.squat_counter
 
-    @staticmethod
-    def calculate_angle(a, b, c):
-        """计算三个点之间的角度"""
-        a = np.array(a)
-        b = np.array(b)
-        c = np.array(c)
-
-        ba = a - b
-        bc = c - b
-
-        cosine_angle = np.dot(ba, bc) / (np.linalg.norm(ba) * np.linalg.norm(bc))
-        angle = np.arccos(cosine_angle)
-        angle = np.degrees(angle)
-
-        return angle
-
     def check_standing(self, angle):
-        """检查是否站立"""
-        return angle > 160
+        """检查是否已站直并保持稳定"""
+        stable = self.standing_detector.update(angle, self.clock())
+        return angle > SQUAT.up_angle and stable
 
     def process_frame(self, image, results):
         """处理一帧图像，进行深蹲计数"""
         if results.pose_landmarks:
-            landmarks = results.pose_landmarks.landmark
             height, width, _ = image.shape
-
-            # 获取左腿关键点坐标
-            hip = [landmarks[self.mp_pose.PoseLandmark.LEFT_HIP.value].x * width,
-                   landmarks[self.mp_pose.PoseLandmark.LEFT_HIP.value].y * height]
-
-            knee = [landmarks[self.mp_pose.PoseLandmark.LEFT_KNEE.value].x * width,
-                    landmarks[self.mp_pose.PoseLandmark.LEFT_KNEE.value].y * height]
-
-            ankle = [landmarks[self.mp_pose.PoseLandmark.LEFT_ANKLE.value].x * width,
-                     landmarks[self.mp_pose.PoseLandmark.LEFT_ANKLE.value].y * height]
-
-            # 计算膝盖角度
-            angle = self.calculate_angle(hip, knee, ankle)
-
-            # 状态机
-            if self.status == "waiting":
-                # 等待阶段：显示和播报"Please stand straight" / "请站直"
-                if self.current_display_text == "":
-                    self.speak_and_display("Please stand straight", "请站直", duration=999)
-
-                # 检测是否站立，并且等待语音播报完成
-                if self.speak_complete and self.check_standing(angle):
-                    self.status = "ready"
-                    self.clear_display()
-                    self.speak_and_display("Ready", "准备", duration=1.0)
-
-            elif self.status == "ready":
-                # 准备阶段：等待"准备"播报完成并且显示时间结束
-                if self.speak_complete and not self.should_display():
-                    self.status = "countdown"
-                    self.countdown_start_time = time.time()
-                    self.last_announced_number = -1
-
-            elif self.status == "countdown":
-                # 倒计时阶段
-                elapsed = time.time() - self.countdown_start_time
-                remaining = self.countdown_value - int(elapsed)
-
-                if remaining > 0:
-                    # 播报和显示倒计时数字
-                    if remaining != self.last_announced_number:
-                        display_text = f"{remaining}"
-                        chinese_numbers = {3: "三", 2: "二", 1: "一"}
-                        voice_text = chinese_numbers.get(remaining, str(remaining))
-                        self.clear_display()
-                        self.speak_and_display(display_text, voice_text, duration=1.0)
-                        self.last_announced_number = remaining
-                else:
-                    # 倒计时结束
-                    self.status = "start"
-                    self.clear_display()
-                    self.speak_and_display("Start!", "开始", duration=1.0)
-
-            elif self.status == "start":
-                # 开始阶段：等待"开始"播报完成并且显示时间结束
-                if self.speak_complete and not self.should_display():
-                    self.status = "counting"
-                    self.clear_display()
-
-                    # 发送开始信号给主程序
-                    base_dir = os.path.dirname(os.path.abspath(__file__))
-                    signal_file = os.path.join(base_dir, "data", ".start_signal")
-                    try:
-                        with open(signal_file, "w") as f:
-                            f.write("start")
-                    except:
-                        pass
-
-            elif self.status == "counting":
-                # 计数阶段
-                if angle > self.squat_up_angle:
-                    if self.stage == "down":
-                        self.squat_counter += 1
-                        self.speak_count()
-                    self.stage = "up"
-                elif angle < self.squat_down_angle:
-                    self.stage = "down"
+            self.update_state(landmarks_to_array(results.pose_landmarks.landmark), width, height)
 
             # 绘制骨架
             self.mp_drawing.draw_landmarks(
@@ -219,6 +167,91 @@ class SquatCounter:
 
         return image
 
+    def update_state(self, points, width, height):
+        """根据一帧关键点数组 (33, 4) 更新状态机和计数，width/height 为计算角度所用的画面尺寸"""
+        # 一次性计算所有关节角
+        self.update_angles(joint_angles(points, SQUAT.angle_scale((width, height))))
+
+    def update_angles(self, angles):
+        """根据一帧的关节角 (J,)（见 pose_utils.joint_angles，按画面像素计算）更新状态机和计数"""
+        angle = SQUAT.feature(angles)
+
+        # 状态机
+        if self.status == "waiting":
+            # 等待阶段：显示和播报"Please stand straight" / "请站直"
+            if self.current_display_text == "":
+                self.speak_and_display("Please stand straight", "请站直", duration=999)
+
+            # 检测是否站立，并且等待语音播报完成
+            if self.speak_complete and self.check_standing(angle):
+                self.status = "ready"
+                self.clear_display()
+                self.speak_and_display("Ready", "准备", duration=1.0)
+
+        elif self.status == "ready":
+            # 准备阶段：等待"准备"播报完成并且显示时间结束
+            if self.speak_complete and not self.should_display():
+                self.status = "countdown"
+                self.countdown_start_time = self.clock()
+                self.last_announced_number = -1
+
+        elif self.status == "countdown":
+            # 倒计时阶段
+            elapsed = self.clock() - self.countdown_start_time
+            remaining = self.countdown_value - int(elapsed)
+
+            if remaining > 0:
+                # 播报和显示倒计时数字
+                if remaining != self.last_announced_number:
+                    display_text = f"{remaining}"
+                    chinese_numbers = {3: "三", 2: "二", 1: "一"}
+                    voice_text = chinese_numbers.get(remaining, str(remaining))
+                    self.clear_display()
+                    self.speak_and_display(display_text, voice_text, duration=1.0)
+                    self.last_announced_number = remaining
+            else:
+                # 倒计时结束
+                self.status = "start"
+                self.clear_display()
+                self.speak_and_display("Start!", "开始", duration=1.0)
+
+        elif self.status == "start":
+            # 开始阶段：等待"开始"播报完成并且显示时间结束
+            if self.speak_complete and not self.should_display():
+                self.status = "counting"
+                self.clear_display()
+                self.send_start_signal()
+
+        elif self.status == "counting":
+            # 计数阶段
+            event = self.reps.update(angle)
+            if event == "rep":
+                self.speak_count()
+                self.telemetry.rep(self.squat_counter)
+            if event in ("rep", "shallow", "minimal"):
+                self.session.rep(self.squat_counter, self.reps.last_depth, self.reps.last_quality,
+                                 exercise=SQUAT.name)
+            if self.stage is not None:
+                self.telemetry.stage(self.stage)
+
+    def send_start_signal(self):
+        """发送开始信号给主程序"""
+        self.control.send("start")
+        self.telemetry.start()
+
+    def reset(self):
+        """重置计数和状态机"""
+        self.reps.reset()
+        self.last_spoken_count = 0
+        self.status = "waiting"
+        self.current_display_text = ""
+        self.current_voice_text = ""
+        self.last_announced_number = -1
+        self.display_start_time = None
+        self.speak_complete = True
+        self.standing_detector.clear()
+        self.telemetry.reset()
+
     def display_info(self, image):
         """在图像上显示信息"""
         height, width, _ = image.shape
@@ -271,97 +304,164 @@ class SquatCounter:
 
         return image
 
-    def run(self):
-        """运行深蹲计数器主循环"""
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        data_dir = os.path.join(base_dir, "data")
-        count_file = os.path.join(data_dir, "squat_count.txt")
-        stop_signal_file = os.path.join(data_dir, ".stop_signal")
-        flag_path = os.path.join(data_dir, "reset.flag")
-        
-
-        with self.mp_pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5) as pose:
-            while self.cap.isOpened():
-                if os.path.exists(stop_signal_file):
-                    try:
-                        with open(count_file, 'w') as f:
-                            f.write(str(self.squat_counter))
-                        print(f"计数已保存: {self.squat_counter}")
-                    except Exception as e:
-                        print(f"保存计数失败: {e}")
-                    break
-
-                if cv2.getWindowProperty('Squat Counter', cv2.WND_PROP_VISIBLE) < 1:
-                    break
-
-                ret, frame = self.cap.read()
-                if not ret:
-                    break
-
-                frame = cv2.flip(frame, 1)
-                frame = cv2.resize(frame, (1280, 720))
-                image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                image.flags.writeable = False
-                results = pose.process(image)
-                image.flags.writeable = True
-                image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+    def run(self, pose=None, release_source=True):
+        """运行深蹲计数器主循环
 
+        pose 为已创建好的 MediaPipe Pose 实例（常驻进程中复用），默认新建；
+        release_source 为 False 时结束后不释放帧源，供下一次训练继续使用。
+        """
+        self.session = self.store.start_session("squat", clock=self.clock)
+        self.metrics.attach("squat", source=self.cap, speech=self.speech)
+
+        # 创建窗口
+        if not self.headless:
+            cv2.namedWindow('Squat Counter', cv2.WINDOW_NORMAL)
+            cv2.resizeWindow('Squat Counter', DISPLAY_WIDTH, DISPLAY_HEIGHT)
+
+        if pose is None:
+            with self.mp_pose.Pose(model_complexity=self.model_complexity,
+                                   min_detection_confidence=self.detection_confidence,
+                                   min_tracking_confidence=self.tracking_confidence) as pose:
+                self._run_loop(pose)
+        else:
+            self._run_loop(pose)
+
+        # 程序结束前确保保存计数，并通过控制通道报告给主程序
+        self.session.finish(self.squat_counter)
+        print(f"计数已保存: {self.squat_counter}")
+        self.profiler.close()
+        self.recorder.close()
+        if self.recorder.stats_text():
+            print(self.recorder.stats_text())
+        self.telemetry.flush()
+        self.control.send("ack", command="stop", count=self.squat_counter)
+
+        if release_source:
+            self.cap.release()
+        if self.cap.stats_text():
+            print(self.cap.stats_text())
+        if self.scheduler is not None and self.scheduler.stats_text():
+            print(self.scheduler.stats_text())
+        if self.speech.stats_text():
+            print(self.speech.stats_text())
+        if not self.headless:
+            cv2.destroyAllWindows()
+
+    def _run_loop(self, pose):
+        """逐帧读取、推理和计数，直到收到停止命令、窗口关闭或帧源结束"""
+        results = None
+        stop_requested = False
+        while self.cap.isOpened():
+            # 处理主程序发来的命令（只读内存队列，不访问文件系统）
+            for command, payload in self.control.poll():
+                if command == "stop":
+                    stop_requested = True
+                elif command == "quit":
+                    # 结束本次训练，退出命令留给常驻进程的外层循环处理
+                    self.control.requeue(command, payload)
+                    stop_requested = True
+                elif command == "reset":
+                    self.reset()
+                    self.control.send("ack", command="reset", count=self.squat_counter)
+            if stop_requested:
+                break
+
+            if not self.headless and cv2.getWindowProperty('Squat Counter', cv2.WND_PROP_VISIBLE) < 1:
+                break
+
+            frame = self.cap.read()
+            if frame is None:
+                break
+            self.clock.tick(frame.timestamp)
+            self.metrics.begin_frame()
+            self.profiler.frame()
+
+            frame = cv2.flip(frame.image, 1)
+
+            # 在缩小的图像上推理，在全分辨率图像上绘制；静止时沿用上一次的结果
+            if results is None or self.scheduler is None or self.scheduler.should_infer(frame, self.clock()):
+                inference_start = time.perf_counter()
+                results = pose.process(prepare_inference_image(frame, self.inference_size))
+                inference_seconds = time.perf_counter() - inference_start
+                self.metrics.inference(inference_seconds)
+                if self.scheduler is not None:
+                    points = None
+                    if results.pose_landmarks:
+                        points = landmarks_to_array(results.pose_landmarks.landmark)
+                    self.scheduler.record_inference(inference_seconds, points, self.clock())
+            self.telemetry.frame()
+
+            # 录制状态机看到的每一帧关键点（沿用上一次推理结果的帧也记录，回放时与实际计数一致）
+            points = landmarks_to_array(results.pose_landmarks.landmark) if results.pose_landmarks else None
+            self.recorder.write(self.clock(), points)
+
+            if self.headless:
+                # 无界面模式：只更新计数，不绘制画面
+                if points is not None:
+                    self.update_state(points, DISPLAY_WIDTH, DISPLAY_HEIGHT)
+                key = -1
+            else:
+                image = cv2.resize(frame, (DISPLAY_WIDTH, DISPLAY_HEIGHT))
                 image = self.process_frame(image, results)
                 image = self.display_info(image)
+                image = self.metrics.draw_hud(image)
 
                 cv2.imshow('Squat Counter', image)
-
                 key = cv2.waitKey(10)
-                if key & 0xFF == ord('q'):
-                    # 退出前保存计数
-                    try:
-                        with open(count_file, 'w') as f:
-                            f.write(str(self.squat_counter))
-                    except Exception as e:
-                        print(f"保存计数失败: {e}")
-                    break
-                elif key & 0xFF == ord('r'):
-                    # 等效的重置逻辑
-                    self.squat_counter = 0
-                    self.stage = None
-                    self.last_spoken_count = 0
-                    self.status = "waiting"
-                    self.current_display_text = ""
-                    self.current_voice_text = ""
-                    self.last_announced_number = -1
-                    self.display_start_time = 0
-                    self.speak_complete = True
-
-                if os.path.exists(flag_path):
-                    self.squat_counter = 0
-                    self.stage = None
-                    self.last_spoken_count = 0
-                    self.status = "waiting"
-                    self.current_display_text = ""
-                    self.current_voice_text = ""
-                    self.last_announced_number = -1
-                    self.display_start_time = 0
-                    self.speak_complete = True
-                    try:
-                        os.remove(flag_path)
-                    except Exception:
-                        pass
-        # 程序结束前确保保存计数
-        try:
-            with open(count_file, 'w') as f:
-                f.write(str(self.squat_counter))
-        except Exception as e:
-            print(f"保存计数失败: {e}")
-
-        self.cap.release()
-        cv2.destroyAllWindows()
+            self.metrics.end_frame(self.squat_counter)
+
+            if key & 0xFF == ord('q'):
+                # 退出后统一保存计数
+                break
+            elif key & 0xFF == ord('r'):
+                self.reset()
 
 
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description="深蹲计数器")
+    parser.add_argument("--inference-size", type=int, default=INFERENCE_SIZE,
+                        help="姿态推理图像的长边像素，0 表示使用原始分辨率")
+    parser.add_argument("--source", default=None,
+                        help="帧源：摄像头编号（默认0）、视频文件、图片目录或 synthetic")
+    parser.add_argument("--headless", action="store_true", help="无界面模式：不显示窗口")
+    parser.add_argument("--speech", choices=["auto", "sapi", "null"], default="auto",
+                        help="语音后端，null 为关闭语音")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="运动自适应推理：无人或静止时降低推理频率")
+    parser.add_argument("--model-complexity", type=int, choices=[0, 1, 2], default=None,
+                        help="姿态模型复杂度，默认按本机速度自动选择")
+    parser.add_argument("--target-fps", type=float, default=TARGET_FPS,
+                        help="自动选择模型时要求达到的帧率")
+    parser.add_argument("--retune", action="store_true", help="忽略缓存，重新测试模型速度")
+    parser.add_argument("--record", nargs="?", const="", default=None, metavar="PATH",
+                        help="录制每帧关键点（不保存视频），默认保存到 data/recordings/")
+    add_metrics_arguments(parser)
+    add_profile_arguments(parser)
+    parser.add_argument("--detection-confidence", type=float, default=0.5)
+    parser.add_argument("--tracking-confidence", type=float, default=0.5)
+    args = parser.parse_args()
+
     print("深蹲计数器启动")
 
-    squat_counter = SquatCounter()
+    model_complexity = choose_model_complexity(args.model_complexity, args.target_fps,
+                                               args.inference_size, refresh=args.retune)
+
+    squat_counter = SquatCounter(
+        source=open_source(args.source),
+        inference_size=args.inference_size,
+        headless=args.headless,
+        speech=create_speech_service(args.speech, headless=args.headless, **SPEECH_OPTIONS),
+        scheduler=InferenceScheduler() if args.adaptive else None,
+        model_complexity=model_complexity,
+        detection_confidence=args.detection_confidence,
+        tracking_confidence=args.tracking_confidence,
+        control=connect_control(),
+        store=SessionStore(),
+        recorder=create_recorder(args.record, SQUAT.name),
+        metrics=create_metrics(args.metrics_file, args.metrics_port, args.hud),
+        profiler=create_profiler(args.profile, SQUAT.name),
+    )
     try:
         squat_counter.run()
     except Exception as e:
@@ -369,7 +469,12 @@ def main():
     finally:
         if squat_counter.cap.isOpened():
             squat_counter.cap.release()
-        cv2.destroyAllWindows()
+        if not squat_counter.headless:
+            cv2.destroyAllWindows()
+        squat_counter.control.close()
+        squat_counter.store.close()
+        squat_counter.recorder.close()
+        squat_counter.metrics.close()
 
     print("程序结束")
 
@@ -0,0 +1,66 @@
+import math
+from collections import deque
+
+
+class StabilityDetector:
+    """滑动时间窗口稳定性检测：窗口内最大值与最小值之差小于阈值即视为稳定
+
+    窗口按秒计算，不受帧率影响；用单调队列维护窗口内的最大/最小值，每次更新均摊 O(1)。
+    """
+
+    def __init__(self, window_seconds=0.5, threshold=5.0):
+        self.window_seconds = window_seconds
+        self.threshold = threshold
+
+        self._max = deque()  # (时间, 值)，值单调递减
+        self._min = deque()  # (时间, 值)，值单调递增
+        self._run_start = None
+        self._last_time = None
+
+    def clear(self):
+        """清空窗口"""
+        self._max.clear()
+        self._min.clear()
+        self._run_start = None
+        self._last_time = None
+
+    def update(self, value, timestamp):
+        """加入一个新样本，返回当前是否稳定；NaN/inf 样本跳过（与 NaN 的比较总为假，会破坏单调队列）"""
+        if not math.isfinite(value):
+            return self.is_stable()
+        # 数据中断超过一个窗口时重新开始，避免旧样本参与判断
+        if self._last_time is not None and timestamp - self._last_time > self.window_seconds:
+            self.clear()
+        if self._run_start is None:
+            self._run_start = timestamp
+        self._last_time = timestamp
+
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((timestamp, value))
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((timestamp, value))
+
+        # 移出窗口外的样本
+        cutoff = timestamp - self.window_seconds
+        while self._max[0][0] < cutoff:
+            self._max.popleft()
+        while self._min[0][0] < cutoff:
+            self._min.popleft()
+
+        return self.is_stable()
+
+    def is_full(self):
+        """连续采样时间是否已覆盖整个窗口"""
+        return self._last_time is not None and self._last_time - self._run_start >= self.window_seconds
+
+    def spread(self):
+        """窗口内最大值与最小值之差"""
+        if not self._max:
+            return 0.0
+        return self._max[0][1] - self._min[0][1]
+
+    def is_stable(self):
+        """窗口已满且波动小于阈值"""
+        return self.is_full() and self.spread() < self.threshold
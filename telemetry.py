@@ -0,0 +1,164 @@
+"""计数过程的实时事件流
+
+子进程端 Telemetry 收集事件（完成一次、阶段变化、校准进度、帧率），
+每 flush_interval 秒通过控制通道批量发送一次（第一帧立即发送）；主程序端 LiveStats 汇总事件，
+界面定时读取快照刷新显示，事件再多也不会逐条占用 Tk 事件循环。
+"""
+import threading
+import time
+from collections import deque
+
+
+class Telemetry:
+    """子进程端：收集事件并批量发送，未连接主程序时不做任何事"""
+
+    def __init__(self, control, clock=time.time, flush_interval=0.1):
+        self.control = control
+        self.clock = clock
+        self.flush_interval = flush_interval
+        self.enabled = getattr(control, "connected", False)
+
+        self._events = []
+        self._last_stage = None
+        self._last_progress = None
+        self._frames = 0
+        self._first_frame = True
+        self._last_flush = time.perf_counter()
+
+    def emit(self, kind, **fields):
+        """记录一个事件"""
+        if not self.enabled:
+            return
+        fields["kind"] = kind
+        fields["t"] = self.clock()
+        self._events.append(fields)
+
+    def start(self):
+        """开始计数"""
+        self._last_stage = None
+        self.emit("start")
+
+    def reset(self):
+        """计数被重置"""
+        self._last_stage = None
+        self._last_progress = None
+        self.emit("reset")
+
+    def rep(self, count):
+        """完成一次动作"""
+        self.emit("rep", count=count)
+
+    def stage(self, stage):
+        """动作阶段变化，阶段不变时不记录"""
+        if stage != self._last_stage:
+            self._last_stage = stage
+            self.emit("stage", stage=stage)
+
+    def calibration(self, progress):
+        """校准进度（0-100），进度不变时不记录"""
+        if progress != self._last_progress:
+            self._last_progress = progress
+            self.emit("calibration", progress=progress)
+
+    def frame(self):
+        """每处理一帧调用一次，到达发送间隔时附上帧率并批量发送"""
+        if not self.enabled:
+            return
+        # 第一帧处理完成立即发送，用于统计启动到出画面的时间
+        if self._first_frame:
+            self._first_frame = False
+            self.emit("first_frame")
+            self.flush()
+        self._frames += 1
+        elapsed = time.perf_counter() - self._last_flush
+        if elapsed >= self.flush_interval:
+            self.emit("fps", fps=round(self._frames / elapsed, 1))
+            self._frames = 0
+            self.flush()
+
+    def flush(self):
+        """立即发送缓存的事件"""
+        self._last_flush = time.perf_counter()
+        if self._events:
+            events, self._events = self._events, []
+            self.control.send("events", events=events)
+
+
+class LiveStats:
+    """主程序端：汇总事件流，供界面读取实时统计
+
+    rate_window 秒内的次数换算为当前每分钟次数；平均每分钟次数从开始计数算起。
+    时间均使用子进程的帧时间。自动识别时各运动分别计数，count 为总次数。
+    """
+
+    def __init__(self, rate_window=30.0):
+        self.rate_window = rate_window
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self.count = 0
+            self.stage = None
+            self.exercise = None
+            self.calibration_progress = None
+            self.fps = 0.0
+            self.start_time = None
+            self.latest_time = None
+            self._rep_times = deque()
+            self._counts = {}
+
+    def apply(self, events):
+        """应用一批事件（在控制通道的接收线程中调用）"""
+        with self._lock:
+            for event in events:
+                kind, t = event["kind"], event["t"]
+                self.latest_time = t
+                if kind == "rep":
+                    self._counts[self.exercise] = event["count"]
+                    self.count = sum(self._counts.values())
+                    self._rep_times.append(t)
+                elif kind == "exercise":
+                    self.exercise = event["exercise"]
+                    self.calibration_progress = None
+                elif kind == "stage":
+                    self.stage = event["stage"]
+                elif kind == "calibration":
+                    self.calibration_progress = event["progress"]
+                elif kind == "fps":
+                    self.fps = event["fps"]
+                elif kind == "start":
+                    # 自动识别切换运动时会再次开始，平均速率仍从第一次开始算起
+                    if self.start_time is None:
+                        self.start_time = t
+                    self.calibration_progress = None
+                elif kind == "reset":
+                    self.count = 0
+                    self.stage = None
+                    self.start_time = None
+                    self._rep_times.clear()
+                    self._counts.clear()
+
+            if self.latest_time is not None:
+                cutoff = self.latest_time - self.rate_window
+                while self._rep_times and self._rep_times[0] < cutoff:
+                    self._rep_times.popleft()
+
+    def snapshot(self):
+        """返回当前统计：次数、阶段、校准进度、帧率、当前和平均每分钟次数"""
+        with self._lock:
+            current_rate = average_rate = 0.0
+            if self.start_time is not None and self.latest_time is not None:
+                elapsed = self.latest_time - self.start_time
+                if elapsed > 0:
+                    average_rate = self.count * 60.0 / elapsed
+                    current_rate = len(self._rep_times) * 60.0 / min(elapsed, self.rate_window)
+            return {
+                "count": self.count,
+                "stage": self.stage,
+                "exercise": self.exercise,
+                "calibration_progress": self.calibration_progress,
+                "fps": self.fps,
+                "current_rate": current_rate,
+                "average_rate": average_rate,
+            }